@@ -0,0 +1,76 @@
+"""
+Per-file parse cost of content_parser, before and after the shared
+Markdown converter.
+
+"before" emulates the old parse_md_file, which called markdown.markdown()
+(a brand-new converter) for every language block; "after" is the current
+ContentParser. Both produce identical data.
+
+Run from the repository root:
+    python Benchmarks/bench_content_parser.py [--folder ContentFiles] [--repeat 50]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ControlModules"))
+
+import markdown
+from content_parser import ContentParser
+
+
+class LegacyContentParser(ContentParser):
+    """
+    ContentParser with the old behaviour: one new Markdown instance per block.
+    """
+    def markdown_to_html(self, text):
+        return markdown.markdown(text)
+
+
+def time_parser(parser, files, repeat):
+    """
+    Return the per-file parse times in milliseconds over 'repeat' passes.
+    """
+    samples = []
+    for _ in range(repeat):
+        for filepath in files:
+            start = time.perf_counter()
+            parser.parse_file(filepath)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark content file parsing.")
+    parser.add_argument("--folder", default="ContentFiles", help="Folder with .md/.txt content files.")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the folder (default: 50).")
+    args = parser.parse_args(argv)
+
+    files = sorted(os.path.join(args.folder, f) for f in os.listdir(args.folder)
+                   if f.lower().endswith((".md", ".txt")))
+    if not files:
+        print(f"No content files in {args.folder}.", file=sys.stderr)
+        return 1
+
+    before, after = LegacyContentParser(), ContentParser()
+    for filepath in files:
+        if before.parse_file(filepath) != after.parse_file(filepath):
+            print(f"Parsers disagree on {filepath}.", file=sys.stderr)
+            return 1
+
+    print(f"{len(files)} file(s) x {args.repeat} passes")
+    print(f"{'':<8} {'mean ms':>10} {'median ms':>10} {'p95 ms':>10}")
+    results = {}
+    for name, content_parser in [("before", before), ("after", after)]:
+        samples = time_parser(content_parser, files, args.repeat)
+        results[name] = statistics.mean(samples)
+        p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+        print(f"{name:<8} {results[name]:>10.3f} {statistics.median(samples):>10.3f} {p95:>10.3f}")
+    print(f"Speed-up: {results['before'] / results['after']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Stage-by-stage benchmark of the deploy and QR pipelines on a synthetic tour.
+
+A scratch workspace (template, PictureDeps and a generated ContentFiles) is
+built in a temporary folder, then each stage is timed separately:
+discover, parse, image rewrite, render, write (to staging), publish,
+manifest, a complete DeployEngine build and QR generation. The result is printed (or written)
+as JSON with per-stage throughput and percentiles plus the peak RSS, so
+runs can be compared across commits.
+
+Run from the repository root:
+    python Benchmarks/bench_pipeline.py [--pages 1000] [--qr 50] [--output result.json]
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import platform
+import subprocess
+import contextlib
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "ControlModules"))
+
+from synthetic_corpus import generate_corpus, add_corpus_arguments, settings_from_args
+from content_parser import parse_content_file
+from deploy_engine import (DeployEngine, BuildResult, RenderOptions, build_image_tags, rewrite_images,
+                           render_page)
+from metrics import BuildMetrics
+from log_helper import setup_logging, shutdown_logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(sorted_samples, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def stage_summary(samples, items=None):
+    """
+    Summarize per-item durations (seconds). 'items' overrides the item
+    count used for throughput when a stage is timed as one block.
+    """
+    ordered = sorted(samples)
+    total = sum(ordered)
+    count = items if items is not None else len(ordered)
+    summary = {"count": count, "total_s": round(total, 6),
+               "items_per_s": round(count / total, 2) if total else None}
+    if len(ordered) > 1:
+        for name, fraction in [("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99), ("max_ms", 1.0)]:
+            summary[name] = round(percentile(ordered, fraction) * 1000, 3)
+    return summary
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def prepare_workspace(workspace, settings):
+    shutil.copytree(os.path.join(REPO_ROOT, "Template"), os.path.join(workspace, "Template"))
+    shutil.copytree(os.path.join(REPO_ROOT, "PictureDeps"), os.path.join(workspace, "PictureDeps"))
+    generate_corpus(os.path.join(workspace, "ContentFiles"), settings)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - start
+
+
+def bench_stages(args):
+    """
+    Run every stage in the current directory (a prepared workspace) and
+    return {stage name: summary}.
+    """
+    stages = {}
+    engine = DeployEngine(force=True, responsive_images=False, parse_cache=False)
+    engine.result = BuildResult()
+    engine.metrics = engine.result.metrics = BuildMetrics()
+    engine.ensure_folders()
+    # The template and the build cache hash PictureDeps files through the index.
+    engine.index_assets()
+    template_content, template = engine.load_template()
+
+    selected, seconds = timed(engine.discover)
+    stages["discover"] = stage_summary([seconds], items=len(selected))
+    engine.plan(template_content, selected)
+    engine.options = RenderOptions()
+
+    parsed = {}
+    samples = []
+    for filename in selected:
+        parsed[filename], seconds = timed(parse_content_file, os.path.join(engine.content_folder, filename))
+        samples.append(seconds)
+    stages["parse"] = stage_summary(samples)
+
+    samples = []
+    for filename in selected:
+        data = parsed[filename]
+        start = time.perf_counter()
+        image_tags = build_image_tags(data.images)
+        for text in data.contents:
+            rewrite_images(text or "", image_tags)
+        samples.append(time.perf_counter() - start)
+    stages["image_rewrite"] = stage_summary(samples)
+
+    pages = {}
+    samples = []
+    for filename in selected:
+        page_html, seconds = timed(render_page, template, parsed[filename], engine.options, engine.nav[filename])
+        pages[filename] = (parsed[filename], page_html, {})
+        samples.append(seconds)
+    stages["render"] = stage_summary(samples)
+
+    engine.open_staging()
+    samples = []
+    for filename in selected:
+        _, seconds = timed(engine.stage_page, filename, *pages[filename])
+        samples.append(seconds)
+    stages["write"] = stage_summary(samples)
+
+    manifest_lines, seconds = timed(engine.write_pages, selected)
+    stages["publish"] = stage_summary([seconds], items=len(selected))
+
+    _, seconds = timed(engine.write_manifest, manifest_lines)
+    stages["manifest"] = stage_summary([seconds], items=1)
+
+    full_engine = DeployEngine(force=True, jobs=args.jobs, responsive_images=args.responsive_images,
+                               parse_cache=False)
+    result, seconds = timed(full_engine.run)
+    if not result.ok:
+        raise RuntimeError(f"Full build failed: {result.summary or result.errors}")
+    stages["full_build"] = stage_summary([seconds], items=len(result.selected_files))
+
+    if args.qr:
+        stages["qr"] = bench_qr(selected[:args.qr])
+    return stages
+
+
+def bench_qr(selected):
+    try:
+        import qrcode_create
+    except ImportError as e:
+        return {"skipped": f"QR dependencies missing: {e}"}
+    samples = []
+    # generate_qr_code prints one line per code.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for filename in selected:
+            name = os.path.splitext(filename)[0]
+            _, seconds = timed(qrcode_create.generate_qr_code, f"{qrcode_create.BASE_URL}/{name}.html", name,
+                               "Benchmark")
+            samples.append(seconds)
+    return stage_summary(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the deploy and QR pipelines on a synthetic tour.")
+    add_corpus_arguments(parser)
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for the full build.")
+    parser.add_argument("--responsive-images", action="store_true",
+                        help="Create image derivatives in the full build (requires Pillow).")
+    parser.add_argument("--qr", type=int, default=20, metavar="N", help="QR codes to generate (0 to skip).")
+    parser.add_argument("--workspace", help="Folder to build in (default: a temporary folder, removed afterwards).")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+    args.pages = max(1, args.pages)
+    settings = settings_from_args(args)
+
+    workspace = args.workspace or tempfile.mkdtemp(prefix="bouda-bench-")
+    # Log into the workspace, so a run leaves no log files in the repository.
+    setup_logging(log_folder=os.path.join(workspace, "Logs"), level=logging.ERROR, console_level=logging.ERROR)
+    previous_dir = os.getcwd()
+    try:
+        start = time.perf_counter()
+        prepare_workspace(workspace, settings)
+        corpus_seconds = time.perf_counter() - start
+        os.chdir(workspace)
+        stages = bench_stages(args)
+    finally:
+        shutdown_logging()
+        os.chdir(previous_dir)
+        if not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": settings.as_dict(),
+        "corpus_s": round(corpus_seconds, 3),
+        "jobs": args.jobs,
+        "responsive_images": args.responsive_images,
+        "stages": stages,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Report written to {args.output}.")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark of the command line (python -m ControlModules).
+
+For the bare command line ("cli", what --help loads) and for every command
+in deploy.COMMAND_MODULES, a fresh interpreter imports deploy and the
+command's modules under "python -X importtime". The import time beyond a
+bare interpreter start is compared with the command's budget. The best of
+--repeat runs counts, so a cold disk cache does not fail the check. The
+report is printed (or written) as JSON; the exit status is 1 if any
+command is over budget.
+
+Run from the repository root:
+    python Benchmarks/bench_startup.py [--repeat 5] [--budget-scale 1.0] [--output result.json]
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+MODULE_FOLDER = os.path.join(REPO_ROOT, "ControlModules")
+sys.path.insert(0, MODULE_FOLDER)
+
+from deploy import COMMAND_MODULES
+from bench_pipeline import git_revision
+
+# Import-time budgets in milliseconds, about twice the slowest best-of-7
+# time of three runs on a development machine (cli 26, build 62, watch 86,
+# rollback 32, qr 73, gui 74 ms with Python 3.11), so only real regressions
+# (a heavy import moved to module level) fail the check. Re-measure and
+# update them when a command's imports change on purpose. The budgets do
+# not cover libraries loaded later in a run: Markdown only when a content
+# file has to be parsed (the parse cache's signature reads its version from
+# the package metadata), Pillow when an image is read, NumPy when a QR code
+# is rendered.
+BUDGETS_MS = {
+    "cli": 50,
+    "build": 120,
+    "watch": 170,
+    "rollback": 60,
+    "qr": 140,
+    "gui": 150,
+}
+HEAVIEST_COUNT = 5
+
+
+def import_times(code):
+    """
+    Run 'code' in a fresh interpreter with -X importtime and return
+    [(depth, module, self_us, cumulative_us)] in the order reported.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True)
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header line.
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure(modules, baseline):
+    """
+    Import 'modules' after deploy and return (total ms, heaviest modules).
+    Top-level imports already done by a bare interpreter start are left out.
+    """
+    imports = "; ".join(f"import {name}" for name in ("deploy",) + tuple(modules))
+    entries = import_times(f"import sys; sys.path.insert(0, {MODULE_FOLDER!r}); {imports}")
+    total_us = 0
+    counted = []
+    in_baseline = False
+    for depth, name, _self_us, cumulative_us in reversed(entries):
+        # Entries are reported after their children; a top-level entry closes a group.
+        if depth == 0:
+            in_baseline = name in baseline
+            if not in_baseline:
+                total_us += cumulative_us
+        if not in_baseline and depth > 0:
+            counted.append((cumulative_us, name))
+    heaviest = [{"module": name, "ms": round(us / 1000, 1)}
+                for us, name in sorted(counted, reverse=True)[:HEAVIEST_COUNT]]
+    return total_us / 1000, heaviest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import time of every command against its budget.")
+    parser.add_argument("--repeat", type=int, default=5, metavar="N", help="Runs per command; the best counts.")
+    parser.add_argument("--budget-scale", type=float, default=1.0, metavar="F",
+                        help="Multiply every budget by F (e.g. 2 on a slow CI machine).")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    baseline = {name for depth, name, _s, _c in import_times("pass") if depth == 0}
+    commands = {"cli": ()}
+    commands.update(COMMAND_MODULES)
+    results = {}
+    over_budget = []
+    for command, modules in commands.items():
+        runs = [measure(modules, baseline) for _ in range(max(1, args.repeat))]
+        best_ms, heaviest = min(runs, key=lambda run: run[0])
+        budget_ms = BUDGETS_MS.get(command, BUDGETS_MS["cli"]) * args.budget_scale
+        results[command] = {"modules": list(modules), "import_ms": round(best_ms, 1),
+                            "budget_ms": round(budget_ms, 1), "ok": best_ms <= budget_ms, "heaviest": heaviest}
+        if best_ms > budget_ms:
+            over_budget.append(command)
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "commands": results,
+        "over_budget": over_budget,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Report written to {args.output}.")
+    else:
+        print(text)
+    for command in over_budget:
+        print(f"{command}: {results[command]['import_ms']} ms is over its budget of "
+              f"{results[command]['budget_ms']} ms.", file=sys.stderr)
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
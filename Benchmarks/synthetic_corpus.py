@@ -0,0 +1,170 @@
+"""
+Synthetic tours for benchmarking.
+
+Generates a ContentFiles-style folder with any number of pages in the .md
+and .txt formats, with configurable text length per language, image
+placeholders per page and nested inline HTML. The same arguments and seed
+always produce the same files.
+
+Run from the repository root:
+    python Benchmarks/synthetic_corpus.py OUTPUT_FOLDER [--pages 1000] [--md-ratio 0.7] ...
+"""
+import os
+import sys
+import random
+import argparse
+
+LANGUAGES = ("cs", "en", "de", "pl")
+
+# Existing PictureDeps files, so the placeholders resolve to real images.
+SAMPLE_IMAGES = (
+    "PictureDeps/Content/Article1/testimage.png",
+    "PictureDeps/Logos/BoudaLogo.PNG",
+    "PictureDeps/Logos/PardubiceLogo.PNG",
+    "PictureDeps/Flags/cs.png",
+    "PictureDeps/Flags/en.png",
+)
+IMAGE_CODES = ("", "sl", "sc", "sr", "ml", "mc", "mr", "lc", "w")
+
+WORDS = ("pevnost", "bunkr", "kasemata", "fortress", "rampart", "Festung", "Graben", "twierdza",
+         "okop", "observation", "artillery", "concrete", "tunnel", "garrison", "border", "history",
+         "ŽĎŘ", "übung", "łączność", "1938")
+
+
+class CorpusSettings:
+    """
+    Shape of a synthetic tour.
+
+    pages          - number of content files
+    md_ratio       - share of .md files (the rest are .txt)
+    words          - words of body text per language
+    images         - image placeholders per page (repeated in every language)
+    nesting        - depth of nested inline HTML wrapped around one paragraph
+    seed           - random seed
+    """
+    def __init__(self, pages=100, md_ratio=0.7, words=200, images=2, nesting=2, seed=1):
+        self.pages = pages
+        self.md_ratio = md_ratio
+        self.words = words
+        self.images = images
+        self.nesting = nesting
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _sentence(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count)).capitalize() + "."
+
+
+def _nested_html(text, depth):
+    for level in range(depth):
+        tag = ("div", "span", "em", "strong")[level % 4]
+        text = f'<{tag} class="n{level}">{text}</{tag}>'
+    return text
+
+
+def _placeholder(image, code):
+    return f"<{image}|{code}>" if code else f"<{image}>"
+
+
+def _body_parts(rng, settings, images):
+    """
+    Return the paragraphs (HTML-free text, nested HTML and placeholders) of one language.
+    """
+    parts = []
+    remaining = settings.words
+    while remaining > 0:
+        count = min(remaining, rng.randint(8, 40))
+        parts.append(_sentence(rng, count))
+        remaining -= count
+    if settings.nesting and parts:
+        parts[0] = _nested_html(parts[0], settings.nesting)
+    for index, placeholder in enumerate(images):
+        parts.insert(min(len(parts), (index + 1) * 2), placeholder)
+    return parts
+
+
+def md_page(rng, settings, index, images):
+    lines = ["# Header", ""]
+    for lang in LANGUAGES:
+        lines.append(f"**{lang}:** Station {index} {lang.upper()}  ")
+    lines += ["", "# Title", ""]
+    for lang in LANGUAGES:
+        lines.append(f"**{lang}:** {_sentence(rng, 4)}  ")
+    lines += ["", "# Content", ""]
+    for lang in LANGUAGES:
+        lines += [f"**{lang}:**  ", f"## {_sentence(rng, 3)}", ""]
+        parts = _body_parts(rng, settings, images)
+        for part_index, part in enumerate(parts):
+            if part_index % 5 == 4:
+                lines.append(f"- {part}")
+            else:
+                lines += [part, ""]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def txt_page(rng, settings, index, images):
+    lines = ["Header:"]
+    for lang in LANGUAGES:
+        lines.append(f'    {lang}: "Station {index} {lang.upper()}"')
+    lines += ["", "Title:"]
+    for lang in LANGUAGES:
+        lines.append(f'    {lang}: "{_sentence(rng, 4)}"')
+    lines += ["", "Content:"]
+    for lang in LANGUAGES:
+        # .txt values are single lines.
+        text = " ".join(f"<p>{part}</p>" if not part.startswith("<PictureDeps") else part
+                        for part in _body_parts(rng, settings, images))
+        lines.append(f'    {lang}: "{text}"')
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(folder, settings):
+    """
+    Write the synthetic content files into 'folder' (created if needed)
+    and return their names in tour order.
+    """
+    rng = random.Random(settings.seed)
+    os.makedirs(folder, exist_ok=True)
+    names = []
+    for index in range(1, settings.pages + 1):
+        images = [_placeholder(rng.choice(SAMPLE_IMAGES), rng.choice(IMAGE_CODES)) for _ in range(settings.images)]
+        if rng.random() < settings.md_ratio:
+            name, text = f"{index}.Station{index}.md", md_page(rng, settings, index, images)
+        else:
+            name, text = f"{index}.Station{index}.txt", txt_page(rng, settings, index, images)
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(text)
+        names.append(name)
+    return names
+
+
+def add_corpus_arguments(parser):
+    defaults = CorpusSettings()
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="Number of content files.")
+    parser.add_argument("--md-ratio", type=float, default=defaults.md_ratio, help="Share of .md files (0-1).")
+    parser.add_argument("--words", type=int, default=defaults.words, help="Body words per language.")
+    parser.add_argument("--images", type=int, default=defaults.images, help="Image placeholders per page.")
+    parser.add_argument("--nesting", type=int, default=defaults.nesting, help="Depth of nested inline HTML.")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed.")
+
+
+def settings_from_args(args):
+    return CorpusSettings(args.pages, args.md_ratio, args.words, args.images, args.nesting, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic tour of content files.")
+    parser.add_argument("folder", help="Output folder (e.g. a scratch ContentFiles).")
+    add_corpus_arguments(parser)
+    args = parser.parse_args(argv)
+    names = generate_corpus(args.folder, settings_from_args(args))
+    print(f"Wrote {len(names)} content file(s) to {args.folder}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
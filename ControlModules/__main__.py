@@ -0,0 +1,12 @@
+"""
+Entry point of "python -m ControlModules <command>" (see deploy.py).
+"""
+import os
+import sys
+
+# The modules of this folder import each other by their bare names.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from deploy import main
+
+sys.exit(main(prog="python -m ControlModules"))
@@ -0,0 +1,139 @@
+"""
+Content-hashed copies of the PictureDeps assets used by the pages.
+
+Every asset a page links directly (template chrome such as flags, logos and
+arrows, and content images that get no derivatives) is copied to
+DeploymentFiles/assets under a name containing its content hash, e.g.
+"BoudaLogo.37398fc1c8f1.png". A name therefore always refers to the same
+bytes and can be cached by browsers and CDNs without revalidation, while an
+edited asset simply gets a new name. DeploymentFiles/asset-map.json records
+which source file each name was made from.
+"""
+import os
+import re
+import json
+import shutil
+import logging
+
+from build_cache import file_hash
+
+ASSET_FOLDER_NAME = "assets"
+ASSET_MAP_FILE_NAME = "asset-map.json"
+HASH_LENGTH = 12
+
+# src/href attributes and CSS url() references to PictureDeps in the template.
+TEMPLATE_ASSET_RE = re.compile(r'''(\b(?:src|href)\s*=\s*["']|url\(\s*["']?)\.\./(PictureDeps/[^"'()\s]+)''')
+
+UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+class AssetFingerprinter:
+    """
+    Copies source assets to fingerprinted names in 'output_folder'; pages
+    refer to that folder through 'url_prefix'.
+    """
+    def __init__(self, output_folder, url_prefix=ASSET_FOLDER_NAME + "/"):
+        self.output_folder = output_folder
+        self.url_prefix = url_prefix
+        self._names = {}  # source path -> fingerprinted name, per process.
+
+    def name_for(self, src_path):
+        """
+        Return the fingerprinted file name of a source asset, copying it if
+        needed, or None if the source cannot be read.
+        """
+        if src_path not in self._names:
+            self._names[src_path] = self._copy(src_path)
+        return self._names[src_path]
+
+    def _copy(self, src_path):
+        digest = file_hash(src_path)
+        if digest is None:
+            logging.warning(f"Asset not found: {src_path}")
+            return None
+        stem, ext = os.path.splitext(os.path.basename(src_path))
+        name = f"{UNSAFE_NAME_RE.sub('_', stem)}.{digest[:HASH_LENGTH]}{ext.lower()}"
+        target_path = os.path.join(self.output_folder, name)
+        if not os.path.exists(target_path):
+            os.makedirs(self.output_folder, exist_ok=True)
+            tmp_path = f"{target_path}.{os.getpid()}.tmp"
+            shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, target_path)
+            logging.info(f"Fingerprinted {src_path} as {name}.")
+        return name
+
+    def url_for(self, src_path):
+        """
+        Return the URL a page uses for a source asset; falls back to the
+        original location when the asset is missing.
+        """
+        name = self.name_for(src_path)
+        if name is None:
+            return "../" + src_path.replace(os.sep, "/")
+        return self.url_prefix + name
+
+    def rewrite_template(self, template_content):
+        """
+        Point every PictureDeps reference in the template at its fingerprinted copy.
+        """
+        return TEMPLATE_ASSET_RE.sub(lambda m: m.group(1) + self.url_for(m.group(2)), template_content)
+
+    def template_assets(self, template_content):
+        """
+        Return the source paths of the PictureDeps assets the template references.
+        """
+        return {m.group(2) for m in TEMPLATE_ASSET_RE.finditer(template_content)}
+
+    def write_map(self, map_path, src_paths):
+        """
+        Write the {source path: fingerprinted name} map for the given assets
+        and delete fingerprinted files no longer in it. Returns the map.
+        """
+        asset_map = {}
+        for src_path in sorted(src_paths):
+            name = self.name_for(src_path)
+            if name is not None:
+                asset_map[src_path.replace(os.sep, "/")] = name
+        text = json.dumps(asset_map, indent=1, sort_keys=True)
+        try:
+            with open(map_path, "r", encoding="utf-8") as f:
+                unchanged = f.read() == text
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            tmp_path = map_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, map_path)
+            logging.info(f"Asset map written ({len(asset_map)} assets).")
+        if os.path.isdir(self.output_folder):
+            in_use = set(asset_map.values())
+            for name in os.listdir(self.output_folder):
+                # Precompressed siblings are cleaned up with their source.
+                source_name = name[:-3] if name.endswith((".gz", ".br")) else name
+                if source_name not in in_use:
+                    os.remove(os.path.join(self.output_folder, name))
+                    logging.info(f"Removed stale asset {name}.")
+        return asset_map
+
+
+def remove_fingerprinted_assets(output_folder, map_path):
+    """
+    Delete the copies listed in an existing asset map, and the map itself
+    (used when fingerprinting is turned off).
+    """
+    if not os.path.exists(map_path):
+        return
+    try:
+        with open(map_path, "r", encoding="utf-8") as f:
+            names = json.load(f).values()
+    except (OSError, ValueError):
+        names = []
+    for name in names:
+        path = os.path.join(output_folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+    os.remove(map_path)
+    if os.path.isdir(output_folder) and not os.listdir(output_folder):
+        os.rmdir(output_folder)
+    logging.info("Removed fingerprinted assets (fingerprinting disabled).")
@@ -0,0 +1,192 @@
+"""
+Index of the PictureDeps assets.
+
+The index lists every file under PictureDeps with its size, modification
+time, SHA-256 hash and, for images, its pixel dimensions. It is saved next
+to the build cache (.assetindex) and refreshed incrementally: only files
+whose size or modification time changed are hashed and measured again, so a
+long-running watch session keeps one index up to date cheaply.
+
+Builds use it to check every image placeholder in O(1), to give plain
+<img> tags their intrinsic width/height, and as the hash source for the
+build cache.
+"""
+import os
+import re
+import json
+import logging
+
+from build_cache import file_hash
+from image_derivatives import pil_image
+
+ASSET_INDEX_FILE_NAME = ".assetindex"
+INDEX_FORMAT = 1
+
+# EXIF orientations that swap width and height when the image is displayed.
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+EXIF_ORIENTATION_TAG = 0x0112
+
+SVG_TAG_RE = re.compile(r'<svg\b[^>]*>', re.IGNORECASE)
+SVG_LENGTH_RE = r'\b{}\s*=\s*["\']\s*([\d.]+)\s*(?:px)?\s*["\']'
+SVG_WIDTH_RE = re.compile(SVG_LENGTH_RE.format("width"), re.IGNORECASE)
+SVG_HEIGHT_RE = re.compile(SVG_LENGTH_RE.format("height"), re.IGNORECASE)
+SVG_VIEWBOX_RE = re.compile(r'\bviewBox\s*=\s*["\']\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)\s*["\']',
+                            re.IGNORECASE)
+
+
+def index_key(path):
+    """
+    Normalize a placeholder or file path to the index key ("PictureDeps/a/b.png").
+    """
+    key = path.replace("\\", "/")
+    while key.startswith("./"):
+        key = key[2:]
+    return key
+
+
+def svg_dimensions(path):
+    """
+    Return the (width, height) declared by an SVG's root element, or None.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            tag = SVG_TAG_RE.search(f.read(4096))
+    except OSError:
+        return None
+    if not tag:
+        return None
+    width, height = SVG_WIDTH_RE.search(tag.group(0)), SVG_HEIGHT_RE.search(tag.group(0))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    viewbox = SVG_VIEWBOX_RE.search(tag.group(0))
+    if viewbox:
+        return round(float(viewbox.group(1))), round(float(viewbox.group(2)))
+    return None
+
+
+def image_dimensions(path):
+    """
+    Return the displayed (width, height) of an image file, or None if it is
+    not an image (or Pillow is missing). Only the header is read.
+    """
+    if path.lower().endswith(".svg"):
+        return svg_dimensions(path)
+    Image = pil_image()
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(EXIF_ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+    except Exception:
+        return None
+    return width, height
+
+
+class AssetIndex:
+    """
+    {key: {"size", "mtime_ns", "hash", "width", "height"}} for every file
+    under 'root'. Call refresh() before each build. Picklable, so it can be
+    shipped to worker processes with the render options.
+    """
+    def __init__(self, root, path=None):
+        self.root = root
+        self.path = path
+        self.entries = {}
+        self._folded = {}  # lower-cased key -> key, for "did you mean" hints.
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Asset index unreadable ({e}); rebuilding it.")
+            return
+        if stored.get("format") == INDEX_FORMAT and stored.get("root") == self.root:
+            self.entries = stored.get("entries", {})
+            self._fold()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": INDEX_FORMAT, "root": self.root, "entries": self.entries}, f,
+                      indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _fold(self):
+        self._folded = {key.lower(): key for key in self.entries}
+
+    def refresh(self):
+        """
+        Re-scan the asset folder; hash and measure only new or modified
+        files. Returns the set of keys that were added, changed or removed.
+        """
+        changed = set()
+        seen = set()
+        for folder, _dirs, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(folder, name)
+                key = index_key(path)
+                seen.add(key)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entry = self.entries.get(key)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                dimensions = image_dimensions(path)
+                self.entries[key] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "hash": file_hash(path),
+                    "width": dimensions[0] if dimensions else None,
+                    "height": dimensions[1] if dimensions else None,
+                }
+                changed.add(key)
+        for key in set(self.entries) - seen:
+            del self.entries[key]
+            changed.add(key)
+        if changed:
+            self._fold()
+            logging.info(f"Asset index: {len(self.entries)} file(s), {len(changed)} updated.")
+            try:
+                self.save()
+            except OSError as e:
+                logging.warning(f"Could not save asset index: {e}")
+        return changed
+
+    def __contains__(self, path):
+        return index_key(path) in self.entries
+
+    def get(self, path):
+        return self.entries.get(index_key(path))
+
+    def dimensions(self, path):
+        """
+        Return (width, height) of an indexed image, or None.
+        """
+        entry = self.get(path)
+        if entry is None or entry["width"] is None:
+            return None
+        return entry["width"], entry["height"]
+
+    def hash_of(self, path):
+        """
+        SHA-256 of an asset; files outside the index are hashed directly.
+        """
+        entry = self.get(path)
+        return entry["hash"] if entry else file_hash(path)
+
+    def suggest(self, path):
+        """
+        Return the indexed path differing only in letter case, or None (such
+        a reference works on Windows but not on the web server).
+        """
+        return self._folded.get(index_key(path).lower())
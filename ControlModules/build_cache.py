@@ -0,0 +1,175 @@
+"""
+Persistent build cache for incremental deployments.
+
+The cache lives in DeploymentFiles/.buildcache (JSON) and records, for every
+generated page, the hash of its content file, the hashes of the PictureDeps
+assets it references and the hash of the HTML that was written. A page is
+only rebuilt when one of these changed. The template hash and the renderer
+version are stored globally, so a template edit invalidates every page.
+"""
+import os
+import json
+import hashlib
+import logging
+
+CACHE_FILE_NAME = ".buildcache"
+CACHE_FORMAT = 1
+
+
+def file_hash(path):
+    """
+    Return the SHA-256 hex digest of a file, or None if it cannot be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """
+    Per-page freshness records for one deployment folder.
+
+    'template_hash' and 'renderer_version' describe the current build; a cache
+    written under different values marks every page as stale. 'hasher'
+    returns the digest of a PictureDeps asset (e.g. AssetIndex.hash_of).
+    """
+    def __init__(self, deploy_folder, template_hash, renderer_version, hasher=file_hash):
+        self.path = os.path.join(deploy_folder, CACHE_FILE_NAME)
+        self.hasher = hasher
+        self.deploy_folder = deploy_folder
+        self.template_hash = template_hash
+        self.renderer_version = renderer_version
+        self.pages = {}
+        self.outputs = set()
+        self.valid = True
+        self._asset_hashes = {}  # Memoized for the duration of one build.
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Build cache unreadable ({e}); doing a full rebuild.")
+            return
+        if stored.get("format") != CACHE_FORMAT:
+            return
+        # Page records are kept even when invalidated so that the outputs
+        # they describe are still known to be ours (see is_tracked).
+        self.pages = stored.get("pages", {})
+        self.outputs = {entry["output"] for entry in self.pages.values()}
+        if (stored.get("renderer") != self.renderer_version
+                or stored.get("template") != self.template_hash):
+            logging.info("Template or renderer changed; build cache invalidated.")
+            self.valid = False
+
+    def save(self):
+        stored = {
+            "format": CACHE_FORMAT,
+            "renderer": self.renderer_version,
+            "template": self.template_hash,
+            "pages": self.pages,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def asset_hash(self, asset_path):
+        if asset_path not in self._asset_hashes:
+            self._asset_hashes[asset_path] = self.hasher(asset_path)
+        return self._asset_hashes[asset_path]
+
+    def is_tracked(self, output_filename):
+        """
+        True if the output page was written by a previous build.
+        """
+        return output_filename in self.outputs
+
+    def has_nav(self, filename, nav):
+        """
+        True if the cached page was written with the given (prev, next) links.
+        """
+        entry = self.pages.get(filename)
+        return entry is not None and entry.get("nav") == list(nav)
+
+    def is_fresh(self, filename, content_hash, nav=(None, None)):
+        """
+        True when the page for 'filename' on disk is exactly what a rebuild
+        would produce.
+        """
+        entry = self.pages.get(filename)
+        if not self.valid or entry is None or entry["content"] != content_hash:
+            return False
+        if not self.has_nav(filename, nav):
+            return False
+        for asset_path, asset_digest in entry["assets"].items():
+            if self.asset_hash(asset_path) != asset_digest:
+                return False
+        # Catch deleted or hand-edited output pages and side files.
+        output_path = os.path.join(self.deploy_folder, entry["output"])
+        if file_hash(output_path) != entry["html"]:
+            return False
+        for name, digest in entry.get("extra", {}).items():
+            if file_hash(os.path.join(self.deploy_folder, name)) != digest:
+                return False
+        return True
+
+    def record(self, filename, content_hash, images, output_filename, extra_outputs=(), nav=(None, None),
+               output_folder=None):
+        """
+        Remember a freshly written page, any side files written with it
+        (e.g. language fragments) and its prev/next links. Call after the
+        output files exist; 'output_folder' is where they are now, if not
+        yet in the deployment folder (e.g. a staging folder).
+        """
+        folder = output_folder or self.deploy_folder
+        assets = {}
+        for img_path, _code in images:
+            assets[img_path] = self.asset_hash(img_path)
+        self.pages[filename] = {
+            "content": content_hash,
+            "assets": assets,
+            "output": output_filename,
+            "html": file_hash(os.path.join(folder, output_filename)),
+            "extra": {name: file_hash(os.path.join(folder, name)) for name in extra_outputs},
+            "nav": list(nav),
+        }
+        self.outputs.add(output_filename)
+
+    def outputs_of(self, filename):
+        """
+        Return the names of the output page and side files recorded for a content file.
+        """
+        entry = self.pages.get(filename)
+        if entry is None:
+            return []
+        return [entry["output"]] + sorted(entry.get("extra", {}))
+
+    def pages_using(self, asset_path):
+        """
+        Return the content files whose pages reference the given asset.
+        """
+        wanted = os.path.normcase(asset_path)
+        return {filename for filename, entry in self.pages.items()
+                if any(os.path.normcase(path) == wanted for path in entry["assets"])}
+
+    def prune(self, selected_files):
+        """
+        Forget pages whose content file is no longer part of the build.
+        """
+        selected = set(selected_files)
+        for filename in list(self.pages):
+            if filename not in selected:
+                self.outputs.discard(self.pages.pop(filename)["output"])
@@ -0,0 +1,196 @@
+"""
+Optimized template chrome.
+
+The flags, logos and arrows of Template/Template.html appear on every page
+but were linked as full-size originals (several hundred KB and eight
+requests per page). Before the template is compiled, ChromeOptimizer
+rewrites them:
+
+- small SVGs (the arrows) are inlined as data: URIs;
+- raster images inside the containers listed in CHROME_RULES are resized to
+  the size the template's CSS displays them at, in 1x and 2x;
+- results below INLINE_LIMIT bytes (the flags) are inlined as data: URIs,
+  larger ones (the logos) are written to DeploymentFiles/chrome as WebP
+  with a PNG fallback and linked through a <picture> element.
+
+Output names contain the source hash and the pixel size, so unchanged
+sources are never re-encoded and the files can be cached forever. Without
+Pillow only the SVGs are inlined.
+"""
+import io
+import os
+import re
+import base64
+import logging
+from urllib.parse import quote
+
+from build_cache import file_hash
+from page_template import inner_div_span
+from image_derivatives import pil_image, pillow_installed, resample_filter
+
+CHROME_FOLDER_NAME = "chrome"
+HASH_LENGTH = 12
+SVG_INLINE_LIMIT = 4096
+INLINE_LIMIT = 4096
+WEBP_QUALITY = 85
+SCALES = (1, 2)
+
+# Containers whose images are right-sized, and the CSS property of
+# ".<container> img" in the template that gives their displayed size.
+CHROME_RULES = (
+    ("flag-container", "width"),
+    ("logo-container", "max-height"),
+)
+
+RASTER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*?\bsrc="\.\./(PictureDeps/[^"]+)"[^>]*>', re.IGNORECASE)
+SRC_ATTR_RE = re.compile(r'\bsrc="[^"]*"')
+TAG_END_RE = re.compile(r'\s*/?>$')
+SVG_SPACE_RE = re.compile(r'>\s+<')
+UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+def css_size(template_content, container, prop):
+    """
+    Return the pixel value of 'prop' in the first ".<container> img" rule, or None.
+    """
+    rule = re.search(r'\.' + re.escape(container) + r'\s+img\s*\{([^}]*)\}', template_content)
+    if not rule:
+        return None
+    value = re.search(r'(?:^|[;\s])' + re.escape(prop) + r'\s*:\s*(\d+)px', rule.group(1))
+    return int(value.group(1)) if value else None
+
+
+def svg_data_uri(svg_text):
+    svg_text = SVG_SPACE_RE.sub("><", svg_text.strip())
+    return "data:image/svg+xml," + quote(svg_text, safe=" =:/;,'-.#")
+
+
+def _set_attributes(tag, src, width, height):
+    tag = SRC_ATTR_RE.sub(lambda m: f'src="{src}"', tag, count=1)
+    return TAG_END_RE.sub(f' width="{width}" height="{height}">', tag)
+
+
+class ChromeOptimizer:
+    """
+    Rewrites the chrome images of a template. Files go to 'output_folder',
+    which pages refer to through 'url_prefix'. 'hasher' returns the digest of
+    a source file (e.g. AssetIndex.hash_of).
+    """
+    def __init__(self, output_folder, url_prefix=CHROME_FOLDER_NAME + "/", hasher=file_hash):
+        self.output_folder = output_folder
+        self.url_prefix = url_prefix
+        self.hasher = hasher
+        self.outputs = set()  # Files of output_folder used by this build.
+
+    def rewrite_template(self, template_content):
+        for container, prop in CHROME_RULES:
+            size = css_size(template_content, container, prop)
+            span = inner_div_span(template_content, re.compile(
+                r'<div\s+[^>]*class=["\'][^"\']*\b' + re.escape(container) + r'\b[^"\']*["\'][^>]*>'))
+            if size is None or span is None or not pillow_installed():
+                continue
+            start, end = span
+            inner = IMG_TAG_RE.sub(lambda m: self._raster_tag(m, prop, size), template_content[start:end])
+            template_content = template_content[:start] + inner + template_content[end:]
+        return IMG_TAG_RE.sub(self._svg_tag, template_content)
+
+    def _svg_tag(self, match):
+        src_path = match.group(1)
+        if not src_path.lower().endswith(".svg"):
+            return match.group(0)
+        try:
+            if os.path.getsize(src_path) > SVG_INLINE_LIMIT:
+                return match.group(0)
+            with open(src_path, "r", encoding="utf-8") as f:
+                uri = svg_data_uri(f.read())
+        except OSError as e:
+            logging.warning(f"Could not inline {src_path}: {e}")
+            return match.group(0)
+        return SRC_ATTR_RE.sub(lambda m: f'src="{uri}"', match.group(0), count=1)
+
+    def _raster_tag(self, match, prop, size):
+        src_path = match.group(1)
+        if not src_path.lower().endswith(RASTER_EXTENSIONS):
+            return match.group(0)
+        try:
+            variants = self._variants(src_path, prop, size)
+        except Exception as e:
+            logging.warning(f"Could not optimize {src_path}: {e}")
+            return match.group(0)
+        if variants is None:
+            return match.group(0)
+        (width, height), pngs, webps = variants
+        # Inlined images keep their files too, as the cache for the next build.
+        self.outputs.update(pngs + webps)
+        largest = os.path.join(self.output_folder, pngs[-1])
+        if os.path.getsize(largest) <= INLINE_LIMIT:
+            with open(largest, "rb") as f:
+                uri = "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+            return _set_attributes(match.group(0), uri, width, height)
+        png_srcset = ", ".join(f"{self.url_prefix}{name} {scale}x" for scale, name in zip(SCALES, pngs))
+        webp_srcset = ", ".join(f"{self.url_prefix}{name} {scale}x" for scale, name in zip(SCALES, webps))
+        img = _set_attributes(match.group(0), self.url_prefix + pngs[0], width, height)
+        img = img.replace(" src=", f' srcset="{png_srcset}" src=', 1)
+        return f'<picture><source type="image/webp" srcset="{webp_srcset}">{img}</picture>'
+
+    def _variants(self, src_path, prop, size):
+        """
+        Create (or reuse) the PNG and WebP files of an image at 1x and 2x its
+        displayed size. Returns ((width, height) at 1x, png names, webp
+        names), or None if the source cannot be read.
+        """
+        digest = self.hasher(src_path)
+        if digest is None:
+            return None
+        with pil_image().open(src_path) as source:
+            source_size = source.size
+            sizes = []
+            for scale in SCALES:
+                if prop == "width":
+                    width = min(size * scale, source_size[0])
+                    height = round(source_size[1] * width / source_size[0])
+                else:
+                    height = min(size * scale, source_size[1])
+                    width = round(source_size[0] * height / source_size[1])
+                sizes.append((max(1, width), max(1, height)))
+            stem = UNSAFE_NAME_RE.sub("_", os.path.splitext(os.path.basename(src_path))[0])
+            base_name = f"{stem}.{digest[:HASH_LENGTH]}"
+            pngs = [f"{base_name}.{w}x{h}.png" for w, h in sizes]
+            webps = [f"{base_name}.{w}x{h}.webp" for w, h in sizes]
+            missing = [(name, dims) for name, dims in zip(pngs + webps, sizes + sizes)
+                       if not os.path.exists(os.path.join(self.output_folder, name))]
+            if missing:
+                os.makedirs(self.output_folder, exist_ok=True)
+                image = source.convert("RGBA")
+                for name, dims in missing:
+                    self._save(image.resize(dims, resample=resample_filter()), name)
+                logging.info(f"Created {len(missing)} chrome image(s) for {src_path}.")
+        return sizes[0], pngs, webps
+
+    def _save(self, image, name):
+        buffer = io.BytesIO()
+        if name.endswith(".webp"):
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        else:
+            if image.getextrema()[3][0] == 255:
+                image = image.convert("RGB")  # No transparency: drop the alpha channel.
+            image.save(buffer, format="PNG", optimize=True)
+        path = os.path.join(self.output_folder, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """
+        Delete chrome files (and their compressed siblings) not used by this build.
+        """
+        if not os.path.isdir(self.output_folder):
+            return
+        for name in os.listdir(self.output_folder):
+            source_name = name[:-3] if name.endswith((".gz", ".br")) else name
+            if source_name not in self.outputs:
+                os.remove(os.path.join(self.output_folder, name))
+                logging.info(f"Removed stale chrome image {name}.")
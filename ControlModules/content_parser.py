@@ -1,159 +1,351 @@
+"""
+Parsers for the ContentFiles formats (.txt and .md).
+
+All regular expressions are compiled once at import time and a ContentParser
+keeps one Markdown converter that is reset between language blocks, instead
+of building a new converter (and its extension registry) for every block.
+Both formats are parsed into a ContentDocument, normalized once.
+"""
 import re
 import os
-import markdown
 
-def parse_txt_file(filepath):
+# Languages of a content file; also the order of the pages' JS objects.
+LANGUAGE_CODES = ("cs", "en", "de", "pl")
+LANGUAGE_INDEX = {lang: index for index, lang in enumerate(LANGUAGE_CODES)}
+LANGUAGE_ALTERNATION = "|".join(LANGUAGE_CODES)
+
+# Bump whenever the parse result changes for the same input, so that cached
+# results (see parse_cache.py) are not reused.
+PARSER_VERSION = 2
+
+# Any <PictureDeps/...> placeholder with an optional |format code.
+IMAGE_PATTERN = re.compile(r'<(PictureDeps/[^>|]+)(?:\|([sml][crl]|w))?>', re.IGNORECASE)
+
+# .txt: "Header:", "Title:" and "Content:" sections holding 'lang: "text"' lines.
+TXT_SECTION_PATTERN = re.compile(
+    r'^(Header|Title|Content):\s*(.*?)(?=^(?:Header|Title|Content):|\Z)',
+    re.MULTILINE | re.DOTALL
+)
+TXT_LANG_LINE_PATTERN = re.compile(rf'^\s*({LANGUAGE_ALTERNATION})\s*:\s*(".*?")\s*$', re.MULTILINE)
+
+# .md: an <img> tag whose src holds a PictureDeps path and optional |format code.
+MD_IMG_TAG_PATTERN = re.compile(
+    r'<img\s+[^>]*src="([^"]*PictureDeps\/[^"|]+)(?:\|([sml][crl]|w))?"[^>]*>',
+    re.IGNORECASE
+)
+MD_LEADING_PARENT_PATTERN = re.compile(r'^\.\.\/')
+# Updated section pattern: require a newline after the section header.
+MD_SECTION_PATTERN = re.compile(
+    r'^#\s*(Header|Title|Content)\s*(?:\r?\n)([\s\S]*?)(?=^\s*#\s*(?:Header|Title|Content)\s*(?:\r?\n)|\Z)',
+    re.MULTILINE
+)
+# Updated language block pattern: allow optional whitespace before the "**" marker.
+MD_LANG_BLOCK_PATTERN = re.compile(
+    rf'^\s*\*\*({LANGUAGE_ALTERNATION}):\*\*\s*([\s\S]*?)(?=^\s*\*\*(?:{LANGUAGE_ALTERNATION}):\*\*|\Z)',
+    re.MULTILINE
+)
+
+
+# Any <img ...> tag (headers show no pictures).
+IMG_TAG_PATTERN = re.compile(r'<img[^>]*>')
+
+
+# Helper function to remove quotes if present.
+def maybe_strip_quotes(s):
+    s = s.strip()
+    if s.startswith('"') and s.endswith('"'):
+        return s[1:-1]
+    return s
+
+# Escape backticks and single quotes for JS.
+def js_escape(s):
+    return s.replace("`", "\\`").replace("'", "\\'")
+
+# Remove any <img ...> tags from the given HTML.
+def remove_images(html):
+    return IMG_TAG_PATTERN.sub('', html)
+
+# Helper to remove wrapping <p> tags if present.
+def remove_wrapping_p(html):
+    html = html.strip()
+    if html.startswith("<p>") and html.endswith("</p>"):
+        return html[3:-4].strip()
+    return html
+
+
+class ContentDocument:
     """
-    Parse a plain text file with the following structure:
-    
-    Header:
-        cs: "Header text in Czech"
-        en: "Header text in English"
-        de: "Header text in German"
-        pl: "Header text in Polish"
-
-    Title:
-        cs: "Title text in Czech"
-        ...
+    One parsed content file. 'headers', 'titles' and 'contents' hold the
+    text of every language in LANGUAGE_CODES order (None where the file has
+    none), normalized once at parse time: quotes stripped, headers and
+    titles unwrapped from <p>, headers without <img> tags. 'images' lists
+    each (path, format code) placeholder once, in order of appearance.
+    The JS-escaped texts are computed on first use and kept.
+    """
+    __slots__ = ("headers", "titles", "contents", "images", "_escaped")
 
-    Content:
-        cs: "<PictureDeps/path/to/image.png|mr> Content text in Czech..."
-        ...
+    def __init__(self, headers, titles, contents, images):
+        self.headers = tuple(headers)
+        self.titles = tuple(titles)
+        self.contents = tuple(contents)
+        self.images = tuple(tuple(image) for image in images)
+        self._escaped = None
+
+    @classmethod
+    def from_raw(cls, sections, images):
+        """
+        Normalize raw parser output: 'sections' maps "header", "title" and
+        "content" to {lang: text as written in the file}.
+        """
+        def texts(section, normalize):
+            raw = sections[section]
+            return [None if raw.get(lang) is None else normalize(raw[lang]) for lang in LANGUAGE_CODES]
+        return cls(texts("header", lambda text: remove_images(remove_wrapping_p(maybe_strip_quotes(text)))),
+                   texts("title", lambda text: remove_wrapping_p(maybe_strip_quotes(text))),
+                   texts("content", maybe_strip_quotes),
+                   images)
+
+    def _text(self, texts, section, lang):
+        text = texts[LANGUAGE_INDEX[lang]]
+        if text is None:
+            raise ValueError(f"no {section} text for language '{lang}'")
+        return text
+
+    def header(self, lang):
+        return self._text(self.headers, "header", lang)
+
+    def title(self, lang):
+        return self._text(self.titles, "title", lang)
+
+    def content(self, lang):
+        return self._text(self.contents, "content", lang)
+
+    def _escaped_text(self, key, text):
+        if self._escaped is None:
+            self._escaped = {}
+        escaped = self._escaped.get(key)
+        if escaped is None:
+            escaped = self._escaped[key] = js_escape(text)
+        return escaped
+
+    def header_js(self, lang):
+        """Header text escaped for a JS template literal."""
+        return self._escaped_text(("header", lang), self.header(lang))
+
+    def content_js(self, lang):
+        """Content text escaped for a JS template literal."""
+        return self._escaped_text(("content", lang), self.content(lang))
+
+    def to_dict(self):
+        """
+        Plain lists for JSON (see parse_cache.py); from_dict() reverses it.
+        """
+        return {"header": list(self.headers), "title": list(self.titles), "content": list(self.contents),
+                "images": [list(image) for image in self.images]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["header"], data["title"], data["content"], data["images"])
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentDocument):
+            return NotImplemented
+        return ((self.headers, self.titles, self.contents, self.images)
+                == (other.headers, other.titles, other.contents, other.images))
+
+    def __reduce__(self):
+        # Pickled for worker processes without the escaped texts.
+        return (ContentDocument, (self.headers, self.titles, self.contents, self.images))
+
+
+# Helper to create the empty raw parse result.
+def empty_sections():
+    return {"header": {}, "title": {}, "content": {}}
+
+# Preprocess helper: turn an <img> tag with a PictureDeps src into a simpler placeholder.
+def img_repl(m):
+    # Remove any leading "../" from the src.
+    src = MD_LEADING_PARENT_PATTERN.sub('', m.group(1))
+    code = m.group(2) or ""
+    if code:
+        return f"<{src}|{code}>"
+    else:
+        return f"<{src}>"
+
+
+class ContentParser:
     """
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-    data = {
-        "header": {"cs": None, "en": None, "de": None, "pl": None},
-        "title":  {"cs": None, "en": None, "de": None, "pl": None},
-        "content": {"cs": None, "en": None, "de": None, "pl": None},
-        "images": []  # Each entry is a tuple: (img_path, code)
-    }
-    section_block_pattern = re.compile(
-        r'^(Header|Title|Content):\s*(.*?)(?=^(?:Header|Title|Content):|\Z)',
-        re.MULTILINE | re.DOTALL
-    )
-    lang_line_pattern = re.compile(r'^\s*(cs|en|de|pl)\s*:\s*(".*?")\s*$', re.MULTILINE)
-    image_pattern = re.compile(r'<(PictureDeps/[^>|]+)(?:\|([sml][crl]|w))?>', re.IGNORECASE)
-    
-    for sec_name, sec_content in section_block_pattern.findall(content):
-        key = sec_name.lower()
-        for lang, text in lang_line_pattern.findall(sec_content):
-            data[key][lang.lower()] = text  # Retain quotes for later processing.
-        for match in image_pattern.findall(sec_content):
-            data["images"].append(match)
-    return data
+    Parses content files into ContentDocuments.
 
-def parse_md_file(filepath):
+    One instance holds one Markdown converter, so an instance must not be
+    shared between threads; each worker process gets its own.
     """
-    Parse a Markdown file with sections structured as follows:
+    def __init__(self):
+        self.markdown = _markdown().Markdown()
+
+    def markdown_to_html(self, text):
+        """
+        Convert one Markdown block to HTML with the shared converter.
+        """
+        return self.markdown.reset().convert(text)
+
+    def parse_file(self, filepath):
+        """
+        Determine the file type (.md or .txt) and parse accordingly.
+        """
+        if parse_mode(filepath) == "md":
+            return self.parse_md_file(filepath)
+        else:
+            return self.parse_txt_file(filepath)
+
+    def parse_txt_file(self, filepath):
+        """
+        Parse a plain text file with the following structure:
+    
+        Header:
+            cs: "Header text in Czech"
+            en: "Header text in English"
+            de: "Header text in German"
+            pl: "Header text in Polish"
 
-    # Header
+        Title:
+            cs: "Title text in Czech"
+            ...
 
-    **cs:**  
-    <img src="../PictureDeps/Content/Article1/testimage.png|sl" alt="Test Image" />  
-    Header text in Czech...
+        Content:
+            cs: "<PictureDeps/path/to/image.png|mr> Content text in Czech..."
+            ...
+        """
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+        sections = empty_sections()
+        images = {}
 
-    **en:** Header text in English  
-    **de:** Header text in German  
-    **pl:** Header text in Polish  
+        for sec_name, sec_content in TXT_SECTION_PATTERN.findall(content):
+            key = sec_name.lower()
+            for lang, text in TXT_LANG_LINE_PATTERN.findall(sec_content):
+                sections[key][lang.lower()] = text  # Quotes are stripped by ContentDocument.
+            # Record each image once, however many languages repeat it.
+            images.update(dict.fromkeys(IMAGE_PATTERN.findall(sec_content)))
+        return ContentDocument.from_raw(sections, images)
 
-    # Title
+    def parse_md_file(self, filepath):
+        """
+        Parse a Markdown file with sections structured as follows:
 
-    **cs:** 1Title in Czech  
-    **en:** 1Title in English  
-    **de:** 1Title in German  
-    **pl:** 1Title in Polish  
+        # Header
 
-    # Content
+        **cs:**  
+        <img src="../PictureDeps/Content/Article1/testimage.png|sl" alt="Test Image" />  
+        Header text in Czech...
 
-    **cs:**  
-    # Vítejte na prohlídce
-    ## Úvod
-    Text with *italic*, **bold**, and `inline code`.
+        **en:** Header text in English  
+        **de:** Header text in German  
+        **pl:** Header text in Polish  
 
-    - Unordered list item
-    - Another item
+        # Title
 
-    1. First ordered item
-    2. Second ordered item
+        **cs:** 1Title in Czech  
+        **en:** 1Title in English  
+        **de:** 1Title in German  
+        **pl:** 1Title in Polish  
 
-    > A blockquote.
+        # Content
 
-    <PictureDeps/Content/Article1/testimage.png|s>
-    <PictureDeps/Content/Article1/testimage.png|mc>
+        **cs:**  
+        # Vítejte na prohlídce
+        ## Úvod
+        Text with *italic*, **bold**, and `inline code`.
 
-    **en:**  
-    # Welcome to the Tour
-    ...
+        - Unordered list item
+        - Another item
+
+        1. First ordered item
+        2. Second ordered item
+
+        > A blockquote.
+
+        <PictureDeps/Content/Article1/testimage.png|s>
+        <PictureDeps/Content/Article1/testimage.png|mc>
+
+        **en:**  
+        # Welcome to the Tour
+        ...
     
-    (and similarly for de, pl)
+        (and similarly for de, pl)
+        """
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        content = MD_IMG_TAG_PATTERN.sub(img_repl, content)
+        sections = empty_sections()
+        images = {}
+
+        for sec_name, sec_text in MD_SECTION_PATTERN.findall(content):
+            key = sec_name.lower()
+            for lang, text_block in MD_LANG_BLOCK_PATTERN.findall(sec_text):
+                text_block = text_block.strip()
+                # Convert Markdown text to HTML.
+                html_text = self.markdown_to_html(text_block)
+                # Extract any image placeholders from the raw text.
+                # Each image is recorded once, however many languages repeat it.
+                images.update(dict.fromkeys(IMAGE_PATTERN.findall(text_block)))
+                sections[key][lang.lower()] = html_text
+        return ContentDocument.from_raw(sections, images)
+
+
+def parse_mode(filepath):
     """
-    import re
-    import os
+    "md" or "txt": how parse_file reads a content file (by its extension).
+    """
+    return "md" if os.path.splitext(filepath)[1].lower() == ".md" else "txt"
+
+
+def _markdown():
+    # Imported on first use, so builds that take every parse from the parse
+    # cache never load the Markdown library (parser_signature() reads its
+    # version from the package metadata).
     import markdown
+    return markdown
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # Preprocess: Replace any <img> tag with a src containing a pipe into a simpler placeholder.
-    def img_repl(m):
-        src = m.group(1)
-        # Remove any leading "../" from the src.
-        src = re.sub(r'^\.\.\/', '', src)
-        code = m.group(2) or ""
-        if code:
-            return f"<{src}|{code}>"
-        else:
-            return f"<{src}>"
-
-    content = re.sub(
-        r'<img\s+[^>]*src="([^"]*PictureDeps\/[^"|]+)(?:\|([sml][crl]|w))?"[^>]*>',
-        img_repl,
-        content,
-        flags=re.IGNORECASE
-    )
-
-    data = {
-        "header": {"cs": None, "en": None, "de": None, "pl": None},
-        "title":  {"cs": None, "en": None, "de": None, "pl": None},
-        "content": {"cs": None, "en": None, "de": None, "pl": None},
-        "images": []
-    }
-    # Updated section pattern: require a newline after the section header.
-    section_pattern = re.compile(
-        r'^#\s*(Header|Title|Content)\s*(?:\r?\n)([\s\S]*?)(?=^\s*#\s*(?:Header|Title|Content)\s*(?:\r?\n)|\Z)',
-        re.MULTILINE
-    )
-    # Updated language block pattern: allow optional whitespace before the "**" marker.
-    lang_block_pattern = re.compile(
-        r'^\s*\*\*(cs|en|de|pl):\*\*\s*([\s\S]*?)(?=^\s*\*\*(?:cs|en|de|pl):\*\*|\Z)',
-        re.MULTILINE
-    )
-
-    image_pattern = re.compile(r'<(PictureDeps/[^>|]+)(?:\|([sml][crl]|w))?>', re.IGNORECASE)
-
-    sections_found = section_pattern.findall(content)
-    for sec_name, sec_text in sections_found:
-        key = sec_name.lower()
-        blocks = lang_block_pattern.findall(sec_text)
-        for lang, text_block in blocks:
-            text_block = text_block.strip()
-            # Convert Markdown text to HTML.
-            html_text = markdown.markdown(text_block)
-            # Extract any image placeholders from the raw text.
-            for match in image_pattern.findall(text_block):
-                data["images"].append(match)
-            data[key][lang.lower()] = html_text
-    return data
+
+def markdown_version():
+    """
+    Version of the installed Markdown library, read without importing it.
+    """
+    from importlib import metadata
+    try:
+        return metadata.version("Markdown")
+    except metadata.PackageNotFoundError:
+        # Not installed as a distribution (e.g. vendored): ask the module.
+        return _markdown().__version__
 
 
+def parser_signature():
+    """
+    Identifies this parser, its languages and the Markdown library version
+    it converts with.
+    """
+    return f"{PARSER_VERSION}:{LANGUAGE_ALTERNATION}:markdown-{markdown_version()}"
+
+
+# Parser used by the module-level functions (one per process).
+_default_parser = None
+
+def default_parser():
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = ContentParser()
+    return _default_parser
+
+def parse_txt_file(filepath):
+    return default_parser().parse_txt_file(filepath)
+
+def parse_md_file(filepath):
+    return default_parser().parse_md_file(filepath)
 
 def parse_content_file(filepath):
     """
     Determine the file type (.md or .txt) and parse accordingly.
     """
-    ext = os.path.splitext(filepath)[1].lower()
-    if ext == ".md":
-        return parse_md_file(filepath)
-    else:
-        return parse_txt_file(filepath)
+    return default_parser().parse_file(filepath)
@@ -1,355 +1,202 @@
-import os
-import re
+"""
+Command line of the tools, also run by "python -m ControlModules":
+
+    build     run a single build without a GUI
+    watch     build, then rebuild on every change
+    rollback  make an earlier release live again
+    qr        generate the QR codes (arguments of qrcode_create.py)
+    gui       open the deployment processor window (default)
+
+Each command imports only the modules it needs (COMMAND_MODULES), so "qr"
+never loads the build engine and "build" never loads tkinter, watchdog or
+the QR libraries. Benchmarks/bench_startup.py holds the import times to a
+budget.
+"""
 import sys
-import time
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+import argparse
 import logging
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 
-# Import our content parser module.
-from content_parser import parse_content_file
-
-# Ensure the Logs folder exists.
-if not os.path.exists("Logs"):
-    os.makedirs("Logs")
-
-# Set up logging to a file in the Logs folder.
-logging.basicConfig(
-    filename=os.path.join("Logs", "deploy.log"),
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
-
-# Folder paths
-TEMPLATE_FOLDER = "template"
-CONTENT_FOLDER = "ContentFiles"
-DEPLOY_FOLDER = "DeploymentFiles"
-
-# Manifest and Template file paths
-MANIFEST_FILE = os.path.join(DEPLOY_FOLDER, "manifest.txt")
-TEMPLATE_FILE = os.path.join(TEMPLATE_FOLDER, "template.html")
-
-# Helper function to remove quotes if present.
-def maybe_strip_quotes(s):
-    s = s.strip()
-    if s.startswith('"') and s.endswith('"'):
-        return s[1:-1]
-    return s
-
-# Escape backticks and single quotes for JS.
-def js_escape(s):
-    return s.replace("`", "\\`").replace("'", "\\'")
-
-# Remove any <img ...> tags from the given HTML.
-def remove_images(html):
-    return re.sub(r'<img[^>]*>', '', html)
-
-# --- Duplicate File Chooser Dialog ---
-def choose_file_dialog(options, title="Duplicate Files Detected", prompt="Select one file to use for this order:"):
-    dialog = tk.Toplevel()
-    dialog.title(title)
-    tk.Label(dialog, text=prompt).pack(padx=10, pady=10)
-    listbox = tk.Listbox(dialog, selectmode=tk.SINGLE, width=50)
-    listbox.pack(padx=10, pady=10)
-    for option in options:
-        listbox.insert(tk.END, option)
-    chosen = []
-    def on_ok():
-        selection = listbox.curselection()
-        if selection:
-            chosen.append(listbox.get(selection[0]))
-        dialog.destroy()
-    ok_button = tk.Button(dialog, text="OK", command=on_ok)
-    ok_button.pack(pady=10)
-    dialog.transient()   # Show on top
-    dialog.grab_set()    # Make modal
-    dialog.wait_window()
-    if chosen:
-        return chosen[0]
+# The build pipeline itself lives in deploy_engine; this module only wraps it.
+from deploy_settings import DUPLICATE_POLICIES, MISSING_IMAGE_POLICIES, DEPLOY_FOLDER
+from log_helper import setup_logging
+
+# Modules each command imports when it runs.
+COMMAND_MODULES = {
+    "build": ("deploy_engine",),
+    "watch": ("deploy_engine", "watch_mode"),
+    "rollback": ("releases",),
+    "qr": ("qrcode_create",),
+    "gui": ("deploy_gui",),
+}
+
+# --- Headless builds ---
+def report_error(message):
+    print(f"ERROR: {message}", file=sys.stderr)
+
+def report_result(result, show_timings=False):
+    if show_timings and result.timings:
+        print(f"{'File':<40} {'Parse ms':>10} {'Render ms':>10}")
+        for filename in result.selected_files:
+            if filename in result.timings:
+                parse_s, render_s = result.timings[filename]
+                print(f"{filename:<40} {parse_s * 1000:>10.1f} {render_s * 1000:>10.1f}")
+    if show_timings and result.metrics:
+        print(result.metrics.summary_table())
+    if result.ok:
+        print(f"Deployed {len(result.generated_files)} page(s) to {DEPLOY_FOLDER}, "
+              f"{len(result.skipped_files)} unchanged.")
     else:
-        return None
-
-# Helper to remove wrapping <p> tags if present.
-def remove_wrapping_p(html):
-    html = html.strip()
-    if html.startswith("<p>") and html.endswith("</p>"):
-        return html[3:-4].strip()
-    return html
-
-class ProcessorUI:
-    def __init__(self, master):
-        self.master = master
-        master.title("Deployment Processor")
-        self.progress_label = tk.Label(master, text="Progress:")
-        self.progress_label.pack(pady=5)
-        self.progress_bar = ttk.Progressbar(master, orient=tk.HORIZONTAL, length=400, mode="determinate")
-        self.progress_bar.pack(pady=5)
-        self.error_label = tk.Label(master, text="Errors:")
-        self.error_label.pack(pady=5)
-        self.error_text = scrolledtext.ScrolledText(master, width=60, height=10)
-        self.error_text.pack(pady=5)
-        self.start_button = tk.Button(master, text="Start Processing", command=self.process_files)
-        self.start_button.pack(pady=10)
-        self.status_label = tk.Label(master, text="")
-        self.status_label.pack(pady=5)
-        self.errors = []
-        logging.info("Deployment Processor initialized.")
-
-    def log_error(self, message):
-        self.errors.append(message)
-        self.error_text.insert(tk.END, message + "\n")
-        self.error_text.see(tk.END)
-        logging.error(message)
-
-    def process_files(self):
-        logging.info("Processing started.")
-        self.start_button.config(state=tk.DISABLED)
-        self.error_text.delete("1.0", tk.END)
-        self.errors.clear()
-        self.status_label.config(text="Starting processing...")
-        self.master.update_idletasks()
-
-        # Ensure required folders exist.
-        for folder in [TEMPLATE_FOLDER, CONTENT_FOLDER, DEPLOY_FOLDER]:
-            if not os.path.exists(folder):
-                os.makedirs(folder)
-                logging.info(f"Created folder: {folder}")
-
-        # Load the template.
-        try:
-            with open(TEMPLATE_FILE, "r", encoding="utf-8") as f:
-                template_content = f.read()
-            logging.info("Template loaded successfully.")
-        except Exception as e:
-            self.log_error("Error reading template file: " + str(e))
-            messagebox.showerror("Error", "Cannot read template file.")
-            self.start_button.config(state=tk.NORMAL)
-            return
-
-        # List all content files with .txt or .md extension.
-        raw_files = [f for f in os.listdir(CONTENT_FOLDER) if f.lower().endswith((".txt", ".md"))]
-        if not raw_files:
-            self.log_error("No content files found in ContentFiles.")
-            self.start_button.config(state=tk.NORMAL)
-            return
-
-        # Group files by numeric order (extracted from filename).
-        file_groups = {}
-        order_pattern = re.compile(r"(\d+)\.")
-        for filename in raw_files:
-            match = order_pattern.match(filename)
-            if match:
-                order = match.group(1)
-                file_groups.setdefault(order, []).append(filename)
-            else:
-                logging.warning(f"File {filename} does not have a numeric prefix; skipping.")
-        # For groups with duplicates, ask the user which file to use.
-        selected_files = []
-        for order in sorted(file_groups, key=lambda x: int(x)):
-            group = file_groups[order]
-            if len(group) == 1:
-                selected_files.append(group[0])
-            else:
-                choice = choose_file_dialog(group, title=f"Duplicate Order {order}", 
-                                            prompt=f"Multiple files found for order {order}. Choose one:")
-                if choice:
-                    selected_files.append(choice)
-                else:
-                    self.log_error(f"No selection made for duplicate order {order}. Aborting.")
-                    messagebox.showwarning("Deployment Aborted", f"Duplicate order {order} not resolved.")
-                    self.start_button.config(state=tk.NORMAL)
-                    return
-
-        self.progress_bar["maximum"] = len(selected_files)
-        logging.info(f"Selected {len(selected_files)} files for processing.")
-
-        # Parse each content file using the content_parser module.
-        parsed_data = {}
-        any_error = False
-        for idx, filename in enumerate(selected_files, start=1):
-            filepath = os.path.join(CONTENT_FOLDER, filename)
-            try:
-                data = parse_content_file(filepath)
-                parsed_data[filename] = data
-                logging.debug(f"Parsed file: {filename}")
-            except Exception as e:
-                self.log_error(f"Error parsing {filename}: {e}")
-                any_error = True
-                break
-            self.progress_bar["value"] = idx
-            self.master.update_idletasks()
-
-        if any_error:
-            self.status_label.config(text="Error encountered during parsing. No files generated.")
-            messagebox.showwarning("Deployment Aborted", "One or more files failed to parse.")
-            self.start_button.config(state=tk.NORMAL)
-            logging.error("Processing aborted due to parsing errors.")
-            return
-
-        self.status_label.config(text="All files valid. Generating HTML...")
-        self.master.update_idletasks()
-
-        # Replacement patterns in the template.
-        title_re = re.compile(r'(<title>)(.*?)(</title>)', re.DOTALL | re.IGNORECASE)
-        header_re = re.compile(r'(<div\s+[^>]*id=["\']header-title["\'][^>]*>)(.*?)(</div>)', re.DOTALL)
-        content_re = re.compile(r'(<div\s+[^>]*id=["\']content-text["\'][^>]*>)(.*?)(</div>)', re.DOTALL)
-        js_titles_re = re.compile(r'const\s+titles\s*=\s*\{[^}]*\};', re.DOTALL)
-        js_contents_re = re.compile(r'const\s+contents\s*=\s*\{[^}]*\};', re.DOTALL)
-
-        manifest_lines = []
-        self.progress_bar["value"] = 0
-        overwritten_files = []
-
-        for idx, filename in enumerate(selected_files, start=1):
-            logging.info(f"Generating HTML for: {filename}")
-            self.status_label.config(text=f"Generating for {filename} ({idx} of {len(selected_files)})")
-            self.master.update_idletasks()
-            data = parsed_data[filename]
-            mod_content = template_content
-
-            # Process title and header. Remove any image tags from the header.
-            cs_title = remove_wrapping_p(maybe_strip_quotes(data["title"]["cs"]))
-            cs_header = remove_wrapping_p(maybe_strip_quotes(data["header"]["cs"]))
-            cs_header = remove_images(cs_header)
-            cs_content = maybe_strip_quotes(data["content"]["cs"])
-
-            mod_content = title_re.sub(lambda m: m.group(1) + cs_title + m.group(3), mod_content)
-            mod_content = header_re.sub(lambda m: m.group(1) + cs_header + m.group(3), mod_content)
-            mod_content = content_re.sub(lambda m: m.group(1) + cs_content + m.group(3), mod_content)
-
-            # Build new JS objects for language switching.
-            h_cs = js_escape(remove_images(remove_wrapping_p(maybe_strip_quotes(data["header"]["cs"]))))
-            h_en = js_escape(remove_images(remove_wrapping_p(maybe_strip_quotes(data["header"]["en"]))))
-            h_de = js_escape(remove_images(remove_wrapping_p(maybe_strip_quotes(data["header"]["de"]))))
-            h_pl = js_escape(remove_images(remove_wrapping_p(maybe_strip_quotes(data["header"]["pl"]))))
-            new_titles_js = f"const titles = {{'cs': `{h_cs}`, 'en': `{h_en}`, 'de': `{h_de}`, 'pl': `{h_pl}`}};"
-            c_cs = js_escape(maybe_strip_quotes(data["content"]["cs"]))
-            c_en = js_escape(maybe_strip_quotes(data["content"]["en"]))
-            c_de = js_escape(maybe_strip_quotes(data["content"]["de"]))
-            c_pl = js_escape(maybe_strip_quotes(data["content"]["pl"]))
-            new_contents_js = f"const contents = {{'cs': `{c_cs}`, 'en': `{c_en}`, 'de': `{c_de}`, 'pl': `{c_pl}`}};"
-            mod_content = js_titles_re.sub(new_titles_js, mod_content)
-            mod_content = js_contents_re.sub(new_contents_js, mod_content)
-
-            # Replace image placeholders (extended syntax).
-            for img_tuple in data["images"]:
-                img_path, img_code = img_tuple
-                if not img_code:
-                    img_code = "w"
-                if img_code.lower() == "w":
-                    style = "width: 100%; height: auto;"
-                else:
-                    size_letter = img_code[0].lower()
-                    align_letter = img_code[1].lower() if len(img_code) > 1 else "c"
-                    size_map = {'s': '25%', 'm': '50%', 'l': '75%'}
-                    width = size_map.get(size_letter, "100%")
-                    if align_letter == "c":
-                        style = f"width: {width}; display: block; margin-left: auto; margin-right: auto; height: auto;"
-                    elif align_letter == "l":
-                        style = f"width: {width}; float: left; margin-right: 20px; height: auto;"
-                    elif align_letter == "r":
-                        style = f"width: {width}; float: right; margin-left: 20px; height: auto;"
-                    else:
-                        style = f"width: {width}; height: auto;"
-                if img_code.lower() == "w":
-                    placeholder = f"<{img_path}>"
-                else:
-                    placeholder = f"<{img_path}|{img_code}>"
-                adjusted_path = f"../{img_path}"
-                img_tag = f'<img src="{adjusted_path}" class="content-image" style="{style}" onerror="this.remove()" />'
-                mod_content = mod_content.replace(placeholder, img_tag)
-
-            base_name = os.path.splitext(filename)[0]
-            output_filename = base_name + ".html"
-            output_path = os.path.join(DEPLOY_FOLDER, output_filename)
-            if os.path.exists(output_path):
-                overwritten_files.append(output_filename)
-            try:
-                with open(output_path, "w", encoding="utf-8") as outf:
-                    outf.write(mod_content)
-                logging.info(f"Generated HTML: {output_filename}")
-            except Exception as e:
-                self.log_error(f"Error writing {output_filename}: {e}")
-                any_error = True
-                break
-
-            order_match = re.match(r"(\d+)\.", filename)
-            order_str = order_match.group(1) if order_match else str(idx)
-            manifest_lines.append(f"{order_str}. {output_filename}")
-            self.progress_bar["value"] = idx
-            self.master.update_idletasks()
-
-        if any_error:
-            self.status_label.config(text="Error encountered while writing files. No manifest created.")
-            messagebox.showwarning("Deployment Aborted", "Error while writing files. Partial files may exist, but no manifest was created.")
-            self.start_button.config(state=tk.NORMAL)
-            logging.error("Processing aborted due to errors.")
-            return
-
-        try:
-            with open(MANIFEST_FILE, "w", encoding="utf-8") as mf:
-                mf.write("#Manifest\n")
-                mf.write("\n".join(manifest_lines))
-            logging.info("Manifest file written successfully.")
-        except Exception as e:
-            self.log_error(f"Error writing manifest.txt: {e}")
-            self.status_label.config(text="Error encountered. Manifest not created.")
-            messagebox.showwarning("Deployment Partial", "All HTML files were generated, but manifest.txt could not be written.")
-            self.start_button.config(state=tk.NORMAL)
-            return
-
-        if overwritten_files:
-            warning_message = f"Warning! {len(overwritten_files)} file(s) were overwritten:\n" + "\n".join(overwritten_files)
-            logging.warning(warning_message)
-            messagebox.showwarning("Files Overwritten", warning_message)
-
-        self.status_label.config(text="Processing complete.")
-        messagebox.showinfo("Done", "Processing complete. All files have been generated.")
-        self.start_button.config(state=tk.NORMAL)
-        logging.info("Processing complete.")
-
-def run_gui():
-    root = tk.Tk()
-    app = ProcessorUI(root)
-    root.mainloop()
-
-# --- Watch mode using watchdog ---
-class DeploymentEventHandler(FileSystemEventHandler):
-    def __init__(self, deploy_func):
-        super().__init__()
-        self.deploy_func = deploy_func
-
-    def on_modified(self, event):
-        if any(folder in event.src_path for folder in [TEMPLATE_FOLDER, CONTENT_FOLDER]):
-            logging.info(f"Change detected in {event.src_path}. Rerunning deployment.")
-            self.deploy_func()
-
-def run_watch_mode(deploy_func):
-    event_handler = DeploymentEventHandler(deploy_func)
-    observer = Observer()
-    observer.schedule(event_handler, TEMPLATE_FOLDER, recursive=True)
-    observer.schedule(event_handler, CONTENT_FOLDER, recursive=True)
-    observer.start()
+        print(f"Deployment aborted: {result.summary or result.errors[-1]}", file=sys.stderr)
+
+def build_headless(duplicate_policy="fail", force=False, jobs=1, show_timings=False, clear_cache=False,
+                   **engine_options):
+    """
+    Run one build without any GUI. Errors go to the log and stderr.
+    Extra keyword arguments are passed on to DeployEngine. Returns the BuildResult.
+    """
+    from deploy_engine import DeployEngine
+    engine = DeployEngine(duplicate_policy=duplicate_policy, on_error=report_error, force=force, jobs=jobs,
+                          **engine_options)
+    if clear_cache:
+        engine.clear_parse_cache()
+    result = engine.run()
+    report_result(result, show_timings)
+    return result
+
+# --- Releases (see releases.py) ---
+def run_rollback(release_id=None, list_only=False):
+    from releases import rollback, list_releases, current_release
+    if list_only:
+        live = current_release(DEPLOY_FOLDER)
+        for name in list_releases(DEPLOY_FOLDER):
+            print(f"{name}{'  (live)' if name == live else ''}")
+        return 0
     try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        observer.stop()
-    observer.join()
-
-def run_headless():
-    root = tk.Tk()
-    root.withdraw()
-    app = ProcessorUI(root)
-    app.process_files()
-    run_watch_mode(app.process_files)
+        release_id = rollback(DEPLOY_FOLDER, release_id)
+    except (ValueError, OSError) as e:
+        report_error(str(e))
+        return 1
+    print(f"Release {release_id} is live.")
+    return 0
+
+# --- Watch mode (see watch_mode.py) ---
+def run_headless(duplicate_policy="fail", force=False, jobs=1, clear_cache=False, **engine_options):
+    from deploy_engine import DeployEngine
+    from watch_mode import run_watch_mode
+    engine = DeployEngine(duplicate_policy=duplicate_policy, on_error=report_error, force=force, jobs=jobs,
+                          **engine_options)
+    if clear_cache:
+        engine.clear_parse_cache()
+    report_result(engine.run())
+    # Only the initial build may be forced; later ones are targeted.
+    engine.force = False
+    run_watch_mode(engine, on_result=report_result)
+
+# --- GUI (see deploy_gui.py) ---
+def run_gui(profile_path=None):
+    from deploy_gui import run_gui as run_window
+    run_window(profile_path)
+
+def main(argv=None, prog="deploy"):
+    parser = argparse.ArgumentParser(prog=prog, description="Build the deployment HTML pages from ContentFiles.")
+    parser.add_argument("--watch", action="store_true", help="Legacy alias for the 'watch' command.")
+    subparsers = parser.add_subparsers(dest="command")
+    gui_parser = subparsers.add_parser("gui", help="Open the deployment processor window (default).")
+    gui_parser.add_argument("--profile", metavar="FILE",
+                            help="Profile each build with cProfile and write the stats to FILE.")
+    for name, help_text in [("build", "Run a single build without a GUI."),
+                            ("watch", "Build, then rebuild whenever content or template files change.")]:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--profile", metavar="FILE",
+                         help="Profile each build with cProfile and write the stats to FILE.")
+        sub.add_argument("--duplicates", choices=[p for p in DUPLICATE_POLICIES if p != "ask"], default="fail",
+                         help="How to resolve several content files with the same order number (default: fail).")
+        sub.add_argument("--missing-images", choices=MISSING_IMAGE_POLICIES, default="fail",
+                         help="Abort on picture placeholders naming missing files, or only warn and "
+                              "leave them out (default: fail).")
+        sub.add_argument("--force", action="store_true",
+                         help="Ignore the build cache and regenerate every page.")
+        sub.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                         help="Parse and render in N worker processes (0 = one per CPU, default: 1).")
+        sub.add_argument("--no-responsive-images", dest="responsive_images", action="store_false",
+                         help="Link original PictureDeps images instead of resized derivatives.")
+        sub.add_argument("--lazy-languages", action="store_true",
+                         help="Inline only the default language; load the others on demand from JSON fragments.")
+        sub.add_argument("--no-manifest", dest="write_manifest_txt", action="store_false",
+                         help="Do not write manifest.txt (navigation links are baked into the pages).")
+        sub.add_argument("--no-fingerprint", dest="fingerprint_assets", action="store_false",
+                         help="Link PictureDeps assets directly instead of content-hashed copies.")
+        sub.add_argument("--no-chrome-optimization", dest="optimize_chrome", action="store_false",
+                         help="Link the template's flags, logos and arrows as they are in PictureDeps.")
+        sub.add_argument("--no-cache", dest="parse_cache", action="store_false",
+                         help="Do not read or update the parsed-content cache (DeploymentFiles/.parsecache).")
+        sub.add_argument("--clear-cache", action="store_true",
+                         help="Empty the parsed-content cache before building.")
+        sub.add_argument("--minify", action="store_true",
+                         help="Minify the generated pages (inline CSS/JS included).")
+        sub.add_argument("--precompress", action="store_true",
+                         help="Write .gz (and .br, if brotli is installed) next to every text output.")
+        sub.add_argument("--no-service-worker", dest="service_worker", action="store_false",
+                         help="Do not write the offline service worker (and remove a deployed one).")
+        sub.add_argument("--no-search-index", dest="search_index", action="store_false",
+                         help="Do not write the full-text search index (and remove a deployed one).")
+        sub.add_argument("--write-threads", type=int, default=4, metavar="N",
+                         help="Write pages from N threads while rendering (1 = write in the build thread, default: 4).")
+        sub.add_argument("--releases", type=int, default=0, metavar="N",
+                         help="Build each deployment as a new release, switch DeploymentFiles to it atomically "
+                              "and keep N previous releases for rollback (default: 0, update in place).")
+    rollback_parser = subparsers.add_parser("rollback", help="Make an earlier release live again (see --releases).")
+    rollback_parser.add_argument("--to", dest="release_id", metavar="ID",
+                                 help="Release to switch to (default: the one before the live release).")
+    rollback_parser.add_argument("--list", action="store_true", help="List the kept releases and exit.")
+    # Parsed by qrcode_create itself, so its options are only loaded with it.
+    subparsers.add_parser("qr", add_help=False,
+                          help="Generate QR codes for the deployed pages (see 'qr --help').")
+    subparsers.choices["build"].add_argument("--timings", action="store_true",
+                                             help="Print per-file parse and render times and the stage summary.")
+    args, qr_args = parser.parse_known_args(argv)
+    if args.command == "qr":
+        import qrcode_create
+        return qrcode_create.main(qr_args, prog=f"{prog} qr")
+    if qr_args:
+        parser.error(f"unrecognized arguments: {' '.join(qr_args)}")
+    if args.watch and args.command is None:
+        args = parser.parse_args(["watch"])
+
+    # Log to Logs/deploy.log (and timing spans to Logs/metrics.jsonl) through a
+    # background thread, so file writes never hold up a build.
+    setup_logging()
+
+    if args.command in ("build", "watch"):
+        engine_options = {
+            "responsive_images": args.responsive_images,
+            "lazy_languages": args.lazy_languages,
+            "write_manifest_txt": args.write_manifest_txt,
+            "service_worker": args.service_worker,
+            "fingerprint_assets": args.fingerprint_assets,
+            "minify": args.minify,
+            "precompress": args.precompress,
+            "parse_cache": args.parse_cache,
+            "profile_path": args.profile,
+            "write_threads": args.write_threads,
+            "releases": max(0, args.releases),
+            "missing_images": args.missing_images,
+            "optimize_chrome": args.optimize_chrome,
+            "search_index": args.search_index,
+        }
+    if args.command == "build":
+        result = build_headless(args.duplicates, force=args.force, jobs=args.jobs, show_timings=args.timings,
+                                clear_cache=args.clear_cache, **engine_options)
+        return 0 if result.ok else 1
+    if args.command == "rollback":
+        return run_rollback(args.release_id, args.list)
+    if args.command == "watch":
+        logging.info("Starting in headless watch mode.")
+        run_headless(args.duplicates, force=args.force, jobs=args.jobs, clear_cache=args.clear_cache,
+                     **engine_options)
+        return 0
+    run_gui(getattr(args, "profile", None))
+    return 0
 
 if __name__ == '__main__':
-    if "--watch" in sys.argv:
-        logging.info("Starting in headless watch mode.")
-        run_headless()
-    else:
-        run_gui()
+    sys.exit(main())
@@ -0,0 +1,1233 @@
+"""
+Headless build engine for the deployment pipeline.
+
+DeployEngine runs discover -> parse -> render -> write -> manifest without
+touching Tk. Progress, status and errors are reported through optional
+callbacks, so the GUI, watch mode and the command line all share one
+implementation.
+"""
+import os
+import re
+import html
+import json
+import time
+import shutil
+import cProfile
+import logging
+import itertools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Folder names and policies (re-exported for existing imports).
+from deploy_settings import (TEMPLATE_FOLDER, CONTENT_FOLDER, DEPLOY_FOLDER, PICTURE_FOLDER, DUPLICATE_POLICIES,
+                             MISSING_IMAGE_POLICIES)
+# Import our content parser module.
+from content_parser import parse_content_file, parser_signature, remove_images, LANGUAGE_CODES
+from parse_cache import ParseCache, clear_parse_cache, PARSE_CACHE_FILE_NAME
+from build_cache import BuildCache, file_hash, text_hash
+from page_template import CompiledTemplate
+from image_derivatives import ImageDerivatives, DERIVATIVE_FOLDER_NAME
+from asset_index import AssetIndex, ASSET_INDEX_FILE_NAME
+from chrome_assets import ChromeOptimizer, CHROME_FOLDER_NAME
+from asset_fingerprint import (AssetFingerprinter, remove_fingerprinted_assets, ASSET_FOLDER_NAME,
+                               ASSET_MAP_FILE_NAME)
+from html_minify import minify_html
+from precompress import precompress_folder, remove_compressed
+from metrics import BuildMetrics, collecting, span, timed
+from log_helper import active_log_file, setup_worker_logging
+from releases import create_release, activate_release, discard_release, prune_releases, releases_folder
+from search_index import SearchIndex, remove_search_index, remove_search_box, plain_text
+from service_worker import (build_precache_entries, write_service_worker, remove_service_worker,
+                            SERVICE_WORKER_TEMPLATE_NAME)
+
+# Pages of the build in progress are written here (inside the deployment
+# folder, so publishing them is a rename) and only moved into place once
+# every page has been rendered.
+STAGING_FOLDER_NAME = ".staging"
+
+# Manifest and Template file paths
+MANIFEST_FILE = os.path.join(DEPLOY_FOLDER, "manifest.txt")
+TEMPLATE_FILE = os.path.join(TEMPLATE_FOLDER, "Template.html")
+
+ORDER_PATTERN = re.compile(r"(\d+)\.")
+
+# Minimum time between two progress reports of one stage (seconds).
+PROGRESS_INTERVAL = 0.1
+
+# Bump whenever render_page output changes for the same input, so that
+# cached pages from older builds are regenerated.
+RENDERER_VERSION = 8
+
+# Page languages, in the order they appear in the generated JS objects.
+LANGUAGES = LANGUAGE_CODES
+DEFAULT_LANGUAGE = "cs"
+
+# Any image placeholder, e.g. <PictureDeps/Flags/cs.png|sl>.
+IMAGE_PLACEHOLDER_RE = re.compile(r'<PictureDeps/[^<>]*>', re.IGNORECASE)
+
+
+# Output page name for a content file ("1.Uvod.md" -> "1.Uvod.html").
+def output_name_for(filename):
+    return os.path.splitext(filename)[0] + ".html"
+
+
+def image_style(img_code):
+    """
+    Return the inline CSS for an image format code (e.g. "mc", "sl", "w").
+    """
+    if not img_code or img_code.lower() == "w":
+        return "width: 100%; height: auto;"
+    size_letter = img_code[0].lower()
+    align_letter = img_code[1].lower() if len(img_code) > 1 else "c"
+    size_map = {'s': '25%', 'm': '50%', 'l': '75%'}
+    width = size_map.get(size_letter, "100%")
+    if align_letter == "c":
+        return f"width: {width}; display: block; margin-left: auto; margin-right: auto; height: auto;"
+    elif align_letter == "l":
+        return f"width: {width}; float: left; margin-right: 20px; height: auto;"
+    elif align_letter == "r":
+        return f"width: {width}; float: right; margin-left: 20px; height: auto;"
+    return f"width: {width}; height: auto;"
+
+# Styles for every known format code, computed once.
+IMAGE_STYLES = {code: image_style(code) for code in
+                ["w"] + [size + align for size in "sml" for align in "clr"]}
+
+
+def build_image_tags(images, derivatives=None, assets=None, asset_index=None):
+    """
+    Map every placeholder text of a page to its finished <img> tag. With an
+    ImageDerivatives store, images get responsive <picture> markup instead;
+    with an AssetFingerprinter, directly linked images use fingerprinted copies.
+    With an AssetIndex, plain images get their intrinsic width/height and
+    placeholders of missing files are dropped.
+    """
+    tags = {}
+    for img_path, img_code in images:
+        code = img_code.lower() if img_code else "w"
+        if code == "w":
+            placeholder = f"<{img_path}>"
+        else:
+            placeholder = f"<{img_path}|{img_code}>"
+        if placeholder in tags:
+            continue
+        if asset_index is not None and img_path not in asset_index:
+            tags[placeholder] = ""
+            continue
+        style = IMAGE_STYLES.get(code) or image_style(code)
+        tag = derivatives.image_tag(img_path, code, style) if derivatives else None
+        if tag is None:
+            src = assets.url_for(img_path) if assets else f"../{img_path}"
+            dimensions = asset_index.dimensions(img_path) if asset_index is not None else None
+            size = f'width="{dimensions[0]}" height="{dimensions[1]}" ' if dimensions else ""
+            tag = f'<img src="{src}" {size}class="content-image" style="{style}" />'
+        tags[placeholder] = tag
+    return tags
+
+
+def rewrite_images(text, image_tags):
+    """
+    Replace every known image placeholder in one pass over the text.
+    Unknown placeholders are left untouched.
+    """
+    if not image_tags:
+        return text
+    return IMAGE_PLACEHOLDER_RE.sub(lambda m: image_tags.get(m.group(0), m.group(0)), text)
+
+
+class RenderOptions:
+    """
+    Build-wide rendering settings shared by every page (and every worker).
+
+    derivatives     - ImageDerivatives store, or None to link original images
+    lazy_languages  - inline only the default language and write the others
+                      as "<page>.<lang>.json" fragments loaded on demand
+    assets          - AssetFingerprinter for directly linked images, or None
+                      to link them from PictureDeps
+    asset_index     - AssetIndex of PictureDeps (image sizes, missing files),
+                      or None
+    """
+    def __init__(self, derivatives=None, lazy_languages=False, assets=None, asset_index=None):
+        self.derivatives = derivatives
+        self.lazy_languages = lazy_languages
+        self.assets = assets
+        self.asset_index = asset_index
+
+    def links_original(self, img_path):
+        """
+        True if pages link the image file itself rather than derivatives.
+        """
+        return self.derivatives is None or self.derivatives.describe(img_path) is None
+
+    @property
+    def inline_languages(self):
+        return (DEFAULT_LANGUAGE,) if self.lazy_languages else LANGUAGES
+
+
+def search_texts(data):
+    """
+    Plain-text (result title, heading, body) of every language, for the search index.
+    """
+    texts = {}
+    for lang in LANGUAGES:
+        heading = plain_text(data.header(lang))
+        title = plain_text(remove_images(data.title(lang)))
+        body = plain_text(IMAGE_PLACEHOLDER_RE.sub(" ", data.content(lang)))
+        texts[lang] = (" ".join(heading.split()) or " ".join(title.split()), f"{heading} {title}", body)
+    return texts
+
+
+def nav_link(target):
+    """
+    Value of a prev/next arrow's href slot. data-nav tells the page script
+    that the link is baked in and manifest.txt need not be fetched.
+    """
+    return f'href="{html.escape(target or "#")}" data-nav="static"'
+
+
+def render_page(template, data, options=None, nav=(None, None)):
+    """
+    Inject the ContentDocument of one content file into the CompiledTemplate
+    and return the finished HTML page. 'nav' holds the output file names of
+    the previous and next page (None at either end of the tour).
+    """
+    options = options or RenderOptions()
+    image_tags = build_image_tags(data.images, options.derivatives, options.assets, options.asset_index)
+
+    # The texts were normalized by the parser (headers come without images).
+    cs_title = data.title(DEFAULT_LANGUAGE)
+    cs_header = data.header(DEFAULT_LANGUAGE)
+    cs_content = data.content(DEFAULT_LANGUAGE)
+
+    # Build new JS objects for language switching.
+    languages = options.inline_languages
+    titles = ", ".join(f"'{lang}': `{data.header_js(lang)}`" for lang in languages)
+    contents = ", ".join(f"'{lang}': `{data.content_js(lang)}`" for lang in languages)
+
+    # Replace image placeholders (extended syntax) in every injected value.
+    return template.render({
+        "title": rewrite_images(cs_title, image_tags),
+        "header": rewrite_images(cs_header, image_tags),
+        "content": rewrite_images(cs_content, image_tags),
+        "titles_js": rewrite_images(f"const titles = {{{titles}}};", image_tags),
+        "contents_js": rewrite_images(f"const contents = {{{contents}}};", image_tags),
+        "prev_link": nav_link(nav[0]),
+        "next_link": nav_link(nav[1]),
+    })
+
+
+def render_language_fragments(data, options):
+    """
+    Return {lang: JSON text} for every language not inlined into the page.
+    """
+    image_tags = build_image_tags(data.images, options.derivatives, options.assets, options.asset_index)
+    fragments = {}
+    for lang in LANGUAGES:
+        if lang in options.inline_languages:
+            continue
+        fragments[lang] = json.dumps({
+            "title": rewrite_images(data.header(lang), image_tags),
+            "content": rewrite_images(data.content(lang), image_tags),
+        }, ensure_ascii=False)
+    return fragments
+
+
+# Name of a language fragment next to its page ("1.Uvod.html" -> "1.Uvod.en.json").
+def fragment_name_for(output_filename, lang):
+    return f"{os.path.splitext(output_filename)[0]}.{lang}.json"
+
+# Any language fragment name, e.g. "1.Uvod.en.json".
+FRAGMENT_NAME_PATTERN = re.compile(rf"^.+\.(?:{'|'.join(LANGUAGES)})\.json$")
+
+
+class PageError(Exception):
+    """
+    Raised by build_page; 'stage' is "parse" or "render". Kept picklable so
+    it can cross the process pool boundary.
+    """
+    def __init__(self, stage, message):
+        super().__init__(stage, message)
+        self.stage = stage
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+def build_page(filepath, template, options=None, nav=(None, None), data=None):
+    """
+    Parse and render one content file. Returns (data, html, fragments,
+    parse_seconds, render_seconds), where fragments maps languages to JSON
+    text (empty unless options.lazy_languages). Pass already parsed 'data'
+    (e.g. from the parse cache) to skip parsing. This is the unit of work
+    handed to worker processes.
+    """
+    options = options or RenderOptions()
+    start = time.perf_counter()
+    try:
+        if data is None:
+            data = parse_content_file(filepath)
+    except Exception as e:
+        raise PageError("parse", f"Error parsing {os.path.basename(filepath)}: {e}")
+    parsed = time.perf_counter()
+    try:
+        page_html = render_page(template, data, options, nav)
+        fragments = render_language_fragments(data, options) if options.lazy_languages else {}
+    except Exception as e:
+        raise PageError("render", f"Error rendering {os.path.basename(filepath)}: {e}")
+    return data, page_html, fragments, parsed - start, time.perf_counter() - parsed
+
+
+# Template and render options shared by all tasks of one worker process
+# (set by the pool initializer).
+_worker_template = None
+_worker_options = None
+
+def _init_worker(template, options, log_file=None):
+    global _worker_template, _worker_options
+    _worker_template = template
+    _worker_options = options
+    if log_file:
+        setup_worker_logging(log_file)
+
+def _build_page_in_worker(filepath, nav, data):
+    return build_page(filepath, _worker_template, _worker_options, nav, data)
+
+
+class BuildError(Exception):
+    """
+    Raised inside the engine when a stage fails and the build must stop.
+    'stage' names the failing step, 'summary' is a short user-facing text
+    (empty when the failure does not warrant a dialog).
+    """
+    def __init__(self, stage, message, summary=""):
+        super().__init__(message)
+        self.stage = stage
+        self.summary = summary
+
+
+def page_build_error(page_error):
+    """
+    Turn a PageError from build_page into the BuildError that aborts the build.
+    """
+    if page_error.stage == "render":
+        summary = "One or more files failed to render."
+    else:
+        summary = "One or more files failed to parse."
+    return BuildError(page_error.stage, str(page_error), summary)
+
+
+class BuildResult:
+    """
+    Outcome of a single DeployEngine.run() call.
+    """
+    def __init__(self):
+        self.ok = False
+        self.stage = None          # Name of the stage that failed, if any.
+        self.summary = ""          # Short user-facing outcome text.
+        self.errors = []
+        self.selected_files = []
+        self.generated_files = []
+        self.skipped_files = []    # Pages left untouched because they were up to date.
+        self.overwritten_files = []
+        self.timings = {}          # filename -> (parse_seconds, render_seconds)
+        self.manifest_written = False
+        self.metrics = None        # BuildMetrics with the timing spans of the build.
+
+
+class DeployEngine:
+    """
+    Pure-Python deployment pipeline: discover -> parse -> render -> write -> manifest.
+
+    Builds are incremental: pages whose content file, referenced PictureDeps
+    assets and template are unchanged since the last build are neither parsed
+    nor rewritten. Pass force=True to regenerate everything.
+
+    With responsive_images=True (and Pillow installed) content images are
+    served as resized WebP/JPEG/PNG derivatives from DeploymentFiles/img.
+
+    With lazy_languages=True only the default language is inlined into each
+    page; the others are written as "<page>.<lang>.json" fragments that the
+    page fetches when the visitor switches language.
+
+    Prev/next links are baked into every page at build time, so manifest.txt
+    is only needed by older pages; write_manifest_txt=False skips it.
+
+    With optimize_chrome=True the template's arrows and flags are inlined
+    and its logos right-sized into DeploymentFiles/chrome (see
+    chrome_assets.py) before the template is compiled.
+
+    With fingerprint_assets=True every directly linked PictureDeps asset is
+    copied to DeploymentFiles/assets under a content-hashed name, so it can
+    be cached forever; asset-map.json lists the current copies.
+
+    With service_worker=True an offline-first service worker (sw.js) and a
+    content-hashed precache list are written next to the pages, so visitors
+    can keep browsing without coverage after their first page load.
+
+    With search_index=True every page is indexed for full-text search as it
+    is built; the per-language index shards are written to
+    DeploymentFiles/search and queried by the search box of the template
+    (see search_index.py).
+
+    With minify=True pages are minified after rendering; with
+    precompress=True every text output gets .gz (and, with the brotli
+    package, .br) siblings. Both log before/after byte counts.
+
+    Every PictureDeps file is listed in an AssetIndex (DeploymentFiles/
+    .assetindex, refreshed incrementally each build). Picture placeholders
+    are checked against it as pages are built: missing_images="fail" aborts
+    the build, "warn" drops the picture. Plain images get their intrinsic
+    width/height from it.
+
+    Parsed content is kept in DeploymentFiles/.parsecache, so pages that
+    must be re-rendered without their content changing (e.g. after a
+    template edit) are not parsed again; parse_cache=False bypasses it.
+
+    Every stage and per-file step is recorded as a timing span (see
+    metrics.py); a summary table is logged after each build. With
+    profile_path set, each run is profiled with cProfile and the stats are
+    dumped to that file (work done in pool workers is not included).
+
+    Pages are streamed: each content file is parsed, rendered and written
+    to DeploymentFiles/.staging before the next one is taken up, so memory
+    use does not grow with the size of the tour. The staged files are moved
+    into place only after every file parsed and rendered; on any failure
+    the deployment folder is left untouched.
+
+    Staged files are written by write_threads threads while the next pages
+    are rendered; progress callbacks are throttled so a slow UI does not
+    pace the build.
+
+    With releases=N every build is a complete new release in
+    DeploymentFiles.releases/ and DeploymentFiles becomes a symbolic link
+    that is switched to it atomically once the whole build (manifest
+    included) has succeeded; the N previous releases are kept for rollback
+    (see releases.py). The default, releases=0, updates DeploymentFiles in
+    place.
+
+    With jobs > 1 the parse+render work of each content file is fanned out
+    to a process pool, with at most max_in_flight files (default: twice the
+    number of jobs) submitted at a time.
+
+    Callbacks (all optional):
+        on_progress(stage, done, total)   - called after each file in a stage
+        on_status(text)                   - human readable status line
+        on_error(message)                 - every error message, as it happens
+        chooser(order, options)           - used when duplicate_policy == "ask";
+                                            returns the chosen filename or None
+    """
+    def __init__(self, template_file=TEMPLATE_FILE, content_folder=CONTENT_FOLDER,
+                 deploy_folder=DEPLOY_FOLDER, duplicate_policy="fail", chooser=None,
+                 on_progress=None, on_status=None, on_error=None, force=False, jobs=1,
+                 responsive_images=True, lazy_languages=False, write_manifest_txt=True,
+                 service_worker=True, fingerprint_assets=True, minify=False, precompress=False,
+                 parse_cache=True, profile_path=None, max_in_flight=None, write_threads=4, releases=0,
+                 missing_images="fail", optimize_chrome=True, search_index=True):
+        if duplicate_policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy: {duplicate_policy}")
+        if missing_images not in MISSING_IMAGE_POLICIES:
+            raise ValueError(f"Unknown missing image policy: {missing_images}")
+        if duplicate_policy == "ask" and chooser is None:
+            raise ValueError("Duplicate policy 'ask' requires a chooser callback.")
+        self.template_file = template_file
+        self.content_folder = content_folder
+        self.site_folder = deploy_folder
+        self._use_output_folder(deploy_folder)
+        self.duplicate_policy = duplicate_policy
+        self.chooser = chooser
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_error = on_error
+        self.force = force
+        self.jobs = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+        self.responsive_images = responsive_images
+        self.lazy_languages = lazy_languages
+        self.write_manifest_txt = write_manifest_txt
+        self.service_worker = service_worker
+        self.fingerprint_assets = fingerprint_assets
+        self.minify = minify
+        self.precompress = precompress
+        self.releases = releases
+        self.use_parse_cache = parse_cache
+        # Releases are rebuilt from copies, so the parse cache is kept beside them.
+        cache_folder = releases_folder(deploy_folder) if releases else deploy_folder
+        self.parse_cache_file = os.path.join(cache_folder, PARSE_CACHE_FILE_NAME)
+        self.asset_index_file = os.path.join(cache_folder, ASSET_INDEX_FILE_NAME)
+        self.asset_index = None
+        self.missing_images = missing_images
+        self.missing_image_count = 0
+        self.profile_path = profile_path
+        self.max_in_flight = max_in_flight or 2 * self.jobs
+        self.write_threads = write_threads
+        self.writer = None
+        self.staged = []
+        self.staged_pages = []
+        self.pending_writes = []
+        self._last_progress = {}
+        self.build_count = 0
+        self.metrics = None
+        self.optimize_chrome = optimize_chrome
+        self.search_index = search_index
+        self.search = None
+        self.chrome = None
+        self.assets = None
+        self.template_assets = set()
+        self.service_worker_template = os.path.join(os.path.dirname(template_file), SERVICE_WORKER_TEMPLATE_NAME)
+        self.options = None
+        self.cache = None
+        self.content_hashes = {}
+        self.nav = {}
+        self.unchanged_files = []
+        self.result = None
+
+    def _use_output_folder(self, folder):
+        """
+        Direct every output of the following stages to 'folder' (the site
+        folder itself, or a new release of it).
+        """
+        self.deploy_folder = folder
+        self.manifest_file = os.path.join(folder, "manifest.txt")
+        self.staging_folder = os.path.join(folder, STAGING_FOLDER_NAME)
+
+    # --- Callback helpers ---
+    def _progress(self, stage, done, total, status=None):
+        """
+        Report progress (and an optional status line) at most every
+        PROGRESS_INTERVAL seconds per stage, and always for the last item,
+        so that a slow UI callback does not pace the build.
+        """
+        now = time.monotonic()
+        if done < total and now - self._last_progress.get(stage, 0) < PROGRESS_INTERVAL:
+            return
+        self._last_progress[stage] = now
+        if status:
+            self._status(status)
+        if self.on_progress:
+            self.on_progress(stage, done, total)
+
+    def _status(self, text):
+        if self.on_status:
+            self.on_status(text)
+
+    def _error(self, message):
+        self.result.errors.append(message)
+        logging.error(message)
+        if self.on_error:
+            self.on_error(message)
+
+    # --- Pipeline stages ---
+    def ensure_folders(self):
+        for folder in [os.path.dirname(self.template_file), self.content_folder, self.deploy_folder]:
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+                logging.info(f"Created folder: {folder}")
+
+    @timed("template")
+    def load_template(self):
+        """
+        Read and compile the template. Returns (template text, CompiledTemplate).
+        The returned text already has its chrome optimized and points at the
+        fingerprinted assets, so editing a logo invalidates every page.
+        """
+        try:
+            with open(self.template_file, "r", encoding="utf-8") as f:
+                template_content = f.read()
+            if not self.search_index:
+                template_content = remove_search_box(template_content)
+            if self.optimize_chrome:
+                self.chrome = ChromeOptimizer(os.path.join(self.deploy_folder, CHROME_FOLDER_NAME),
+                                              hasher=self.asset_index.hash_of)
+                template_content = self.chrome.rewrite_template(template_content)
+            else:
+                self.chrome = None
+            if self.fingerprint_assets:
+                self.assets = AssetFingerprinter(os.path.join(self.deploy_folder, ASSET_FOLDER_NAME))
+                self.template_assets = self.assets.template_assets(template_content)
+                template_content = self.assets.rewrite_template(template_content)
+            else:
+                self.assets = None
+            template = CompiledTemplate.compile(template_content)
+        except Exception as e:
+            raise BuildError("template", "Error reading template file: " + str(e),
+                             "Cannot read template file.")
+        logging.info(f"Template loaded successfully ({len(template.slots)} insertion points).")
+        return template_content, template
+
+    def resolve_duplicate(self, order, group):
+        group = sorted(group)
+        if self.duplicate_policy == "first":
+            choice = group[0]
+        elif self.duplicate_policy == "last":
+            choice = group[-1]
+        elif self.duplicate_policy == "ask":
+            choice = self.chooser(order, group)
+        else:
+            choice = None
+        if not choice:
+            raise BuildError("discover",
+                             f"No selection made for duplicate order {order} ({', '.join(group)}). Aborting.",
+                             f"Duplicate order {order} not resolved.")
+        if self.duplicate_policy != "ask":
+            logging.warning(f"Duplicate order {order}: using {choice} (policy '{self.duplicate_policy}').")
+        return choice
+
+    @timed("discover")
+    def discover(self):
+        """
+        Return the ordered list of content files to deploy, one per numeric order.
+        """
+        # List all content files with .txt or .md extension.
+        raw_files = [f for f in os.listdir(self.content_folder) if f.lower().endswith((".txt", ".md"))]
+        if not raw_files:
+            raise BuildError("discover", "No content files found in ContentFiles.")
+
+        # Group files by numeric order (extracted from filename).
+        file_groups = {}
+        for filename in raw_files:
+            match = ORDER_PATTERN.match(filename)
+            if match:
+                order = match.group(1)
+                file_groups.setdefault(order, []).append(filename)
+            else:
+                logging.warning(f"File {filename} does not have a numeric prefix; skipping.")
+
+        selected_files = []
+        for order in sorted(file_groups, key=lambda x: int(x)):
+            group = file_groups[order]
+            if len(group) == 1:
+                selected_files.append(group[0])
+            else:
+                selected_files.append(self.resolve_duplicate(order, group))
+        logging.info(f"Selected {len(selected_files)} files for processing.")
+        return selected_files
+
+    @timed("index")
+    def index_assets(self):
+        """
+        Load the PictureDeps index on the first build and bring it up to
+        date; later builds (e.g. in watch mode) only re-read changed files.
+        """
+        if self.asset_index is None:
+            self.asset_index = AssetIndex(PICTURE_FOLDER, self.asset_index_file)
+        self.asset_index.refresh()
+
+    def check_images(self, filename, images):
+        """
+        Report every picture placeholder of a page whose file is not in PictureDeps.
+        """
+        for img_path, _code in images:
+            if img_path in self.asset_index:
+                continue
+            suggestion = self.asset_index.suggest(img_path)
+            message = f"{filename}: picture {img_path} does not exist"
+            if suggestion:
+                message += f" (did you mean {suggestion}?)"
+            if self.missing_images == "fail":
+                self.missing_image_count += 1
+                self._error(message + ".")
+            else:
+                logging.warning(message + "; it is left out of the page.")
+
+    def check_unchanged_images(self):
+        """
+        Check the pictures recorded for every page left as it is, so a page
+        built under missing_images="warn" fails a later "fail" build too.
+        """
+        for filename in self.unchanged_files:
+            entry = self.cache.pages.get(filename)
+            if entry:
+                self.check_images(filename, [(img_path, None) for img_path in entry["assets"]])
+
+    def render_signature(self):
+        """
+        Identifies the renderer and every option that changes page output;
+        a cache written under another signature is stale.
+        """
+        options = ["responsive" if self.responsive_images else "plain"]
+        if self.lazy_languages:
+            options.append("lazy")
+        if self.fingerprint_assets:
+            options.append("fingerprint")
+        if self.minify:
+            options.append("min")
+        if self.search_index:
+            options.append("search")
+        return f"{RENDERER_VERSION}:" + ",".join(options)
+
+    @timed("plan")
+    def plan(self, template_content, selected_files, changed_files=None):
+        """
+        Load the build cache and return the files whose pages need rebuilding.
+
+        'changed_files' is an optional hint (from watch mode) naming the only
+        content files that may have changed; other pages already in a valid
+        cache are then assumed fresh without hashing anything.
+
+        The prev/next links baked into each page are part of its freshness,
+        so adding, removing or reordering a page also rebuilds its neighbours.
+        """
+        self.cache = BuildCache(self.deploy_folder, text_hash(template_content), self.render_signature(),
+                                hasher=self.asset_index.hash_of)
+        self.content_hashes = {}
+        output_names = [output_name_for(filename) for filename in selected_files]
+        self.nav = {}
+        for idx, filename in enumerate(selected_files):
+            self.nav[filename] = (output_names[idx - 1] if idx > 0 else None,
+                                  output_names[idx + 1] if idx + 1 < len(output_names) else None)
+        dirty_files = []
+        self.unchanged_files = []
+        for filename in selected_files:
+            nav = self.nav[filename]
+            if (changed_files is not None and filename not in changed_files and not self.force
+                    and self.cache.valid and self.cache.has_nav(filename, nav)):
+                self.unchanged_files.append(filename)
+                continue
+            content_hash = file_hash(os.path.join(self.content_folder, filename))
+            self.content_hashes[filename] = content_hash
+            if self.force or not self.cache.is_fresh(filename, content_hash, nav):
+                dirty_files.append(filename)
+            else:
+                self.unchanged_files.append(filename)
+        self.result.skipped_files.extend(output_name_for(filename) for filename in self.unchanged_files)
+        logging.info(f"{len(dirty_files)} of {len(selected_files)} page(s) need rebuilding.")
+        return dirty_files
+
+    def make_render_options(self):
+        """
+        Fresh RenderOptions for one build (derivative lookups are memoized
+        per build, so they must not outlive it).
+        """
+        derivatives = None
+        if self.responsive_images:
+            derivatives = ImageDerivatives(os.path.join(self.deploy_folder, DERIVATIVE_FOLDER_NAME))
+            if not derivatives.available:
+                logging.warning("Pillow is not installed; content images are linked without derivatives.")
+                derivatives = None
+        return RenderOptions(derivatives=derivatives, lazy_languages=self.lazy_languages, assets=self.assets,
+                             asset_index=self.asset_index)
+
+    def _page_done(self, filename, parse_seconds, render_seconds, done, total):
+        self.result.timings[filename] = (parse_seconds, render_seconds)
+        self.metrics.record("parse_file", parse_seconds, file=filename)
+        self.metrics.record("render_file", render_seconds, file=filename)
+        logging.info(f"Built {filename}: parse {parse_seconds * 1000:.1f} ms, "
+                      f"render {render_seconds * 1000:.1f} ms")
+        self._progress("parse", done, total)
+
+    def clear_parse_cache(self):
+        clear_parse_cache(self.parse_cache_file)
+
+    def _cached_data(self, parse_cache, filename):
+        if parse_cache is None:
+            return None
+        return parse_cache.get(os.path.join(self.content_folder, filename), self.content_hashes.get(filename))
+
+    @timed("build")
+    def build_pages(self, template, dirty_files):
+        """
+        Stream every dirty file through parse -> render -> write: each page
+        is written to the staging folder as soon as it is rendered, so at
+        most self.max_in_flight documents are held at once. Parse results
+        are taken from and added to the parse cache. The pictures of pages
+        left unchanged are checked too. Any failure discards
+        the staging folder, so nothing reaches the deployment folder unless
+        every file parsed and rendered.
+
+        With write_threads > 1 the files are written by a thread pool while
+        the next pages are rendered.
+        """
+        self.open_staging()
+        self.missing_image_count = 0
+        self.check_unchanged_images()
+        self.search = SearchIndex(self.deploy_folder, LANGUAGES) if self.search_index else None
+        parse_cache = None
+        if self.use_parse_cache and dirty_files:
+            parse_cache = ParseCache(self.parse_cache_file, parser_signature())
+        if self.write_threads > 1 and dirty_files:
+            self.writer = ThreadPoolExecutor(max_workers=self.write_threads, thread_name_prefix="write")
+        try:
+            total = len(dirty_files)
+            with contextlib.closing(self.iter_pages(template, dirty_files, parse_cache)) as pages:
+                for done, (filename, data, html, fragments) in enumerate(pages, start=1):
+                    self.stage_page(filename, data, html, fragments)
+                    if self.search:
+                        self.search.add_page(filename, self.content_hashes[filename], output_name_for(filename),
+                                             search_texts(data))
+                    self._progress("write", done, total, f"Generating for {filename} ({done} of {total})")
+            self._finish_writes()
+            if parse_cache:
+                logging.info(f"Parse cache: {parse_cache.hits} hit(s), {parse_cache.misses} miss(es).")
+            if self.missing_image_count:
+                raise BuildError("images", f"{self.missing_image_count} picture reference(s) point to missing files.",
+                                 "Some content files reference pictures that do not exist.")
+        except BaseException:
+            if self.writer:
+                self.writer.shutdown(wait=True, cancel_futures=True)
+            self.discard_staging()
+            raise
+        finally:
+            if self.writer:
+                self.writer.shutdown(wait=True)
+                self.writer = None
+            if parse_cache:
+                parse_cache.close()
+
+    def iter_pages(self, template, dirty_files, parse_cache=None):
+        """
+        Yield (filename, data, html, fragments) for every dirty file as soon
+        as it is rendered (in completion order when a pool is used). New
+        parse results are added to 'parse_cache'.
+        """
+        if self.jobs > 1 and len(dirty_files) > 1:
+            pages = self._iter_pages_parallel(template, dirty_files, parse_cache)
+        else:
+            pages = self._iter_pages_serial(template, dirty_files, parse_cache)
+        total = len(dirty_files)
+        with contextlib.closing(pages):
+            for done, (filename, data, html, fragments, parse_s, render_s, cached) in enumerate(pages, start=1):
+                if parse_cache and not cached:
+                    parse_cache.put(os.path.join(self.content_folder, filename), data,
+                                    self.content_hashes.get(filename))
+                self._page_done(filename, parse_s, render_s, done, total)
+                self.check_images(filename, data.images)
+                yield filename, data, html, fragments
+
+    def _iter_pages_serial(self, template, dirty_files, parse_cache):
+        for filename in dirty_files:
+            data = self._cached_data(parse_cache, filename)
+            try:
+                page = build_page(os.path.join(self.content_folder, filename), template, self.options,
+                                  self.nav[filename], data)
+            except PageError as e:
+                raise page_build_error(e)
+            yield (filename,) + page + (data is not None,)
+
+    def _iter_pages_parallel(self, template, dirty_files, parse_cache):
+        """
+        Keep at most self.max_in_flight files submitted to the pool; a new
+        one is submitted only after a finished page has been consumed.
+        """
+        window = max(1, self.max_in_flight)
+        logging.info(f"Building {len(dirty_files)} page(s) with {self.jobs} worker processes "
+                     f"({window} in flight).")
+        # Imported here: it loads multiprocessing, which serial builds never need.
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=min(self.jobs, len(dirty_files)),
+                                       initializer=_init_worker,
+                                       initargs=(template, self.options, active_log_file()))
+        queued = iter(dirty_files)
+        futures = {}
+        try:
+            while True:
+                for filename in itertools.islice(queued, window - len(futures)):
+                    data = self._cached_data(parse_cache, filename)
+                    future = executor.submit(_build_page_in_worker, os.path.join(self.content_folder, filename),
+                                             self.nav[filename], data)
+                    futures[future] = (filename, data is not None)
+                if not futures:
+                    break
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    filename, cached = futures.pop(future)
+                    try:
+                        page = future.result()
+                    except PageError as e:
+                        raise page_build_error(e)
+                    except Exception as e:
+                        raise page_build_error(PageError("parse", f"Error building {filename}: {e}"))
+                    yield (filename,) + page + (cached,)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def open_staging(self):
+        """
+        Start an empty staging folder, removing leftovers of an interrupted build.
+        """
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
+        os.makedirs(self.staging_folder)
+        self.staged = []
+        self.staged_pages = []
+        self.pending_writes = []
+
+    def discard_staging(self):
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
+        self.staged = []
+        self.staged_pages = []
+        self.pending_writes = []
+
+    def stage_page(self, filename, data, page_html, fragments):
+        """
+        Write the page and language fragments of one rebuilt file to the
+        staging folder (on the writer pool, if any) and record it in the
+        build cache once written. At most self.max_in_flight pages wait to
+        be written.
+        """
+        logging.info(f"Generating HTML for: {filename}")
+        output_filename = output_name_for(filename)
+        if self.minify:
+            original_size = len(page_html.encode("utf-8"))
+            page_html = minify_html(page_html)
+            logging.info(f"Minified {output_filename}: {original_size} -> "
+                         f"{len(page_html.encode('utf-8'))} bytes")
+        # Only warn about pages this pipeline did not generate itself.
+        if (os.path.exists(os.path.join(self.deploy_folder, output_filename))
+                and not self.cache.is_tracked(output_filename)):
+            self.result.overwritten_files.append(output_filename)
+        files = [(output_filename, page_html)]
+        files += [(fragment_name_for(output_filename, lang), text) for lang, text in fragments.items()]
+        if self.writer:
+            future = self.writer.submit(self._write_staged, filename, files)
+        else:
+            self._write_staged(filename, files)
+            future = None
+        self.pending_writes.append((future, filename, data.images, [name for name, _text in files]))
+        self._finish_writes(self.max_in_flight)
+
+    def _write_staged(self, filename, files):
+        with span("write_file", file=filename):
+            for name, text in files:
+                try:
+                    with open(os.path.join(self.staging_folder, name), "w", encoding="utf-8") as outf:
+                        outf.write(text)
+                except Exception as e:
+                    raise BuildError("write", f"Error writing {name}: {e}",
+                                     "Error while writing files. No files were deployed and no manifest was created.")
+
+    def _finish_writes(self, limit=0):
+        """
+        Wait for staged pages, oldest first, until at most 'limit' are
+        pending, and record each written page in the build cache.
+        """
+        while len(self.pending_writes) > limit:
+            future, filename, images, names = self.pending_writes.pop(0)
+            if future:
+                future.result()
+            self.cache.record(filename, self.content_hashes[filename], images, names[0], names[1:],
+                              self.nav[filename], output_folder=self.staging_folder)
+            self.staged.extend(names)
+            self.staged_pages.append(names[0])
+
+    @timed("write")
+    def write_pages(self, selected_files):
+        """
+        Move every staged file into the deployment folder (each move is
+        atomic) and return the manifest lines for all selected files.
+        Up-to-date pages are left alone.
+        """
+        self._status("All files valid. Publishing pages...")
+        self._finish_writes()
+        for name in self.staged:
+            try:
+                os.replace(os.path.join(self.staging_folder, name), os.path.join(self.deploy_folder, name))
+            except OSError as e:
+                raise BuildError("write", f"Error publishing {name}: {e}",
+                                 "Error while writing files. Partial files may exist, but no manifest was created.")
+        for output_filename in self.staged_pages:
+            logging.info(f"Generated HTML: {output_filename}")
+            self.result.generated_files.append(output_filename)
+        self.discard_staging()
+        self.remove_stale_fragments(selected_files)
+
+        manifest_lines = []
+        for idx, filename in enumerate(selected_files, start=1):
+            order_match = ORDER_PATTERN.match(filename)
+            order_str = order_match.group(1) if order_match else str(idx)
+            manifest_lines.append(f"{order_str}. {output_name_for(filename)}")
+        return manifest_lines
+
+    def remove_stale_fragments(self, selected_files):
+        """
+        Delete the language fragments (and their compressed siblings) that
+        no selected page lists in the build cache, e.g. after lazy languages
+        were turned off or a content file was removed or renamed.
+        """
+        current = {name for filename in selected_files for name in self.cache.outputs_of(filename)}
+        removed = 0
+        for name in os.listdir(self.deploy_folder):
+            source_name = name[:-3] if name.endswith((".gz", ".br")) else name
+            if not FRAGMENT_NAME_PATTERN.match(source_name) or source_name in current:
+                continue
+            try:
+                os.remove(os.path.join(self.deploy_folder, name))
+                removed += 1
+            except OSError as e:
+                logging.warning(f"Could not remove stale fragment {name}: {e}")
+        if removed:
+            logging.info(f"Removed {removed} stale language fragment file(s).")
+
+    @timed("manifest")
+    def write_manifest(self, manifest_lines):
+        if not self.write_manifest_txt:
+            return
+        manifest_text = "#Manifest\n" + "\n".join(manifest_lines)
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as mf:
+                if mf.read() == manifest_text:
+                    logging.info("Manifest unchanged.")
+                    return
+        except OSError:
+            pass
+        try:
+            with open(self.manifest_file, "w", encoding="utf-8") as mf:
+                mf.write(manifest_text)
+        except Exception as e:
+            raise BuildError("manifest", f"Error writing manifest.txt: {e}",
+                             "All HTML files were generated, but manifest.txt could not be written.")
+        self.result.manifest_written = True
+        logging.info("Manifest file written successfully.")
+
+    @timed("search")
+    def write_search_index(self, selected_files):
+        """
+        Write the per-language search shards for every deployed page, or
+        remove them when search is disabled. Unchanged pages missing from
+        the index (e.g. on the first build with search) are indexed here.
+        """
+        try:
+            if not self.search_index:
+                remove_search_index(self.deploy_folder)
+                return
+            missing = [filename for filename in selected_files if not self._is_indexed(filename)]
+            if missing:
+                self._index_unchanged_pages(missing)
+            written = self.search.write(selected_files)
+        except Exception as e:
+            raise BuildError("search", f"Error writing search index: {e}",
+                             "All HTML files were generated, but the search index could not be written.")
+        logging.info(f"Search index: {len(selected_files)} page(s), {written} shard(s) updated.")
+
+    def _is_indexed(self, filename):
+        content_hash = self.content_hashes.get(filename)
+        if content_hash is None:
+            # Skipped on watch mode's hint without hashing: unchanged.
+            return filename in self.search.pages
+        return self.search.has_page(filename, content_hash)
+
+    def _index_unchanged_pages(self, filenames):
+        parse_cache = ParseCache(self.parse_cache_file, parser_signature()) if self.use_parse_cache else None
+        try:
+            for filename in filenames:
+                path = os.path.join(self.content_folder, filename)
+                content_hash = self.content_hashes.get(filename) or file_hash(path)
+                data = parse_cache.get(path, content_hash) if parse_cache else None
+                if data is None:
+                    data = parse_content_file(path)
+                    if parse_cache:
+                        parse_cache.put(path, data, content_hash)
+                self.search.add_page(filename, content_hash, output_name_for(filename), search_texts(data))
+        finally:
+            if parse_cache:
+                parse_cache.close()
+        logging.info(f"Indexed {len(filenames)} unchanged page(s) for search.")
+
+    @timed("assets")
+    def write_asset_map(self, selected_files):
+        """
+        Record the fingerprinted assets used by the template and by every
+        deployed page (including unchanged ones) and remove stale copies,
+        stale chrome images and derivatives of images no page uses.
+        """
+        map_path = os.path.join(self.deploy_folder, ASSET_MAP_FILE_NAME)
+        try:
+            if self.chrome:
+                self.chrome.prune()
+            else:
+                shutil.rmtree(os.path.join(self.deploy_folder, CHROME_FOLDER_NAME), ignore_errors=True)
+            page_assets = set()
+            for filename in selected_files:
+                entry = self.cache.pages.get(filename)
+                if entry:
+                    page_assets.update(entry["assets"])
+            if self.options.derivatives:
+                self.options.derivatives.prune(page_assets)
+            else:
+                shutil.rmtree(os.path.join(self.deploy_folder, DERIVATIVE_FOLDER_NAME), ignore_errors=True)
+            if self.assets is None:
+                remove_fingerprinted_assets(os.path.join(self.deploy_folder, ASSET_FOLDER_NAME), map_path)
+                return
+            used = set(self.template_assets)
+            used.update(path for path in page_assets if self.options.links_original(path))
+            self.assets.write_map(map_path, used)
+        except Exception as e:
+            raise BuildError("assets", f"Error writing asset map: {e}",
+                             "All HTML files were generated, but the asset map could not be written.")
+
+    @timed("offline")
+    def write_offline_support(self, selected_files):
+        """
+        Write (or, when disabled, remove) the service worker and its precache
+        list covering every deployed page, its side files and assets.
+        """
+        try:
+            if not self.service_worker:
+                remove_service_worker(self.deploy_folder)
+                return
+            if not os.path.exists(self.service_worker_template):
+                logging.warning(f"{self.service_worker_template} not found; no service worker written.")
+                return
+            output_files = [name for filename in selected_files for name in self.cache.outputs_of(filename)]
+            if self.write_manifest_txt:
+                output_files.append(os.path.basename(self.manifest_file))
+            entries = build_precache_entries(self.deploy_folder, output_files, self.cache.asset_hash)
+            write_service_worker(self.deploy_folder, self.service_worker_template, entries)
+        except Exception as e:
+            raise BuildError("offline", f"Error writing service worker: {e}",
+                             "All HTML files were generated, but the service worker could not be written.")
+
+    @timed("compress")
+    def precompress_outputs(self):
+        """
+        Write .gz/.br siblings for every changed text output, or remove all
+        siblings when precompression is off (stale ones would be served).
+        """
+        try:
+            if not self.precompress:
+                remove_compressed(self.deploy_folder, orphans_only=False)
+                return
+            # Derivative sidecars in img/ are build metadata, not served text.
+            compressed = precompress_folder(self.deploy_folder, skip_folders=(DERIVATIVE_FOLDER_NAME,))
+        except Exception as e:
+            raise BuildError("compress", f"Error writing compressed files: {e}",
+                             "All HTML files were generated, but the compressed copies could not be written.")
+        for path, (size, sizes) in sorted(compressed.items()):
+            packed = ", ".join(f"{ext[1:]} {packed_size}" for ext, packed_size in sorted(sizes.items()))
+            logging.info(f"Compressed {os.path.relpath(path, self.deploy_folder)}: {size} bytes -> {packed}")
+        logging.info(f"{len(compressed)} file(s) compressed.")
+
+    @timed("release")
+    def open_release(self):
+        """
+        Start a new release from a copy of the live site and send every
+        output of this build there. Returns its path.
+        """
+        try:
+            path = create_release(self.site_folder, skip=(STAGING_FOLDER_NAME, PARSE_CACHE_FILE_NAME))
+        except OSError as e:
+            raise BuildError("release", f"Error preparing a new release: {e}",
+                             "Could not prepare a new release. Nothing was deployed.")
+        self._use_output_folder(path)
+        logging.info(f"Building release {os.path.basename(path).lstrip('.')}.")
+        return path
+
+    @timed("activate")
+    def publish_release(self, path):
+        """
+        Switch the site link to the finished release in one atomic rename
+        and delete releases beyond the ones kept for rollback.
+        """
+        try:
+            release_id = activate_release(self.site_folder, path)
+        except OSError as e:
+            raise BuildError("release", f"Error activating the new release: {e}",
+                             "The new release was built but could not be activated. The previous site is still live.")
+        logging.info(f"Release {release_id} is live.")
+        try:
+            removed = prune_releases(self.site_folder, self.releases)
+        except OSError as e:
+            logging.warning(f"Could not remove old releases: {e}")
+        else:
+            if removed:
+                logging.info(f"Removed {removed} old release(s).")
+
+    @timed("save_cache")
+    def save_cache(self, selected_files):
+        self.cache.prune(selected_files)
+        try:
+            self.cache.save()
+        except OSError as e:
+            # A missing cache only costs a full rebuild next time.
+            logging.warning(f"Could not save build cache: {e}")
+
+    def run(self, changed_files=None):
+        """
+        Run the full pipeline once and return a BuildResult. Never raises
+        BuildError; failures are reported through the result and callbacks.
+        'changed_files' is passed on to plan().
+        """
+        self.result = result = BuildResult()
+        self._last_progress = {}
+        self.build_count += 1
+        self.metrics = result.metrics = BuildMetrics(build=self.build_count)
+        profiler = cProfile.Profile() if self.profile_path else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            with collecting(self.metrics):
+                self._run_pipeline(result, changed_files)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(self.profile_path)
+                logging.info(f"Profile written to {self.profile_path}.")
+            self.metrics.record("total", time.perf_counter() - start, ok=result.ok,
+                                generated=len(result.generated_files), skipped=len(result.skipped_files))
+            logging.info("Build timings:\n" + self.metrics.summary_table())
+        return result
+
+    def _run_pipeline(self, result, changed_files):
+        logging.info("Processing started.")
+        self._status("Starting processing...")
+        release = None
+        try:
+            if self.releases:
+                release = self.open_release()
+            self.ensure_folders()
+            self.index_assets()
+            template_content, template = self.load_template()
+            result.selected_files = self.discover()
+            dirty_files = self.plan(template_content, result.selected_files, changed_files)
+            self.options = self.make_render_options()
+            self.build_pages(template, dirty_files)
+            manifest_lines = self.write_pages(result.selected_files)
+            self.write_manifest(manifest_lines)
+            self.write_search_index(result.selected_files)
+            self.write_asset_map(result.selected_files)
+            self.write_offline_support(result.selected_files)
+            self.precompress_outputs()
+            self.save_cache(result.selected_files)
+            if release:
+                self.publish_release(release)
+        except BuildError as e:
+            result.stage = e.stage
+            result.summary = e.summary
+            if release:
+                discard_release(release)
+                if e.stage != "release":
+                    result.summary += " The previous release is still live."
+            self._error(str(e))
+            self._status(STAGE_STATUS.get(e.stage, "Error encountered. Processing aborted."))
+            logging.error(f"Processing aborted during stage '{e.stage}'.")
+            return
+        finally:
+            self._use_output_folder(self.site_folder)
+
+        if result.overwritten_files:
+            logging.warning(f"Warning! {len(result.overwritten_files)} file(s) were overwritten:\n"
+                            + "\n".join(result.overwritten_files))
+        result.ok = True
+        if result.skipped_files:
+            result.summary = (f"Processing complete. {len(result.generated_files)} file(s) generated, "
+                              f"{len(result.skipped_files)} unchanged.")
+        else:
+            result.summary = "Processing complete. All files have been generated."
+        self._status("Processing complete.")
+        logging.info("Processing complete.")
+
+
+# Status line shown after a stage aborts the build.
+STAGE_STATUS = {
+    "template": "Error encountered. Cannot read template file.",
+    "discover": "Error encountered while selecting files. No files generated.",
+    "parse": "Error encountered during parsing. No files generated.",
+    "render": "Error encountered while rendering. No files generated.",
+    "images": "Error encountered. Missing pictures; no files generated.",
+    "write": "Error encountered while writing files. No manifest created.",
+    "manifest": "Error encountered. Manifest not created.",
+    "search": "Error encountered. Search index not written.",
+    "assets": "Error encountered. Asset map not written.",
+    "offline": "Error encountered. Service worker not written.",
+    "compress": "Error encountered. Compressed files not written.",
+    "release": "Error encountered. The previous release is still live.",
+}
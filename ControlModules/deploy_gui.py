@@ -0,0 +1,121 @@
+"""
+Deployment processor window: a progress bar, the error list and a Start
+button around DeployEngine. Duplicate content files are resolved through a
+dialog. Started by "python -m ControlModules gui" (or deploy.py without a
+command).
+"""
+import logging
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox
+
+from deploy_engine import DeployEngine
+
+# Message box title shown when a build stage aborts.
+ABORT_TITLES = {
+    "template": "Error",
+    "manifest": "Deployment Partial",
+    "search": "Deployment Partial",
+    "assets": "Deployment Partial",
+    "offline": "Deployment Partial",
+    "compress": "Deployment Partial",
+    "release": "Deployment Aborted",
+    "images": "Missing Pictures",
+}
+
+# --- Duplicate File Chooser Dialog ---
+def choose_file_dialog(options, title="Duplicate Files Detected", prompt="Select one file to use for this order:"):
+    dialog = tk.Toplevel()
+    dialog.title(title)
+    tk.Label(dialog, text=prompt).pack(padx=10, pady=10)
+    listbox = tk.Listbox(dialog, selectmode=tk.SINGLE, width=50)
+    listbox.pack(padx=10, pady=10)
+    for option in options:
+        listbox.insert(tk.END, option)
+    chosen = []
+    def on_ok():
+        selection = listbox.curselection()
+        if selection:
+            chosen.append(listbox.get(selection[0]))
+        dialog.destroy()
+    ok_button = tk.Button(dialog, text="OK", command=on_ok)
+    ok_button.pack(pady=10)
+    dialog.transient()   # Show on top
+    dialog.grab_set()    # Make modal
+    dialog.wait_window()
+    if chosen:
+        return chosen[0]
+    else:
+        return None
+
+class ProcessorUI:
+    def __init__(self, master, profile_path=None):
+        self.master = master
+        self.profile_path = profile_path
+        master.title("Deployment Processor")
+        self.progress_label = tk.Label(master, text="Progress:")
+        self.progress_label.pack(pady=5)
+        self.progress_bar = ttk.Progressbar(master, orient=tk.HORIZONTAL, length=400, mode="determinate")
+        self.progress_bar.pack(pady=5)
+        self.error_label = tk.Label(master, text="Errors:")
+        self.error_label.pack(pady=5)
+        self.error_text = scrolledtext.ScrolledText(master, width=60, height=10)
+        self.error_text.pack(pady=5)
+        self.start_button = tk.Button(master, text="Start Processing", command=self.process_files)
+        self.start_button.pack(pady=10)
+        self.status_label = tk.Label(master, text="")
+        self.status_label.pack(pady=5)
+        self.errors = []
+        logging.info("Deployment Processor initialized.")
+
+    def log_error(self, message):
+        self.errors.append(message)
+        self.error_text.insert(tk.END, message + "\n")
+        self.error_text.see(tk.END)
+
+    def set_status(self, text):
+        self.status_label.config(text=text)
+        self.master.update_idletasks()
+
+    def set_progress(self, stage, done, total):
+        self.progress_bar["maximum"] = total
+        self.progress_bar["value"] = done
+        self.master.update_idletasks()
+
+    def choose_duplicate(self, order, options):
+        return choose_file_dialog(options, title=f"Duplicate Order {order}",
+                                  prompt=f"Multiple files found for order {order}. Choose one:")
+
+    def process_files(self):
+        self.start_button.config(state=tk.DISABLED)
+        self.error_text.delete("1.0", tk.END)
+        self.errors.clear()
+
+        engine = DeployEngine(
+            duplicate_policy="ask",
+            chooser=self.choose_duplicate,
+            on_progress=self.set_progress,
+            on_status=self.set_status,
+            on_error=self.log_error,
+            profile_path=self.profile_path,
+        )
+        result = engine.run()
+
+        if not result.ok:
+            title = ABORT_TITLES.get(result.stage, "Deployment Aborted")
+            if result.stage == "template":
+                messagebox.showerror(title, result.summary)
+            elif result.summary:
+                messagebox.showwarning(title, result.summary)
+        else:
+            if result.overwritten_files:
+                warning_message = (f"Warning! {len(result.overwritten_files)} file(s) were overwritten:\n"
+                                   + "\n".join(result.overwritten_files))
+                messagebox.showwarning("Files Overwritten", warning_message)
+            messagebox.showinfo("Done", result.summary)
+        self.start_button.config(state=tk.NORMAL)
+        return result
+
+def run_gui(profile_path=None):
+    root = tk.Tk()
+    app = ProcessorUI(root, profile_path)
+    root.mainloop()
@@ -0,0 +1,23 @@
+"""
+Folder names and option values shared by the build engine and the command
+line. This module imports nothing, so the command line can offer these
+choices without loading the engine.
+"""
+
+# Folder paths
+TEMPLATE_FOLDER = "Template"
+CONTENT_FOLDER = "ContentFiles"
+DEPLOY_FOLDER = "DeploymentFiles"
+PICTURE_FOLDER = "PictureDeps"
+
+# How to resolve several content files sharing one numeric order:
+#   fail  - abort the build (default for unattended runs)
+#   first - use the alphabetically first file
+#   last  - use the alphabetically last file
+#   ask   - call the engine's chooser callback (used by the GUI)
+DUPLICATE_POLICIES = ("fail", "first", "last", "ask")
+
+# What to do when a content file references a picture missing from PictureDeps:
+#   fail - abort the build, listing every missing picture (default)
+#   warn - log a warning and leave the picture out of the page
+MISSING_IMAGE_POLICIES = ("fail", "warn")
@@ -0,0 +1,140 @@
+"""
+Conservative minifier for the generated pages.
+
+Only transformations that cannot change what a page shows or does are made:
+  - HTML comments are removed and runs of whitespace between and inside tags
+    collapse to a single space;
+  - inline CSS loses comments and the whitespace around { } ; , and :
+  - inline JS loses comments and indentation, but line breaks are kept (so
+    automatic semicolon insertion still sees them) and every string,
+    template literal (the titles/contents objects) and regex is copied
+    verbatim.
+<pre> and <textarea> blocks are never touched.
+"""
+import re
+
+# Blocks whose text must be handled separately from the surrounding HTML.
+RAW_BLOCK_RE = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+CSS_COLON_RE = re.compile(r':\s+')
+
+# Characters after which a '/' starts a regex literal rather than a division.
+JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+
+def minify_css(css):
+    css = CSS_COMMENT_RE.sub("", css)
+    css = WHITESPACE_RE.sub(" ", css)
+    css = CSS_PUNCTUATION_RE.sub(r"\1", css)
+    # Only declarations have ": "; selectors such as "a :hover" are left alone.
+    css = CSS_COLON_RE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _js_quoted_end(js, start):
+    """
+    Return the index just past the string/template literal starting at 'start'.
+    """
+    quote = js[start]
+    i = start + 1
+    while i < len(js):
+        if js[i] == "\\":
+            i += 2
+            continue
+        if js[i] == quote:
+            return i + 1
+        i += 1
+    return len(js)
+
+
+def _js_regex_end(js, start):
+    """
+    Return the index just past the regex literal starting at 'start' (flags included).
+    """
+    i = start + 1
+    in_class = False
+    while i < len(js):
+        char = js[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            break
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(js) and (js[i].isalnum() or js[i] == "_"):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def minify_js(js):
+    out = []
+    pending_space = ""   # Whitespace seen since the last emitted token: "", " " or "\n".
+    i = 0
+    length = len(js)
+
+    def last_char():
+        return out[-1][-1] if out else ""
+
+    while i < length:
+        char = js[i]
+        if char.isspace():
+            pending_space = "\n" if char == "\n" or pending_space == "\n" else " "
+            i += 1
+            continue
+        if char == "/" and js.startswith("//", i):
+            end = js.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        if char == "/" and js.startswith("/*", i):
+            end = js.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            pending_space = pending_space or " "
+            continue
+        if char in "'\"`":
+            end = _js_quoted_end(js, i)
+        elif char == "/" and last_char() in JS_REGEX_PRECEDERS:
+            end = _js_regex_end(js, i)
+        else:
+            end = i + 1
+            while end < length and not js[end].isspace() and js[end] not in "'\"`/":
+                end += 1
+        if out and pending_space:
+            out.append(pending_space)
+        pending_space = ""
+        out.append(js[i:end])
+        i = end
+    return "".join(out)
+
+
+def _minify_html_text(text):
+    text = HTML_COMMENT_RE.sub("", text)
+    return WHITESPACE_RE.sub(" ", text)
+
+
+def minify_html(page):
+    """
+    Return the minified text of a whole HTML page.
+    """
+    parts = []
+    position = 0
+    for match in RAW_BLOCK_RE.finditer(page):
+        parts.append(_minify_html_text(page[position:match.start()]))
+        open_tag, tag_name, body, close_tag = match.group(1), match.group(2).lower(), match.group(3), match.group(4)
+        if tag_name == "style":
+            body = minify_css(body)
+        elif tag_name == "script" and "src=" not in open_tag.lower():
+            body = minify_js(body)
+        parts.append(_minify_html_text(open_tag) + body + close_tag)
+        position = match.end()
+    parts.append(_minify_html_text(page[position:]))
+    return "".join(parts).strip()
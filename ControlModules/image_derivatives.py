@@ -0,0 +1,229 @@
+"""
+Responsive image derivatives for content images.
+
+Every PictureDeps image referenced by a page is resized to a few widths and
+re-encoded as WebP plus a JPEG (opaque) or PNG (transparent) fallback. The
+derivatives are written to DeploymentFiles/img under names containing the
+source hash, together with a small JSON sidecar describing them, so an
+unchanged image is never re-encoded and concurrent workers can never produce
+conflicting files.
+"""
+import os
+import re
+import json
+import shutil
+import logging
+import importlib.util
+
+from build_cache import file_hash
+
+DERIVATIVE_FOLDER_NAME = "img"
+DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+HASH_LENGTH = 12
+# Bump when the derivatives of an unchanged source change, so sidecars of
+# older builds are regenerated.
+DERIVATIVE_FORMAT = 2
+# Widest fallback used as <img src> (the srcset offers the larger ones).
+SRC_MAX_WIDTH = 1024
+# Sources a browser without WebP support can be given as they are.
+FALLBACK_SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Source formats worth re-encoding (GIFs may be animated, SVGs are vectors).
+SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+# Rendered width of an image for each size letter, used for the 'sizes' attribute.
+SIZE_HINTS = {"s": "25vw", "m": "50vw", "l": "75vw", "w": "100vw"}
+
+UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+_image_module = None
+
+
+def pillow_installed():
+    """
+    True if Pillow can be imported (checked without importing it).
+    """
+    return importlib.util.find_spec("PIL") is not None
+
+
+def pil_image():
+    """
+    PIL.Image, imported on first use (so builds that read and encode no
+    images skip Pillow), or None if Pillow is not installed.
+    """
+    global _image_module
+    if _image_module is None:
+        try:
+            from PIL import Image
+        except ImportError:
+            Image = False
+        _image_module = Image
+    return _image_module or None
+
+
+def resample_filter():
+    Image = pil_image()
+    return getattr(Image, "Resampling", Image).LANCZOS
+
+
+def _save_atomic(image, path, **save_args):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(tmp_path, **save_args)
+    os.replace(tmp_path, path)
+
+
+def src_candidate(fallbacks):
+    """
+    File name for <img src>: the widest fallback up to SRC_MAX_WIDTH, or
+    the narrowest one if all are wider.
+    """
+    fitting = [(width, name) for name, width in fallbacks if width <= SRC_MAX_WIDTH]
+    if fitting:
+        return max(fitting)[1]
+    return min((width, name) for name, width in fallbacks)[1]
+
+
+class ImageDerivatives:
+    """
+    Creates and describes the derivatives of source images.
+
+    'output_folder' is where derivative files go, 'url_prefix' is how pages
+    refer to that folder.
+    """
+    def __init__(self, output_folder, url_prefix=DERIVATIVE_FOLDER_NAME + "/"):
+        self.output_folder = output_folder
+        self.url_prefix = url_prefix
+        self._described = {}  # img_path -> description, per process.
+
+    @property
+    def available(self):
+        return pillow_installed()
+
+    def describe(self, img_path):
+        """
+        Return {"width", "height", "webp": [(file, width)], "fallback": [(file, width)]}
+        for an image, generating the derivatives if needed. None when the
+        image cannot or should not be converted.
+        """
+        if img_path not in self._described:
+            self._described[img_path] = self._describe(img_path)
+        return self._described[img_path]
+
+    def _describe(self, img_path):
+        if not img_path.lower().endswith(SUPPORTED_EXTENSIONS) or pil_image() is None:
+            return None
+        digest = file_hash(img_path)
+        if digest is None:
+            return None
+        stem = UNSAFE_NAME_RE.sub("_", os.path.splitext(os.path.basename(img_path))[0])
+        base_name = f"{stem}.{digest[:HASH_LENGTH]}"
+        sidecar_path = os.path.join(self.output_folder, base_name + ".json")
+        try:
+            with open(sidecar_path, "r", encoding="utf-8") as f:
+                description = json.load(f)
+            files = [name for name, _w in description["webp"] + description["fallback"]]
+            if description.get("format") == DERIVATIVE_FORMAT and all(os.path.exists(os.path.join(self.output_folder, name)) for name in files):
+                return description
+        except (OSError, ValueError, KeyError):
+            pass
+        try:
+            description = self._generate(img_path, base_name)
+        except Exception as e:
+            logging.warning(f"Could not create derivatives for {img_path}: {e}")
+            return None
+        tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(description, f)
+        os.replace(tmp_path, sidecar_path)
+        return description
+
+    def _generate(self, img_path, base_name):
+        from PIL import ImageOps
+        os.makedirs(self.output_folder, exist_ok=True)
+        with pil_image().open(img_path) as source:
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        orig_w, orig_h = image.size
+        # Skip widths too close to the largest one to be worth a file.
+        widths = [w for w in DERIVATIVE_WIDTHS if w < min(orig_w, DERIVATIVE_WIDTHS[-1]) * 0.9]
+        widths.append(min(orig_w, DERIVATIVE_WIDTHS[-1]))
+
+        description = {"format": DERIVATIVE_FORMAT, "width": widths[-1],
+                       "height": round(orig_h * widths[-1] / orig_w), "webp": [], "fallback": []}
+        fallback_ext = "png" if has_alpha else "jpg"
+        source_size = os.path.getsize(img_path)
+        source_ext = os.path.splitext(img_path)[1].lower()
+        original_name = None
+        for width in widths:
+            height = max(1, round(orig_h * width / orig_w))
+            resized = image if width == orig_w else image.resize((width, height), resample=resample_filter())
+            webp_name = f"{base_name}.{width}.webp"
+            fallback_name = f"{base_name}.{width}.{fallback_ext}"
+            _save_atomic(resized, os.path.join(self.output_folder, webp_name), format="WEBP",
+                         quality=WEBP_QUALITY, method=4)
+            if has_alpha:
+                _save_atomic(resized, os.path.join(self.output_folder, fallback_name), format="PNG", compress_level=9)
+            else:
+                _save_atomic(resized, os.path.join(self.output_folder, fallback_name), format="JPEG",
+                             quality=JPEG_QUALITY, optimize=True, progressive=True)
+            description["webp"].append((webp_name, width))
+            if (source_ext in FALLBACK_SOURCE_EXTENSIONS
+                    and os.path.getsize(os.path.join(self.output_folder, fallback_name)) >= source_size):
+                # Re-encoding made it bigger (e.g. a well-optimized PNG):
+                # offer the original file, at its own width, instead.
+                os.remove(os.path.join(self.output_folder, fallback_name))
+                if original_name is None:
+                    original_name = f"{base_name}.{orig_w}{source_ext}"
+                    tmp_path = os.path.join(self.output_folder, f"{original_name}.{os.getpid()}.tmp")
+                    shutil.copyfile(img_path, tmp_path)
+                    os.replace(tmp_path, os.path.join(self.output_folder, original_name))
+                    description["fallback"].append((original_name, orig_w))
+                continue
+            description["fallback"].append((fallback_name, width))
+        logging.info(f"Created {len(widths)} derivative width(s) for {img_path}.")
+        return description
+
+    def prune(self, img_paths):
+        """
+        Delete the derivatives and sidecars (and their compressed siblings)
+        of every image not in 'img_paths', the images of the deployed pages.
+        """
+        if not os.path.isdir(self.output_folder):
+            return
+        keep = set()
+        for img_path in img_paths:
+            description = self.describe(img_path)
+            if description is None:
+                continue
+            names = [name for name, _w in description["webp"] + description["fallback"]]
+            keep.update(names)
+            # "<stem>.<hash>.<width>.<ext>" -> sidecar "<stem>.<hash>.json"
+            keep.add(names[0].rsplit(".", 2)[0] + ".json")
+        removed = 0
+        for name in os.listdir(self.output_folder):
+            source_name = name[:-3] if name.endswith((".gz", ".br")) else name
+            if source_name not in keep:
+                os.remove(os.path.join(self.output_folder, name))
+                removed += 1
+        if removed:
+            logging.info(f"Removed {removed} stale image derivative file(s).")
+
+    def image_tag(self, img_path, code, style):
+        """
+        Return a <picture> element with srcset/sizes for the image, or None
+        if no derivatives are available (the caller then links the original).
+        """
+        description = self.describe(img_path)
+        if description is None:
+            return None
+        sizes = SIZE_HINTS.get(code[:1], "100vw")
+        webp_srcset = ", ".join(f"{self.url_prefix}{name} {width}w" for name, width in description["webp"])
+        fallback_srcset = ", ".join(f"{self.url_prefix}{name} {width}w" for name, width in description["fallback"])
+        fallback_src = self.url_prefix + src_candidate(description["fallback"])
+        return (f'<picture><source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}" />'
+                f'<img src="{fallback_src}" srcset="{fallback_srcset}" sizes="{sizes}" '
+                f'width="{description["width"]}" height="{description["height"]}" loading="lazy" decoding="async" '
+                f'class="content-image" style="{style}" /></picture>')
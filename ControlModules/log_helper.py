@@ -1,29 +1,107 @@
+import os
+import json
+import atexit
 import logging
+import logging.handlers
+import queue
 
-def setup_logging(log_file="deploy.log", level=logging.DEBUG):
-    # Create a custom logger.
-    logger = logging.getLogger("deploy_logger")
-    logger.setLevel(level)
-    
-    # Avoid duplicate handlers if setup_logging is called multiple times.
-    if not logger.handlers:
-        # Create handlers: one for the log file, one for the console.
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(level)
-        
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Records of this logger carry structured fields (see metrics.py) and are
+# also written, one JSON object per line, to the metrics file.
+METRICS_LOGGER_NAME = "deploy.metrics"
+
+# Text log file of the current process (inherited by pool workers).
+_log_file = None
+_listener = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object: time, level, message and the
+    record's 'metrics' fields.
+    """
+    def format(self, record):
+        entry = {"time": self.formatTime(record, DATE_FORMAT), "level": record.levelname,
+                 "message": record.getMessage()}
+        entry.update(getattr(record, "metrics", {}))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_folder="Logs", log_file="deploy.log", metrics_file="metrics.jsonl",
+                  level=logging.DEBUG, console_level=None):
+    """
+    Configure the root logger to hand records to a queue; a background
+    listener thread writes them to Logs/deploy.log (text) and the metric
+    records also to Logs/metrics.jsonl, so logging never blocks a build on
+    file I/O. Pass console_level to also echo records to stderr. Safe to
+    call more than once.
+    """
+    global _log_file, _listener
+    if _listener is not None:
+        return logging.getLogger()
+    os.makedirs(log_folder, exist_ok=True)
+    _log_file = os.path.join(log_folder, log_file)
+
+    # Create handlers: the text log, the metrics file and optionally the console.
+    file_handler = logging.FileHandler(_log_file, encoding="utf-8")
+    file_handler.setLevel(level)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+    metrics_handler = logging.FileHandler(os.path.join(log_folder, metrics_file), encoding="utf-8")
+    metrics_handler.addFilter(logging.Filter(METRICS_LOGGER_NAME))
+    metrics_handler.setFormatter(JsonLineFormatter())
+    handlers = [file_handler, metrics_handler]
+    if console_level is not None:
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.ERROR)  # Show only errors on console.
-        
-        # Create a formatter and add it to the handlers.
-        formatter = logging.Formatter(
-            "%(asctime)s [%(levelname)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers to the logger.
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-    
+        console_handler.setLevel(console_level)
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the program ends.
+    atexit.register(shutdown_logging)
     return logger
+
+
+def shutdown_logging():
+    """
+    Flush the queue, stop the listener and close the log files, e.g. before
+    removing the log folder. setup_logging() may be called again afterwards.
+    """
+    global _log_file, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    for handler in _listener.handlers:
+        handler.close()
+    _log_file = None
+    _listener = None
+
+
+def active_log_file():
+    return _log_file
+
+
+def setup_worker_logging(log_file):
+    """
+    Logging for a pool worker process: the parent's queue listener does not
+    exist there, so records are appended to the text log directly.
+    """
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+        logger.addHandler(file_handler)
+        logger.setLevel(logging.DEBUG)
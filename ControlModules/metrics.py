@@ -0,0 +1,111 @@
+"""
+Lightweight build instrumentation.
+
+A BuildMetrics collector records timing spans for the pipeline stages and
+per-file operations. Every span is also logged on the "deploy.metrics"
+logger with its fields attached, which log_helper writes to
+Logs/metrics.jsonl as one JSON object per line. At the end of a build the
+collector renders a summary table.
+
+    metrics = BuildMetrics(build=1)
+    with collecting(metrics):
+        with span("discover"):
+            ...
+        metrics.record("parse", 0.012, file="1.Uvod.md")
+
+Functions decorated with @timed("name") record a span into the collector
+that is currently collecting (and are plain calls otherwise).
+"""
+import time
+import logging
+import functools
+import contextlib
+
+from log_helper import METRICS_LOGGER_NAME
+
+metrics_logger = logging.getLogger(METRICS_LOGGER_NAME)
+
+# Collector of the build in progress (one build runs at a time per process).
+_current = None
+
+
+class BuildMetrics:
+    """
+    Spans of one build: a list of (name, seconds, fields) in recording order.
+    """
+    def __init__(self, build=None):
+        self.build = build
+        self.spans = []
+
+    def record(self, name, seconds, **fields):
+        self.spans.append((name, seconds, fields))
+        entry = {"build": self.build, "span": name, "ms": round(seconds * 1000, 3)}
+        entry.update(fields)
+        metrics_logger.debug(f"span {name} {seconds * 1000:.1f} ms {fields or ''}".rstrip(),
+                             extra={"metrics": entry})
+
+    @contextlib.contextmanager
+    def span(self, name, **fields):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            fields["failed"] = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def summary_rows(self):
+        """
+        Return [(name, count, total_s, mean_s, max_s)] per span name, in the
+        order the names first appeared.
+        """
+        grouped = {}
+        for name, seconds, _fields in self.spans:
+            grouped.setdefault(name, []).append(seconds)
+        return [(name, len(values), sum(values), sum(values) / len(values), max(values))
+                for name, values in grouped.items()]
+
+    def summary_table(self):
+        lines = [f"{'Span':<22} {'Count':>6} {'Total ms':>10} {'Mean ms':>10} {'Max ms':>10}"]
+        for name, count, total, mean, longest in self.summary_rows():
+            lines.append(f"{name:<22} {count:>6} {total * 1000:>10.1f} {mean * 1000:>10.1f} {longest * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def collecting(metrics):
+    """
+    Make 'metrics' the collector used by span() and @timed while the block runs.
+    """
+    global _current
+    previous, _current = _current, metrics
+    try:
+        yield metrics
+    finally:
+        _current = previous
+
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """
+    Time the block into the current collector (no-op without one).
+    """
+    if _current is None:
+        yield
+        return
+    with _current.span(name, **fields):
+        yield
+
+
+def timed(name):
+    """
+    Decorator recording every call of the function as a span.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+"""
+Precompiled page template.
+
+Template/Template.html is scanned once per build and split into static
+segments around named insertion points (slots). Rendering a page is then a
+single join of segments and values, instead of running one regex over the
+whole document per slot.
+
+Slots:
+    title        - inner HTML of <title>
+    header       - inner HTML of <div id="header-title">
+    content      - inner HTML of <div id="content-text">
+    titles_js    - the whole "const titles = {...};" statement
+    contents_js  - the whole "const contents = {...};" statement
+    prev_link    - the href attribute of <a id="prev-arrow">
+    next_link    - the href attribute of <a id="next-arrow">
+"""
+import re
+import logging
+
+SLOT_NAMES = ("title", "header", "content", "titles_js", "contents_js", "prev_link", "next_link")
+
+TITLE_OPEN_RE = re.compile(r'<title>', re.IGNORECASE)
+TITLE_CLOSE_RE = re.compile(r'</title>', re.IGNORECASE)
+HEADER_OPEN_RE = re.compile(r'<div\s+[^>]*id=["\']header-title["\'][^>]*>')
+CONTENT_OPEN_RE = re.compile(r'<div\s+[^>]*id=["\']content-text["\'][^>]*>')
+DIV_TAG_RE = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+JS_TITLES_RE = re.compile(r'const\s+titles\s*=\s*\{[^}]*\};', re.DOTALL)
+JS_CONTENTS_RE = re.compile(r'const\s+contents\s*=\s*\{[^}]*\};', re.DOTALL)
+PREV_LINK_RE = re.compile(r'<a\s+[^>]*id=["\']prev-arrow["\'][^>]*>')
+NEXT_LINK_RE = re.compile(r'<a\s+[^>]*id=["\']next-arrow["\'][^>]*>')
+HREF_ATTR_RE = re.compile(r'\bhref\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+
+
+def inner_div_span(template_content, open_re):
+    """
+    Return the (start, end) span of the inner HTML of the div matched by
+    open_re, honouring nested divs. None if the div is missing or unclosed.
+    """
+    match = open_re.search(template_content)
+    if not match:
+        return None
+    depth = 1
+    for tag in DIV_TAG_RE.finditer(template_content, match.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return match.end(), tag.start()
+    return None
+
+
+def _title_span(template_content):
+    match = TITLE_OPEN_RE.search(template_content)
+    if not match:
+        return None
+    close = TITLE_CLOSE_RE.search(template_content, match.end())
+    if not close:
+        return None
+    return match.end(), close.start()
+
+
+def _href_span(template_content, tag_re):
+    """
+    Return the span of the whole href="..." attribute of the tag matched by tag_re.
+    """
+    tag = tag_re.search(template_content)
+    if not tag:
+        return None
+    attr = HREF_ATTR_RE.search(tag.group(0))
+    if not attr:
+        return None
+    return tag.start() + attr.start(), tag.start() + attr.end()
+
+
+def _statement_span(template_content, statement_re):
+    match = statement_re.search(template_content)
+    return match.span() if match else None
+
+
+class CompiledTemplate:
+    """
+    Immutable slot-based template: len(segments) == len(slots) + 1 and a
+    rendered page is segments[0] + value(slots[0]) + segments[1] + ...
+    """
+    __slots__ = ("segments", "slots")
+
+    def __init__(self, segments, slots):
+        object.__setattr__(self, "segments", tuple(segments))
+        object.__setattr__(self, "slots", tuple(slots))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledTemplate is immutable")
+
+    def __reduce__(self):
+        return (CompiledTemplate, (self.segments, self.slots))
+
+    @classmethod
+    def compile(cls, template_content):
+        """
+        Locate every slot in the template text. Slots that are missing are
+        left out (their values are ignored when rendering), as the old
+        regex substitutions silently did.
+        """
+        spans = {
+            "title": _title_span(template_content),
+            "header": inner_div_span(template_content, HEADER_OPEN_RE),
+            "content": inner_div_span(template_content, CONTENT_OPEN_RE),
+            "titles_js": _statement_span(template_content, JS_TITLES_RE),
+            "contents_js": _statement_span(template_content, JS_CONTENTS_RE),
+            "prev_link": _href_span(template_content, PREV_LINK_RE),
+            "next_link": _href_span(template_content, NEXT_LINK_RE),
+        }
+        found = []
+        for name in SLOT_NAMES:
+            if spans[name] is None:
+                logging.warning(f"Template has no '{name}' insertion point; it will not be filled.")
+            else:
+                found.append((spans[name][0], spans[name][1], name))
+        found.sort()
+
+        segments = []
+        slots = []
+        position = 0
+        for start, end, name in found:
+            if start < position:
+                raise ValueError(f"Template insertion point '{name}' overlaps another one.")
+            segments.append(template_content[position:start])
+            slots.append(name)
+            position = end
+        segments.append(template_content[position:])
+        return cls(segments, slots)
+
+    def render(self, values):
+        """
+        Build a page from a {slot name: text} mapping in a single join.
+        """
+        segments = self.segments
+        parts = [segments[0]]
+        for index, name in enumerate(self.slots, start=1):
+            parts.append(values[name])
+            parts.append(segments[index])
+        return "".join(parts)
@@ -0,0 +1,176 @@
+"""
+Persistent cache of parsed content files.
+
+parse_content_file results are stored in a small SQLite database
+(DeploymentFiles/.parsecache) keyed by the content file's path, size,
+modification time and content hash together with the parser version. The
+stored content key also names the parse mode (.md or .txt), so a file
+renamed to the other extension is never served the other format's parse. A
+build that has to re-render pages (e.g. after a template edit) then reads
+the parsed data from the cache instead of running the Markdown engine again.
+The database is kept under a size limit by evicting the least recently used
+entries.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+
+from build_cache import file_hash
+from content_parser import ContentDocument, parse_mode
+
+PARSE_CACHE_FILE_NAME = ".parsecache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    version TEXT NOT NULL,
+    data TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_hash ON entries (content_hash, version);
+CREATE INDEX IF NOT EXISTS entries_by_use ON entries (last_used);
+"""
+
+
+def content_key(filepath, content_hash):
+    """
+    Content hash qualified by the parse mode: identical bytes parse
+    differently as .md and as .txt.
+    """
+    return f"{parse_mode(filepath)}:{content_hash}"
+
+
+def _decode(text):
+    return ContentDocument.from_dict(json.loads(text))
+
+
+class ParseCache:
+    """
+    Parsed-data store for one deployment folder. Open it for a build, use
+    get/put from the thread that opened it, then close() it, which also
+    enforces the size limit.
+    """
+    def __init__(self, path, parser_version, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.parser_version = parser_version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        try:
+            self._open()
+        except sqlite3.Error as e:
+            logging.warning(f"Parse cache unreadable ({e}); starting a new one.")
+            try:
+                clear_parse_cache(path)
+                self._open()
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Parse cache unusable ({e}); parsing without it.")
+                self.db = None
+
+    def _open(self):
+        self.db = sqlite3.connect(self.path)
+        try:
+            self.db.executescript(SCHEMA)
+        except sqlite3.Error:
+            self.db.close()
+            self.db = None
+            raise
+
+    def get(self, filepath, content_hash=None):
+        """
+        Return the cached parse result for a content file, or None. Pass
+        the file's content hash if it is already known.
+        """
+        if self.db is None:
+            return None
+        try:
+            stat = os.stat(filepath)
+            row = self.db.execute(
+                "SELECT data FROM entries WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?"
+                + (" AND content_hash = ?" if content_hash else ""),
+                (filepath, stat.st_size, stat.st_mtime_ns, self.parser_version)
+                + ((content_key(filepath, content_hash),) if content_hash else ())).fetchone()
+            if row is None:
+                # Touched, renamed or copied files: look up by content instead.
+                key = content_key(filepath, content_hash or file_hash(filepath))
+                row = self.db.execute("SELECT data FROM entries WHERE content_hash = ? AND version = ? LIMIT 1",
+                                      (key, self.parser_version)).fetchone()
+                if row is not None:
+                    self._store(filepath, stat, key, row[0])
+            else:
+                self.db.execute("UPDATE entries SET last_used = ? WHERE path = ?", (time.time(), filepath))
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Parse cache lookup failed for {filepath}: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _decode(row[0])
+
+    def put(self, filepath, data, content_hash=None):
+        """
+        Remember the parse result (a ContentDocument) of a content file.
+        """
+        if self.db is None:
+            return
+        try:
+            stat = os.stat(filepath)
+            self._store(filepath, stat, content_key(filepath, content_hash or file_hash(filepath)),
+                        json.dumps(data.to_dict(), ensure_ascii=False))
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Could not cache parse result of {filepath}: {e}")
+
+    def _store(self, filepath, stat, key, text):
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (path, size, mtime_ns, content_hash, version, data, bytes, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (filepath, stat.st_size, stat.st_mtime_ns, key, self.parser_version, text,
+             len(text.encode("utf-8")), time.time()))
+
+    def evict(self):
+        """
+        Drop entries of other parser versions, then the least recently used
+        entries until the cache fits in max_bytes.
+        """
+        self.db.execute("DELETE FROM entries WHERE version != ?", (self.parser_version,))
+        total = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for path, size in self.db.execute("SELECT path, bytes FROM entries ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM entries WHERE path = ?", (path,))
+            total -= size
+            evicted += 1
+        logging.info(f"Parse cache: evicted {evicted} least recently used entries.")
+
+    def close(self):
+        if self.db is None:
+            return
+        try:
+            self.evict()
+            self.db.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not save parse cache: {e}")
+        finally:
+            self.db.close()
+            self.db = None
+
+
+def clear_parse_cache(path):
+    """
+    Delete the parse cache database, if any.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+        logging.info("Parse cache cleared.")
@@ -0,0 +1,157 @@
+"""
+Precompressed siblings for static hosting.
+
+Every text output of the deploy folder gets "<file>.gz" and, when the
+brotli package is installed, "<file>.br" next to it, for hosts that serve
+precompressed files but do not compress on the fly. A sibling carries the
+modification time of its source, so unchanged files are not recompressed.
+Files that do not get smaller (e.g. a tiny manifest.txt) get no sibling;
+they are listed in DeploymentFiles/.precompress with their size and
+modification time, so they are not compressed again until they change.
+"""
+import os
+import gzip
+import json
+import logging
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Already-compressed formats (PNG, JPEG, WebP) gain nothing.
+COMPRESSIBLE_EXTENSIONS = (".html", ".json", ".js", ".txt", ".svg", ".css")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+SKIP_FILE_NAME = ".precompress"
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input.
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+def compressors():
+    """
+    Return [(extension, function)] for the available compression formats.
+    """
+    available = [(".gz", _gzip)]
+    if brotli is not None:
+        available.append((".br", _brotli))
+    return available
+
+
+def compressible_files(folder, skip_folders=()):
+    """
+    Yield the paths of all files below 'folder' worth compressing. Hidden
+    files such as the build cache and the given subfolders are skipped.
+    """
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".")
+                   and not (root == folder and d in skip_folders)]
+        for name in files:
+            if not name.startswith(".") and name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def load_skips(folder):
+    """
+    Return {relative path: {"size", "mtime_ns", "formats"}} of the files
+    whose listed formats did not get smaller.
+    """
+    try:
+        with open(os.path.join(folder, SKIP_FILE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_skips(folder, skips):
+    path = os.path.join(folder, SKIP_FILE_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(skips, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _write_sibling(path, data, mtime_ns):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def precompress_folder(folder, skip_folders=()):
+    """
+    Write missing or outdated compressed siblings for every compressible
+    file below 'folder' (except 'skip_folders') and delete siblings whose
+    source is gone. Formats recorded as not smaller for an unchanged file
+    are not tried again.
+    Returns {path: (original bytes, {extension: compressed bytes})} for
+    the files that were (re)compressed.
+    """
+    formats = compressors()
+    if brotli is None:
+        logging.warning("brotli is not installed; writing .gz files only.")
+    compressed = {}
+    old_skips = load_skips(folder)
+    skips = {}
+    for path in compressible_files(folder, skip_folders):
+        source_stat = os.stat(path)
+        key = os.path.relpath(path, folder).replace(os.sep, "/")
+        skipped = old_skips.get(key)
+        if (skipped and skipped["size"] == source_stat.st_size
+                and skipped["mtime_ns"] == source_stat.st_mtime_ns):
+            skipped_formats = set(skipped["formats"])
+        else:
+            skipped_formats = set()
+        outdated = [(ext, func) for ext, func in formats if ext not in skipped_formats
+                    and (not os.path.exists(path + ext)
+                         or os.stat(path + ext).st_mtime_ns != source_stat.st_mtime_ns)]
+        if outdated:
+            with open(path, "rb") as f:
+                data = f.read()
+            sizes = {}
+            for ext, func in outdated:
+                packed = func(data)
+                if len(packed) >= len(data):
+                    if os.path.exists(path + ext):
+                        os.remove(path + ext)
+                    skipped_formats.add(ext)
+                    continue
+                _write_sibling(path + ext, packed, source_stat.st_mtime_ns)
+                sizes[ext] = len(packed)
+            if sizes:
+                compressed[path] = (len(data), sizes)
+        if skipped_formats:
+            skips[key] = {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns,
+                          "formats": sorted(skipped_formats)}
+    if skips != old_skips:
+        save_skips(folder, skips)
+    remove_compressed(folder)
+    return compressed
+
+
+def remove_compressed(folder, orphans_only=True):
+    """
+    Delete .gz/.br siblings below 'folder' whose source file no longer
+    exists, or all of them (and the list of skipped files) with
+    orphans_only=False.
+    """
+    if not orphans_only and os.path.exists(os.path.join(folder, SKIP_FILE_NAME)):
+        os.remove(os.path.join(folder, SKIP_FILE_NAME))
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            base, ext = os.path.splitext(name)
+            if ext not in (".gz", ".br") or not base.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            if orphans_only and os.path.exists(os.path.join(root, base)):
+                continue
+            os.remove(os.path.join(root, name))
+            logging.info(f"Removed {name}.")
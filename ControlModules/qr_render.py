@@ -0,0 +1,219 @@
+"""
+Module-exact QR code rendering.
+
+A QR code is taken as its module matrix (qrcode.QRCode.get_matrix(), quiet
+zone included) and drawn straight at the requested resolution instead of
+resampling the library's default image:
+
+- raster: every module becomes an exact block of module_px x module_px
+  pixels in one vectorized NumPy step (without NumPy, Pillow's
+  nearest-neighbour scaling gives the same pixels), so print-size plaques
+  render as quickly and sharply as screen-size codes;
+- vector: one SVG path of merged module runs, with the logo embedded as a
+  PNG, for print shops that want artwork at any size.
+
+The logo sits in a white square ("hole") in the centre, aligned to the
+module grid. hole_problems() checks that the hole leaves the finder,
+timing and format/version patterns intact and destroys no more codewords
+than the error correction can restore, keeping SAFE_RECOVERY_SHARE of
+that capacity as the limit so a scratched or dirty plaque still scans.
+(From version 7 on a centred logo always covers the middle alignment
+pattern; readers then use the neighbouring ones.)
+"""
+import io
+import math
+import base64
+
+import qrcode
+from qrcode.base import rs_blocks
+from PIL import Image
+
+QUIET_ZONE = 4
+MM_PER_INCH = 25.4
+# Share of the error-correction capacity the hole may use; the rest is left
+# for dirt, glare and wear on the printed code.
+SAFE_RECOVERY_SHARE = 0.8
+# Finder pattern, separator and format information in each of three corners.
+FINDER_ZONE = 9
+
+_numpy_module = None
+
+
+def _numpy():
+    """
+    NumPy, imported on first use (so runs with nothing to render skip it),
+    or None if it is not installed.
+    """
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+class QRSymbol:
+    """
+    Module matrix of one QR code: 'modules' is a list of rows of booleans
+    (True = dark), 'size' modules square including the quiet zone.
+    """
+    def __init__(self, data, error_correction=qrcode.constants.ERROR_CORRECT_H, border=QUIET_ZONE):
+        qr = qrcode.QRCode(error_correction=error_correction, border=border)
+        qr.add_data(data)
+        qr.make(fit=True)
+        self.version = qr.version
+        self.error_correction = error_correction
+        self.border = border
+        self.modules = qr.get_matrix()
+        self.size = len(self.modules)
+
+    @property
+    def symbol_size(self):
+        """Size in modules without the quiet zone."""
+        return self.size - 2 * self.border
+
+    def hole_span(self, hole):
+        """(first, last + 1) module of a centred hole, in matrix coordinates."""
+        start = (self.size - hole) // 2
+        return start, start + hole
+
+
+def module_px_for(symbol, size_mm=None, dpi=None, default=10):
+    """
+    Pixels per module for a code printed 'size_mm' wide at 'dpi'. Modules
+    stay whole pixels, so the result is at most the requested size.
+    """
+    if not size_mm or not dpi:
+        return default
+    target_px = size_mm / MM_PER_INCH * dpi
+    return max(1, int(target_px // symbol.size))
+
+
+def damaged_codewords(hole):
+    """
+    Upper bound of the codewords a hole x hole square of modules touches:
+    codewords are placed in columns two modules wide, mostly four rows tall.
+    """
+    if hole <= 0:
+        return 0
+    return (math.ceil(hole / 2) + 1) * (math.ceil(hole / 4) + 1)
+
+
+def hole_problems(symbol, hole):
+    """
+    Return the reasons a centred hole of 'hole' modules makes the code
+    unreliable (an empty list if it is safe).
+    """
+    if hole <= 0:
+        return []
+    problems = []
+    # A centred square clear of the corner zones also misses the timing
+    # patterns (row and column 6) and the version information next to them.
+    if symbol.hole_span(hole)[0] - symbol.border < FINDER_ZONE:
+        problems.append("it covers the finder, timing or format patterns")
+
+    blocks = rs_blocks(symbol.version, symbol.error_correction)
+    capacity = min((block.total_count - block.data_count) // 2 for block in blocks)
+    # Codewords are interleaved across the blocks, so a damaged area is spread evenly.
+    per_block = math.ceil(damaged_codewords(hole) / len(blocks))
+    if per_block > capacity * SAFE_RECOVERY_SHARE:
+        problems.append(f"it may destroy {per_block} codewords per block, the error correction "
+                        f"restores {capacity} ({SAFE_RECOVERY_SHARE:.0%} of that is the limit)")
+    return problems
+
+
+def hole_for(symbol, fraction):
+    """
+    Hole size in modules covering 'fraction' of the code's width, with the
+    parity of the code so it is exactly centred.
+    """
+    hole = int(round(symbol.size * fraction))
+    if (symbol.size - hole) % 2:
+        hole -= 1
+    return max(0, hole)
+
+
+def safe_hole(symbol, hole):
+    """
+    Largest hole not bigger than 'hole' that passes hole_problems().
+    """
+    while hole > 0 and hole_problems(symbol, hole):
+        hole -= 2
+    return max(0, hole)
+
+
+def rasterize(symbol, module_px, hole=0):
+    """
+    Return the code as a grayscale image of exactly module_px pixels per
+    module, with a white hole of 'hole' modules in the centre.
+    """
+    start, end = symbol.hole_span(hole)
+    np = _numpy()
+    if np is not None:
+        dark = np.array(symbol.modules, dtype=bool)
+        dark[start:end, start:end] = False
+        pixels = np.where(dark, 0, 255).astype(np.uint8)
+        return Image.fromarray(pixels.repeat(module_px, axis=0).repeat(module_px, axis=1))
+    image = Image.new("L", (symbol.size, symbol.size))
+    image.putdata([0 if dark and not (start <= y < end and start <= x < end) else 255
+                   for y, row in enumerate(symbol.modules) for x, dark in enumerate(row)])
+    return image.resize((symbol.size * module_px,) * 2, resample=Image.NEAREST)
+
+
+def render_png(symbol, module_px, hole=0, logo=None):
+    """
+    Rasterize the code and paste 'logo' (RGBA, fitted to the hole) in the centre.
+    """
+    image = rasterize(symbol, module_px, hole).convert("RGB")
+    if logo is not None and hole:
+        start = symbol.hole_span(hole)[0] * module_px
+        hole_px = hole * module_px
+        image.paste(logo, (start + (hole_px - logo.width) // 2, start + (hole_px - logo.height) // 2), mask=logo)
+    return image
+
+
+def svg_path(symbol, hole=0):
+    """
+    SVG path data of the dark modules, one sub-path per horizontal run.
+    """
+    start, end = symbol.hole_span(hole)
+    parts = []
+    for y, row in enumerate(symbol.modules):
+        x = 0
+        while x < symbol.size:
+            if not row[x] or (start <= y < end and start <= x < end):
+                x += 1
+                continue
+            run = x
+            while run < symbol.size and row[run] and not (start <= y < end and start <= run < end):
+                run += 1
+            parts.append(f"M{x} {y}h{run - x}v1h{x - run}z")
+            x = run
+    return "".join(parts)
+
+
+def render_svg(symbol, hole=0, logo=None, size_mm=None):
+    """
+    Return the code as an SVG document (one unit per module). 'logo' (RGBA)
+    is embedded as a PNG in the hole; 'size_mm' sets the printed size.
+    """
+    size = symbol.size
+    dimensions = f' width="{size_mm:g}mm" height="{size_mm:g}mm"' if size_mm else ""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'viewBox="0 0 {size} {size}"{dimensions} shape-rendering="crispEdges">',
+        f'<rect width="{size}" height="{size}" fill="#fff"/>',
+        f'<path fill="#000" d="{svg_path(symbol, hole)}"/>',
+    ]
+    if logo is not None and hole:
+        buffer = io.BytesIO()
+        logo.save(buffer, format="PNG")
+        data = base64.b64encode(buffer.getvalue()).decode("ascii")
+        start = symbol.hole_span(hole)[0]
+        parts.append(f'<image x="{start}" y="{start}" width="{hole}" height="{hole}" '
+                     f'preserveAspectRatio="xMidYMid meet" xlink:href="data:image/png;base64,{data}"/>')
+    parts.append("</svg>\n")
+    return "".join(parts)
@@ -1,9 +1,15 @@
 import qrcode
 import os
-import requests
-from PIL import Image, ImageDraw
+import sys
+import json
+import hashlib
+import argparse
+from functools import lru_cache
+from PIL import Image
 from io import BytesIO
 
+import qr_render
+
 try:
     from PIL import ImageResampling
     RESAMPLE_FILTER = ImageResampling.LANCZOS
@@ -23,118 +29,258 @@ BASE_URL = f"https://{GITHUB_USERNAME}.github.io/{REPO_NAME}"
 # deploy.py is in the "Control Modules" folder, so we go one level up to the root.
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOGO_PATH = os.path.join(CURRENT_DIR, "..", "PictureDeps", "Logos", "BoudaLogo.PNG")
+
+# Base folder for QR codes and the per-folder index of what was generated.
+BASE_QR_FOLDER = "QRCodes"
+QR_INDEX_FILE = ".qrindex.json"
+ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_H
+ERROR_CORRECTION_NAME = "H"
+# Logo hole: share of the QR code's width (shrunk if level H cannot recover it).
+HOLE_FRACTION = 0.3
+# Pixels per module of screen-size codes (without a print size and DPI).
+DEFAULT_MODULE_PX = 10
+# Resolution of the logo embedded in SVG codes.
+SVG_LOGO_SIZE = 1024
+# Bumped when the rendering changes, so indexed codes are regenerated.
+QR_RENDERER_VERSION = 2
 # =========================
 
-def generate_qr_code(url, output_name, subfolder, debug=False):
+@lru_cache(maxsize=1)
+def load_logo_data():
+    """
+    Read the logo file once per process. Returns (bytes, sha256 hex digest).
+    """
+    if not os.path.exists(LOGO_PATH):
+        raise FileNotFoundError(f"Logo file not found at {LOGO_PATH}")
+    with open(LOGO_PATH, "rb") as f:
+        logo_data = f.read()
+    return logo_data, hashlib.sha256(logo_data).hexdigest()
+
+@lru_cache(maxsize=8)
+def prepare_logo(hole_size):
+    """
+    Decode the logo and resize it to fit a hole_size x hole_size square while
+    preserving its aspect ratio. Memoized, so every QR code of the same size
+    reuses the same resized logo.
+    """
+    logo_data, _digest = load_logo_data()
+    logo = Image.open(BytesIO(logo_data)).convert("RGBA")
+    orig_w, orig_h = logo.size
+    aspect_ratio = orig_w / orig_h
+
+    # Compute new dimensions so that both width and height are <= hole_size
+    if aspect_ratio >= 1:
+        # Logo is wider than tall or square: limit width to hole_size
+        new_w = hole_size
+        new_h = int(hole_size / aspect_ratio)
+    else:
+        # Logo is taller than wide: limit height to hole_size
+        new_h = hole_size
+        new_w = int(hole_size * aspect_ratio)
+
+    return logo.resize((new_w, new_h), resample=RESAMPLE_FILTER)
+
+def logo_hash():
+    """
+    Hash of the current logo file, or None if it is missing.
+    """
+    try:
+        return load_logo_data()[1]
+    except OSError:
+        return None
+
+def qr_symbol(url):
+    """
+    Return the QR module matrix of a URL and the size of its logo hole in
+    modules: HOLE_FRACTION of the width, shrunk to what level H can recover.
+    """
+    symbol = qr_render.QRSymbol(url, error_correction=ERROR_CORRECTION)
+    wanted = qr_render.hole_for(symbol, HOLE_FRACTION)
+    hole = qr_render.safe_hole(symbol, wanted)
+    if hole < wanted:
+        problems = "; ".join(qr_render.hole_problems(symbol, wanted))
+        print(f"⚠️ Logo hole of {wanted} modules is unsafe for {url} ({problems}); using {hole} modules.")
+    return symbol, hole
+
+def _logo_or_none(size):
+    try:
+        return prepare_logo(size)
+    except Exception as e:
+        print(f"Logo load failed: {e}. Proceeding without logo.")
+        return None
+
+def render_qr_image(url, size_mm=None, dpi=None):
+    """
+    Build the QR code image for a URL with the logo centered in a white
+    square ("hole"). Every module is exactly the same number of pixels: the
+    default screen size, or as many as fit 'size_mm' at 'dpi' for print.
+    """
+    symbol, hole = qr_symbol(url)
+    module_px = qr_render.module_px_for(symbol, size_mm, dpi, default=DEFAULT_MODULE_PX)
+    logo = _logo_or_none(hole * module_px) if hole else None
+    return qr_render.render_png(symbol, module_px, hole, logo)
+
+def render_qr_svg(url, size_mm=None):
+    """
+    Build the QR code for a URL as SVG text, with the logo embedded.
+    """
+    symbol, hole = qr_symbol(url)
+    logo = _logo_or_none(SVG_LOGO_SIZE) if hole else None
+    return qr_render.render_svg(symbol, hole, logo, size_mm=size_mm)
+
+def generate_qr_code(url, output_name, subfolder, debug=False, size_mm=None, dpi=None, svg=False):
     """
     Generate a QR code for the given URL and save it as output_name_QRCode.png
     inside QRCodes/<subfolder> folder.
     A white square ("hole") (30% of the QR code's width) is created in the center.
     The logo is resized to fit within this square while preserving its aspect ratio,
     and then centered within the white square.
+    With size_mm and dpi the PNG is rendered for print at that size and
+    resolution; svg=True also saves output_name_QRCode.svg.
     If debug is True, the logo is saved for verification.
     """
-    # Base folder for QR codes
-    base_qr_folder = "QRCodes"
-    target_folder = os.path.join(base_qr_folder, subfolder)
+    target_folder = os.path.join(BASE_QR_FOLDER, subfolder)
     os.makedirs(target_folder, exist_ok=True)
 
-    # Create QR code with high error correction
-    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_H)
-    qr.add_data(url)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
-    
-    # Dimensions of the QR code
-    qr_width, qr_height = qr_img.size
-    # White hole size: 30% of QR code width (square)
-    hole_size = int(qr_width * 0.3)
-    hole_pos = ((qr_width - hole_size) // 2, (qr_height - hole_size) // 2)
-    
-    # Draw white square (the hole)
-    draw = ImageDraw.Draw(qr_img)
-    draw.rectangle([hole_pos, (hole_pos[0] + hole_size, hole_pos[1] + hole_size)], fill="white")
-    
-    # Load the logo from the local repository
-    try:
-        if not os.path.exists(LOGO_PATH):
-            raise FileNotFoundError(f"Logo file not found at {LOGO_PATH}")
-        with open(LOGO_PATH, "rb") as f:
-            logo_data = f.read()
-        
-        if debug:
+    if debug:
+        try:
             logo_debug_path = os.path.join(target_folder, f"{output_name}_LogoDebug.png")
             with open(logo_debug_path, "wb") as f:
-                f.write(logo_data)
+                f.write(load_logo_data()[0])
             print(f"[DEBUG] Logo loaded and saved as {logo_debug_path}")
-        
-        logo = Image.open(BytesIO(logo_data)).convert("RGBA")
-        orig_w, orig_h = logo.size
-        aspect_ratio = orig_w / orig_h
-        
-        # Compute new dimensions so that both width and height are <= hole_size
-        if aspect_ratio >= 1:
-            # Logo is wider than tall or square: limit width to hole_size
-            new_w = hole_size
-            new_h = int(hole_size / aspect_ratio)
-        else:
-            # Logo is taller than wide: limit height to hole_size
-            new_h = hole_size
-            new_w = int(hole_size * aspect_ratio)
-        
-        logo = logo.resize((new_w, new_h), resample=RESAMPLE_FILTER)
-        
-        # Calculate offset within the white square to center the logo
-        offset_x = (hole_size - new_w) // 2
-        offset_y = (hole_size - new_h) // 2
-        paste_pos = (hole_pos[0] + offset_x, hole_pos[1] + offset_y)
-        
-        # Paste the logo using its alpha channel (if available)
-        qr_img.paste(logo, paste_pos, mask=logo)
-    except Exception as e:
-        print(f"Logo load or paste failed: {e}. Proceeding without logo.")
+        except OSError as e:
+            print(f"[DEBUG] Logo could not be saved: {e}")
+
+    qr_img = render_qr_image(url, size_mm=size_mm, dpi=dpi)
 
     # Save final QR code image
     file_path = os.path.join(target_folder, f"{output_name}_QRCode.png")
-    qr_img.save(file_path)
+    if dpi:
+        qr_img.save(file_path, dpi=(dpi, dpi))
+    else:
+        qr_img.save(file_path)
+    if svg:
+        with open(os.path.join(target_folder, f"{output_name}_QRCode.svg"), "w", encoding="utf-8") as f:
+            f.write(render_qr_svg(url, size_mm=size_mm))
     print(f"✅ QR code saved as '{file_path}'. URL: {url}")
+    return file_path
+
+def _generate_for_batch(url, output_name, subfolder, size_mm=None, dpi=None, svg=False):
+    generate_qr_code(url, output_name, subfolder, size_mm=size_mm, dpi=dpi, svg=svg)
+    return output_name
 
-def main():
-    print("Select an option:")
-    print("1: Deploy (Generate QR codes for all HTML files in 'DeploymentFiles')")
-    print("1d: Deploy in debug mode (also saves the logo for verification)")
-    print("2: TestFiles (Generate a single QR code for a file in 'TestHTMLFiles')")
-    choice = input("Enter your choice: ").strip()
-    debug_mode = (choice == "1d")
-    
-    if choice in ["1", "1d"]:
-        folder_name = "DeploymentFiles"
-        html_files = [f for f in os.listdir(folder_name) if f.lower().endswith(".html")]
-        if not html_files:
-            print("No .html files found in the DeploymentFiles folder.")
-            return
-        print("Generating QR codes for all .html files in DeploymentFiles...")
+def load_qr_index(target_folder):
+    try:
+        with open(os.path.join(target_folder, QR_INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_qr_index(target_folder, index):
+    path = os.path.join(target_folder, QR_INDEX_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def generate_qr_codes(targets, subfolder, workers=None, force=False, size_mm=None, dpi=None, svg=False):
+    """
+    Generate QR codes for many (url, output_name) pairs into QRCodes/<subfolder>.
+    size_mm, dpi and svg are passed on to generate_qr_code().
+
+    A code is skipped when its files exist and the sidecar index records the
+    same URL, error-correction level, logo hash and output settings. The remaining codes are
+    rendered in a pool of worker processes (workers=None uses every CPU,
+    workers=1 renders in this process). Returns (generated, skipped) names.
+    """
+    target_folder = os.path.join(BASE_QR_FOLDER, subfolder)
+    os.makedirs(target_folder, exist_ok=True)
+    index = load_qr_index(target_folder)
+    current_logo = logo_hash()
+
+    todo = []
+    skipped = []
+    for url, output_name in targets:
+        record = {"url": url, "error_correction": ERROR_CORRECTION_NAME, "logo": current_logo,
+                  "renderer": QR_RENDERER_VERSION, "size_mm": size_mm, "dpi": dpi, "svg": svg}
+        extensions = ("png", "svg") if svg else ("png",)
+        paths = [os.path.join(target_folder, f"{output_name}_QRCode.{ext}") for ext in extensions]
+        if not force and index.get(output_name) == record and all(os.path.exists(path) for path in paths):
+            skipped.append(output_name)
+        else:
+            todo.append((url, output_name, record))
+
+    generated = []
+    if todo:
+        if workers == 1 or len(todo) == 1:
+            for url, output_name, _record in todo:
+                generated.append(_generate_for_batch(url, output_name, subfolder, size_mm, dpi, svg))
+        else:
+            # Imported here: it loads multiprocessing, which small batches never need.
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_generate_for_batch, url, output_name, subfolder, size_mm, dpi, svg)
+                           for url, output_name, _record in todo]
+                # Collect in submission order; the first failure propagates.
+                generated = [future.result() for future in futures]
+        for url, output_name, record in todo:
+            index[output_name] = record
+        save_qr_index(target_folder, index)
+    return generated, skipped
+
+def main(argv=None, prog=None):
+    """
+    Generate QR codes from the command line (also "python -m ControlModules qr"):
+    one for every page in DeploymentFiles, or for a single TestHTMLFiles page
+    with --test-page. Returns the exit status.
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="Generate QR codes for the deployed pages.")
+    parser.add_argument("--test-page", metavar="NAME",
+                        help="Generate one code for TestHTMLFiles/NAME (into QRCodes/Targetted) "
+                             "instead of every page in DeploymentFiles.")
+    parser.add_argument("--extension", default=".html",
+                        help="File extension of the --test-page (default: .html).")
+    parser.add_argument("--debug", action="store_true",
+                        help="Also save the logo next to each code for verification (renders one by one).")
+    parser.add_argument("--size-mm", type=float, metavar="MM",
+                        help="Render print artwork MM wide into QRCodes/PrintQR: a PNG at --dpi and an SVG.")
+    parser.add_argument("--dpi", type=int, default=600, help="Resolution of print artwork (default: 600).")
+    parser.add_argument("--svg", action="store_true", help="Also write an SVG of every code.")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Render in N processes (default: one per CPU).")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate codes even if the index lists them as up to date.")
+    args = parser.parse_args(argv)
+    dpi = args.dpi if args.size_mm else None
+    svg = args.svg or args.size_mm is not None
+
+    if args.test_page:
+        extension = args.extension if args.extension.startswith(".") else f".{args.extension}"
+        hosted_url = f"{BASE_URL}/TestHTMLFiles/{args.test_page}{extension}"
+        generate_qr_code(hosted_url, args.test_page, "Targetted", debug=args.debug, size_mm=args.size_mm, dpi=dpi,
+                         svg=svg)
+        print("Test file QR code generated successfully.")
+        return 0
+
+    folder_name = "DeploymentFiles"
+    html_files = sorted(f for f in os.listdir(folder_name) if f.lower().endswith(".html"))
+    if not html_files:
+        print("No .html files found in the DeploymentFiles folder.")
+        return 1
+    subfolder = "PrintQR" if args.size_mm else "DeploymentQR"
+    print(f"Generating QR codes for all .html files in DeploymentFiles into QRCodes/{subfolder}...")
+    if args.debug:
         for html_file in html_files:
-            base_name = os.path.splitext(html_file)[0]
             hosted_url = f"{BASE_URL}/DeploymentFiles/{html_file}"
-            generate_qr_code(hosted_url, base_name, "DeploymentQR", debug=debug_mode)
-        print("All deployment QR codes generated successfully.")
-    
-    elif choice == "2":
-        folder_name = "TestHTMLFiles"
-        page_name = input("Enter the HTML page name (without extension): ").strip()
-        if not page_name:
-            print("No page name provided. Exiting.")
-            return
-        extension = input("Enter file extension (default is .html): ").strip()
-        if not extension.startswith("."):
-            extension = f".{extension}" if extension else ".html"
-        hosted_url = f"{BASE_URL}/{folder_name}/{page_name}{extension}"
-        generate_qr_code(hosted_url, page_name, "Targetted", debug=False)
-        print("Test file QR code generated successfully.")
-    
+            generate_qr_code(hosted_url, os.path.splitext(html_file)[0], subfolder, debug=True,
+                             size_mm=args.size_mm, dpi=dpi, svg=svg)
     else:
-        print("Invalid choice. Exiting.")
+        targets = [(f"{BASE_URL}/DeploymentFiles/{html_file}", os.path.splitext(html_file)[0])
+                   for html_file in html_files]
+        generated, skipped = generate_qr_codes(targets, subfolder, workers=args.workers, force=args.force,
+                                               size_mm=args.size_mm, dpi=dpi, svg=svg)
+        print(f"{len(generated)} QR code(s) generated, {len(skipped)} already up to date.")
+    print("All deployment QR codes generated successfully.")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Atomic releases of the deployment folder.
+
+With releases enabled, DeploymentFiles is a symbolic link to one folder of
+DeploymentFiles.releases/. A build starts from a copy of the live release
+(files under img/, assets/ and chrome/ are content-hashed and never rewritten in
+place, so they are hard-linked instead of copied), writes every output
+there and then replaces the link with a single atomic rename: visitors see
+either the old or the new site, never a mix. Previous releases are kept so
+the site can be rolled back instantly.
+
+    DeploymentFiles -> DeploymentFiles.releases/20250101-120000
+    DeploymentFiles.releases/
+        20241231-180000/        previous release
+        20250101-120000/        live release
+        .20250101-130000/       release being built (not yet complete)
+"""
+import os
+import time
+import shutil
+import logging
+
+RELEASES_SUFFIX = ".releases"
+
+# Folders whose files are only ever replaced or removed, never rewritten in
+# place, so a new release can share them with the live one.
+LINKED_FOLDERS = ("img", "assets", "chrome")
+
+RELEASE_ID_FORMAT = "%Y%m%d-%H%M%S"
+# Id of the plain site folder found when releases are first enabled; sorts
+# before every build.
+INITIAL_RELEASE_ID = "00000000-000000-initial"
+
+
+def releases_folder(site_folder):
+    return os.path.normpath(site_folder) + RELEASES_SUFFIX
+
+
+def _new_release_id(folder):
+    base = time.strftime(RELEASE_ID_FORMAT)
+    release_id, counter = base, 1
+    while os.path.exists(os.path.join(folder, release_id)) or os.path.exists(os.path.join(folder, "." + release_id)):
+        counter += 1
+        release_id = f"{base}-{counter}"
+    return release_id
+
+
+def list_releases(site_folder):
+    """
+    Return the ids of all complete releases, oldest first.
+    """
+    folder = releases_folder(site_folder)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name for name in os.listdir(folder)
+                  if not name.startswith(".") and os.path.isdir(os.path.join(folder, name)))
+
+
+def current_release(site_folder):
+    """
+    Return the id of the live release, or None if the site folder is not a release link.
+    """
+    if not os.path.islink(site_folder):
+        return None
+    return os.path.basename(os.path.normpath(os.readlink(site_folder)))
+
+
+def _clone(source, target, skip):
+    """
+    Copy the 'source' site into 'target', hard-linking the files of LINKED_FOLDERS.
+    """
+    for root, dirs, files in os.walk(source):
+        rel = os.path.relpath(root, source)
+        if rel == ".":
+            dirs[:] = [name for name in dirs if name not in skip]
+            files = [name for name in files if name not in skip]
+        os.makedirs(os.path.join(target, rel), exist_ok=True)
+        linked = rel.split(os.sep)[0] in LINKED_FOLDERS
+        for name in files:
+            src = os.path.join(root, name)
+            dst = os.path.join(target, rel, name)
+            if linked:
+                try:
+                    os.link(src, dst)
+                    continue
+                except OSError:
+                    pass  # No hard links here (e.g. FAT32); copy instead.
+            shutil.copy2(src, dst)
+
+
+def create_release(site_folder, skip=()):
+    """
+    Create a new, not yet complete release from a copy of the live site and
+    return its path. Leftovers of interrupted builds are removed first.
+    Top-level names in 'skip' (build-local state) are not copied.
+    """
+    folder = releases_folder(site_folder)
+    os.makedirs(folder, exist_ok=True)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name.startswith(".") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    path = os.path.join(folder, "." + _new_release_id(folder))
+    if os.path.isdir(site_folder):
+        _clone(site_folder, path, skip)
+    else:
+        os.makedirs(path)
+    return path
+
+
+def discard_release(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _point_site_at(site_folder, release_path):
+    """
+    Atomically replace the site link with one pointing at 'release_path'.
+    """
+    target = os.path.relpath(release_path, os.path.dirname(os.path.abspath(site_folder)))
+    tmp_link = os.path.normpath(site_folder) + ".new"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(target, tmp_link, target_is_directory=True)
+    os.replace(tmp_link, site_folder)
+
+
+def activate_release(site_folder, release_path):
+    """
+    Mark a built release complete and make it live. The first time, a plain
+    site folder is kept as the oldest release. Returns the release id.
+    """
+    folder = releases_folder(site_folder)
+    release_id = os.path.basename(release_path).lstrip(".")
+    final_path = os.path.join(folder, release_id)
+    os.rename(release_path, final_path)
+    if os.path.isdir(site_folder) and not os.path.islink(site_folder):
+        # One-time switch from a plain folder to a release link; the site
+        # is briefly missing between these two renames.
+        os.rename(site_folder, os.path.join(folder, INITIAL_RELEASE_ID))
+        logging.info(f"Moved the existing {site_folder} to release {INITIAL_RELEASE_ID}.")
+    _point_site_at(site_folder, final_path)
+    return release_id
+
+
+def prune_releases(site_folder, keep):
+    """
+    Delete all but the 'keep' newest releases besides the live one. Returns
+    the number of releases removed.
+    """
+    live = current_release(site_folder)
+    previous = [name for name in list_releases(site_folder) if name != live]
+    stale = previous[:-keep] if keep > 0 else previous
+    for name in stale:
+        shutil.rmtree(os.path.join(releases_folder(site_folder), name), ignore_errors=True)
+    return len(stale)
+
+
+def rollback(site_folder, release_id=None):
+    """
+    Make an earlier release live again: 'release_id', or by default the
+    newest release older than the live one. Returns the id now live.
+    Raises ValueError if there is nothing to roll back to.
+    """
+    live = current_release(site_folder)
+    if live is None:
+        raise ValueError(f"{site_folder} is not a release link; nothing to roll back.")
+    releases = list_releases(site_folder)
+    if release_id is None:
+        older = [name for name in releases if name < live]
+        if not older:
+            raise ValueError("No earlier release to roll back to.")
+        release_id = older[-1]
+    elif release_id not in releases:
+        raise ValueError(f"Unknown release: {release_id}")
+    _point_site_at(site_folder, os.path.join(releases_folder(site_folder), release_id))
+    logging.info(f"Rolled back from release {live} to {release_id}.")
+    return release_id
@@ -0,0 +1,200 @@
+"""
+Full-text search index of the deployed tour.
+
+For every page and language, the header, title and content are reduced to
+plain text, folded (lower case, no diacritics: "Svážnice" -> "svaznice",
+"Łódź" -> "lodz") and split into terms. The term counts of each page are
+kept in DeploymentFiles/.searchindex with the hash of the content file they
+came from, so a build only indexes the pages it rebuilt. The merged inverted
+index is written as one shard per language, DeploymentFiles/search/<lang>.json,
+so a visitor only downloads the language they read. Shards whose text is
+unchanged are not rewritten.
+
+Shard format (compact JSON, read by the search box of Template.html):
+
+    {"format": 1,
+     "pages": [["1.Uvod.html", "Title"], ...],
+     "terms": {"term": [page, weight, page, weight, ...], ...}}
+
+Terms of the header and title weigh HEADING_WEIGHT times as much as terms
+of the content. The shards are not precached by the service worker (that
+would download every language); it keeps a copy of the shard once used.
+"""
+import os
+import re
+import html
+import json
+import shutil
+import logging
+import unicodedata
+
+from page_template import inner_div_span, DIV_TAG_RE
+
+SEARCH_FOLDER_NAME = "search"
+SEARCH_STATE_FILE_NAME = ".searchindex"
+INDEX_FORMAT = 1
+HEADING_WEIGHT = 5
+MIN_TERM_LENGTH = 2
+
+# Letters that Unicode decomposition does not split into a base letter and a
+# combining mark. The page script folds queries the same way.
+FOLD_TABLE = str.maketrans({"ł": "l", "Ł": "L", "ß": "ss"})
+TAG_RE = re.compile(r'<[^>]*>')
+TERM_RE = re.compile(r'[a-z0-9]+')
+# The search box of the template (<div ... id="search">).
+SEARCH_BOX_OPEN_RE = re.compile(r'<div\s+[^>]*\bid=["\']search["\'][^>]*>', re.IGNORECASE)
+
+
+def fold(text):
+    """
+    Lower-case 'text' and strip its diacritics.
+    """
+    text = unicodedata.normalize("NFKD", text.translate(FOLD_TABLE))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def plain_text(markup):
+    return html.unescape(TAG_RE.sub(" ", markup))
+
+
+def terms_of(text):
+    return [term for term in TERM_RE.findall(fold(text)) if len(term) >= MIN_TERM_LENGTH]
+
+
+def page_terms(heading, body):
+    """
+    Return {term: weight} for the heading and body text of one page language.
+    """
+    weights = {}
+    for term in terms_of(heading):
+        weights[term] = weights.get(term, 0) + HEADING_WEIGHT
+    for term in terms_of(body):
+        weights[term] = weights.get(term, 0) + 1
+    return weights
+
+
+def remove_search_box(template_content):
+    """
+    Return the template without its search box (search disabled), so pages
+    do not offer a search that has no index.
+    """
+    span = inner_div_span(template_content, SEARCH_BOX_OPEN_RE)
+    if span is None:
+        return template_content
+    # Remove whole lines: from the start of the opening tag's line to the
+    # end of the closing tag's line.
+    start = template_content.rfind("\n", 0, SEARCH_BOX_OPEN_RE.search(template_content).start()) + 1
+    end = DIV_TAG_RE.match(template_content, span[1]).end()
+    if template_content.startswith("\n", end):
+        end += 1
+    return template_content[:start] + template_content[end:]
+
+
+def remove_search_index(deploy_folder):
+    """
+    Delete the shards and the index state (search disabled).
+    """
+    folder = os.path.join(deploy_folder, SEARCH_FOLDER_NAME)
+    if os.path.isdir(folder):
+        shutil.rmtree(folder)
+        logging.info("Removed the search index (search disabled).")
+    state = os.path.join(deploy_folder, SEARCH_STATE_FILE_NAME)
+    if os.path.exists(state):
+        os.remove(state)
+
+
+class SearchIndex:
+    """
+    Indexed terms of the pages of one deployment folder:
+    {content file: {"hash", "page", "languages": {lang: {"title", "terms"}}}}.
+    Call add_page() for every rebuilt page, then write() for the pages of
+    the build.
+    """
+    def __init__(self, deploy_folder, languages):
+        self.deploy_folder = deploy_folder
+        self.path = os.path.join(deploy_folder, SEARCH_STATE_FILE_NAME)
+        self.languages = languages
+        self.pages = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Search index state unreadable ({e}); re-indexing every page.")
+            return
+        if stored.get("format") == INDEX_FORMAT:
+            self.pages = stored.get("pages", {})
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": INDEX_FORMAT, "pages": self.pages}, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def has_page(self, filename, content_hash):
+        entry = self.pages.get(filename)
+        return entry is not None and entry["hash"] == content_hash
+
+    def add_page(self, filename, content_hash, page, texts):
+        """
+        Index one page. 'texts' maps each language to (title, heading, body)
+        as plain text; the title is shown in the search results.
+        """
+        self.pages[filename] = {
+            "hash": content_hash,
+            "page": page,
+            "languages": {lang: {"title": title, "terms": page_terms(heading, body)}
+                          for lang, (title, heading, body) in texts.items()},
+        }
+        self.changed = True
+
+    def shard(self, lang, filenames):
+        """
+        Return the inverted index of one language over 'filenames', in order.
+        """
+        pages = []
+        terms = {}
+        for filename in filenames:
+            entry = self.pages[filename]
+            language = entry["languages"].get(lang)
+            if language is None:
+                continue
+            number = len(pages)
+            pages.append([entry["page"], language["title"]])
+            for term, weight in language["terms"].items():
+                terms.setdefault(term, []).extend((number, weight))
+        return {"format": INDEX_FORMAT, "pages": pages, "terms": dict(sorted(terms.items()))}
+
+    def write(self, filenames):
+        """
+        Drop pages not in 'filenames' and write the shard of every language.
+        Returns the number of shards written.
+        """
+        for filename in set(self.pages) - set(filenames):
+            del self.pages[filename]
+            self.changed = True
+        folder = os.path.join(self.deploy_folder, SEARCH_FOLDER_NAME)
+        os.makedirs(folder, exist_ok=True)
+        written = 0
+        for lang in self.languages:
+            text = json.dumps(self.shard(lang, filenames), ensure_ascii=False, separators=(",", ":"))
+            path = os.path.join(folder, f"{lang}.json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    if f.read() == text:
+                        continue
+            except OSError:
+                pass
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            written += 1
+            logging.info(f"Search index {lang}: {len(text.encode('utf-8'))} bytes.")
+        if self.changed:
+            self.save()
+            self.changed = False
+        return written
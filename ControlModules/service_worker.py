@@ -0,0 +1,153 @@
+"""
+Offline support for the deployed pages.
+
+After a build the deploy folder gets a service worker (sw.js, filled in from
+Template/ServiceWorker.js) and precache-manifest.json. The manifest lists
+every page, language fragment and local asset of the page chrome, each
+with a hash of its content. The worker downloads the whole list on the first
+visit, and after a redeploy it downloads only the entries whose hash changed.
+Content images are left to the worker's runtime cache, which keeps the one
+candidate the browser picks for its screen instead of every width.
+"""
+import os
+import re
+import html
+import json
+import logging
+from urllib.parse import urlsplit
+
+from build_cache import file_hash, text_hash
+
+SERVICE_WORKER_TEMPLATE_NAME = "ServiceWorker.js"
+SERVICE_WORKER_FILE_NAME = "sw.js"
+PRECACHE_FILE_NAME = "precache-manifest.json"
+VERSION_PLACEHOLDER = "__PRECACHE_VERSION__"
+REVISION_LENGTH = 16
+
+# src="..." and srcset="..." attributes, including those inside the JS
+# language objects of a page.
+ASSET_ATTR_RE = re.compile(r'\b(src|srcset)\s*=\s*"([^"]*)"', re.IGNORECASE)
+# Content images as build_image_tags renders them: a <picture> around an
+# <img class="content-image">, or that <img> alone.
+CONTENT_IMAGE_RE = re.compile(
+    r'<picture\b(?:(?!</picture>).)*?class="content-image"(?:(?!</picture>).)*</picture>'
+    r'|<img\b[^>]*class="content-image"[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+PICTURE_RE = re.compile(r'<picture\b.*?</picture>', re.IGNORECASE | re.DOTALL)
+SOURCE_TAG_RE = re.compile(r'<source\b[^>]*>', re.IGNORECASE)
+
+
+# Helper to check that a URL points into the deployment rather than elsewhere.
+def is_local_url(url):
+    parts = urlsplit(url)
+    return bool(parts.path) and not parts.scheme and not parts.netloc
+
+
+def asset_urls(markup):
+    """
+    Return the local URLs referenced by src/srcset attributes in the markup,
+    leaving out content images. Only the WebP candidates of a srcset are
+    listed and, inside a <picture>, only its <source> candidates (every
+    browser with service workers decodes WebP); the JPEG/PNG fallbacks are
+    cached at runtime if a browser does request them.
+    """
+    markup = CONTENT_IMAGE_RE.sub("", markup)
+    pictures = PICTURE_RE.findall(markup)
+    markup = PICTURE_RE.sub("", markup) + "".join(tag for picture in pictures
+                                                  for tag in SOURCE_TAG_RE.findall(picture))
+    urls = set()
+    for attr, value in ASSET_ATTR_RE.findall(markup):
+        value = html.unescape(value)
+        if attr.lower() == "src":
+            candidates = [value]
+        else:
+            candidates = [c.split()[0] for c in value.split(",") if c.strip()]
+            candidates = [c for c in candidates if c.lower().endswith(".webp")]
+        for url in candidates:
+            if is_local_url(url):
+                urls.add(urlsplit(url).path)
+    return urls
+
+
+def _read_markup(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith(".json"):
+        # Language fragments hold their markup in JSON strings.
+        text = "\n".join(str(value) for value in json.loads(text).values())
+    return text
+
+
+def build_precache_entries(deploy_folder, output_files, hasher=file_hash):
+    """
+    Return the sorted precache entries [{"url", "revision"}] for the given
+    files of the deploy folder and every local asset their markup refers
+    to. URLs are relative to the deploy folder, where sw.js is served from.
+    """
+    revisions = {}
+    missing = set()
+
+    def add(url, path):
+        digest = hasher(path)
+        if digest is None:
+            if url not in missing:
+                missing.add(url)
+                logging.warning(f"Precache: {url} does not exist; it will not be available offline.")
+            return
+        revisions[url] = digest[:REVISION_LENGTH]
+
+    for name in output_files:
+        path = os.path.join(deploy_folder, name)
+        add(name, path)
+        if not name.endswith((".html", ".json")) or name in missing:
+            continue
+        for url in asset_urls(_read_markup(path)):
+            if url not in revisions:
+                add(url, os.path.normpath(os.path.join(deploy_folder, url)))
+    return [{"url": url, "revision": revisions[url]} for url in sorted(revisions)]
+
+
+def _write_if_changed(path, text):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+def write_service_worker(deploy_folder, template_path, entries):
+    """
+    Write precache-manifest.json and sw.js. The worker script embeds a hash
+    of the manifest, so browsers see a new worker whenever any entry
+    changed. Files whose text is unchanged are not rewritten. Returns True
+    if anything was written.
+    """
+    with open(template_path, "r", encoding="utf-8") as f:
+        worker_template = f.read()
+    manifest_text = json.dumps({"entries": entries}, indent=1)
+    version = text_hash(manifest_text)[:REVISION_LENGTH]
+    manifest_written = _write_if_changed(os.path.join(deploy_folder, PRECACHE_FILE_NAME), manifest_text)
+    worker_written = _write_if_changed(os.path.join(deploy_folder, SERVICE_WORKER_FILE_NAME),
+                                       worker_template.replace(VERSION_PLACEHOLDER, version))
+    if manifest_written or worker_written:
+        logging.info(f"Service worker written ({len(entries)} precache entries, version {version}).")
+    else:
+        logging.info("Service worker unchanged.")
+    return manifest_written or worker_written
+
+
+def remove_service_worker(deploy_folder):
+    """
+    Delete a previously deployed service worker. Browsers unregister a
+    worker whose script is gone on their next update check.
+    """
+    for name in (SERVICE_WORKER_FILE_NAME, PRECACHE_FILE_NAME):
+        path = os.path.join(deploy_folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+            logging.info(f"Removed {name} (service worker disabled).")
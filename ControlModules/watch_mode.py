@@ -0,0 +1,183 @@
+"""
+Watch mode: debounced, targeted rebuilds.
+
+File system events are classified (content file, template, PictureDeps
+asset), coalesced over a short debounce window and handed to a single
+worker thread, so one editor save triggers one build and events arriving
+during a build are folded into exactly one follow-up build.
+"""
+import os
+import time
+import logging
+import threading
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from deploy_engine import PICTURE_FOLDER
+from service_worker import SERVICE_WORKER_TEMPLATE_NAME
+
+# Quiet period after the last event before a build starts.
+DEBOUNCE_SECONDS = 0.3
+
+
+class ChangeSet:
+    """
+    Paths changed since the last build, grouped by what they affect.
+    """
+    def __init__(self):
+        self.content_files = set()
+        self.assets = set()
+        self.template = False
+
+    def add(self, kind, path):
+        if kind == "content":
+            self.content_files.add(os.path.basename(path))
+        elif kind == "asset":
+            self.assets.add(path)
+        elif kind == "template":
+            self.template = True
+
+    def __bool__(self):
+        return bool(self.content_files or self.assets or self.template)
+
+
+def classify_path(path, template_file, content_folder):
+    """
+    Return "content", "template" or "asset" for a path that affects the
+    deployment, or None for anything else (editor swap files, other folders).
+    """
+    rel_path = os.path.relpath(os.path.abspath(path))
+    if os.path.normcase(rel_path) == os.path.normcase(os.path.normpath(template_file)):
+        return "template"
+    worker_template = os.path.join(os.path.dirname(template_file), SERVICE_WORKER_TEMPLATE_NAME)
+    if os.path.normcase(rel_path) == os.path.normcase(os.path.normpath(worker_template)):
+        return "template"
+    top_folder = rel_path.split(os.sep, 1)[0]
+    if os.path.normcase(top_folder) == os.path.normcase(os.path.normpath(content_folder)):
+        return "content" if rel_path.lower().endswith((".txt", ".md")) else None
+    if os.path.normcase(top_folder) == os.path.normcase(PICTURE_FOLDER):
+        return "asset"
+    return None
+
+
+class RebuildScheduler:
+    """
+    Runs build_func(changes) on one worker thread once no new change has
+    arrived for 'debounce' seconds. Changes that come in while a build is
+    running are collected and trigger exactly one follow-up build.
+    """
+    def __init__(self, build_func, debounce=DEBOUNCE_SECONDS):
+        self.build_func = build_func
+        self.debounce = debounce
+        self._condition = threading.Condition()
+        self._pending = None      # ChangeSet waiting to be built, if any.
+        self._last_event = 0.0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._worker, name="rebuild-worker", daemon=True)
+        self._thread.start()
+
+    def notify(self, kind, path):
+        with self._condition:
+            if self._pending is None:
+                self._pending = ChangeSet()
+            self._pending.add(kind, path)
+            self._last_event = time.monotonic()
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_changes(self):
+        with self._condition:
+            while self._pending is None and not self._stopped:
+                self._condition.wait()
+            # Wait for the burst of events to settle.
+            while not self._stopped:
+                remaining = self._last_event + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._stopped:
+                return None
+            changes, self._pending = self._pending, None
+            return changes
+
+    def _worker(self):
+        while True:
+            changes = self._next_changes()
+            if changes is None:
+                return
+            try:
+                self.build_func(changes)
+            except Exception:
+                logging.exception("Watch mode rebuild failed.")
+
+
+class DeploymentEventHandler(FileSystemEventHandler):
+    def __init__(self, scheduler, template_file, content_folder):
+        super().__init__()
+        self.scheduler = scheduler
+        self.template_file = template_file
+        self.content_folder = content_folder
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        paths = [event.src_path]
+        if event.event_type == "moved":
+            paths.append(event.dest_path)
+        for path in paths:
+            kind = classify_path(path, self.template_file, self.content_folder)
+            if kind:
+                logging.info(f"Change detected ({event.event_type}) in {path}.")
+                self.scheduler.notify(kind, path)
+
+
+class WatchBuilder:
+    """
+    Turns a ChangeSet into a targeted DeployEngine run:
+    content file -> its page (+ manifest), template -> every page,
+    PictureDeps asset -> the pages that reference it.
+    """
+    def __init__(self, engine, on_result=None):
+        self.engine = engine
+        self.on_result = on_result
+
+    def changed_files(self, changes):
+        if changes.template or self.engine.cache is None:
+            return None
+        changed = set(changes.content_files)
+        for asset_path in changes.assets:
+            changed |= self.engine.cache.pages_using(os.path.relpath(os.path.abspath(asset_path)))
+        return changed
+
+    def __call__(self, changes):
+        start = time.perf_counter()
+        result = self.engine.run(changed_files=self.changed_files(changes))
+        logging.info(f"Watch rebuild finished in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        if self.on_result:
+            self.on_result(result)
+
+
+def run_watch_mode(engine, on_result=None, debounce=DEBOUNCE_SECONDS):
+    """
+    Watch the template, content and picture folders and rebuild with the
+    given engine until interrupted.
+    """
+    scheduler = RebuildScheduler(WatchBuilder(engine, on_result), debounce)
+    event_handler = DeploymentEventHandler(scheduler, engine.template_file, engine.content_folder)
+    observer = Observer()
+    for folder in [os.path.dirname(engine.template_file), engine.content_folder, PICTURE_FOLDER]:
+        if os.path.isdir(folder):
+            observer.schedule(event_handler, folder, recursive=True)
+    observer.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        observer.stop()
+    observer.join()
+    scheduler.stop()
@@ -0,0 +1,171 @@
+/* Offline-first service worker for the deployed pages.
+   The deploy script copies this file to DeploymentFiles/sw.js and fills in
+   the precache version. precache-manifest.json lists every page, language
+   fragment and page chrome asset together with a hash of its content, so
+   after a redeploy only the entries whose hash changed are downloaded again.
+   Content images are not precached: the runtime cache keeps the candidates
+   the browser actually requested.
+*/
+const PRECACHE_VERSION = "__PRECACHE_VERSION__";
+const PRECACHE_MANIFEST = new URL("precache-manifest.json?v=" + PRECACHE_VERSION, self.location).href;
+const PRECACHE = "bouda-precache";
+const RUNTIME = "bouda-runtime";
+// Files named "<name>.<content hash>.<...>" (image derivatives, fingerprinted
+// assets) never change, so runtime copies of them outlive a redeploy.
+const IMMUTABLE_NAME = /\.[0-9a-f]{12}\.[^\/]*$/;
+
+// Cache key of a precache entry: its URL plus the content revision.
+function cacheKey(entry) {
+  return new URL(entry.url, self.location).href + "?__rev=" + entry.revision;
+}
+
+// Entries of the precache manifest stored by the last completed install.
+function storedEntries(cache) {
+  return cache.match(PRECACHE_MANIFEST).then(function(response) {
+    return response ? response.json().then(function(manifest) { return manifest.entries; }) : [];
+  });
+}
+
+self.addEventListener("install", function(event) {
+  event.waitUntil(
+    fetch(PRECACHE_MANIFEST, {cache: "no-cache"}).then(function(response) {
+      if (!response.ok) {
+        throw new Error("Precache manifest unavailable: " + response.status);
+      }
+      return response.clone().json().then(function(manifest) {
+        return caches.open(PRECACHE).then(function(cache) {
+          // Unchanged entries are already cached under the same key.
+          return Promise.all(manifest.entries.map(function(entry) {
+            var key = cacheKey(entry);
+            return cache.match(key).then(function(cached) {
+              if (cached) {
+                return;
+              }
+              return fetch(entry.url, {cache: "no-cache"}).then(function(entryResponse) {
+                if (!entryResponse.ok) {
+                  throw new Error("Cannot precache " + entry.url + ": " + entryResponse.status);
+                }
+                return cache.put(key, entryResponse);
+              });
+            });
+          })).then(function() {
+            return cache.put(PRECACHE_MANIFEST, response);
+          });
+        });
+      });
+    }).then(function() {
+      return self.skipWaiting();
+    })
+  );
+});
+
+self.addEventListener("activate", function(event) {
+  event.waitUntil(
+    caches.open(PRECACHE).then(function(cache) {
+      return storedEntries(cache).then(function(entries) {
+        var keep = {};
+        keep[PRECACHE_MANIFEST] = true;
+        entries.forEach(function(entry) {
+          keep[cacheKey(entry)] = true;
+        });
+        return cache.keys().then(function(requests) {
+          return Promise.all(requests.filter(function(request) {
+            return !keep[request.url];
+          }).map(function(request) {
+            return cache.delete(request);
+          }));
+        });
+      });
+    }).then(function() {
+      // Other runtime copies belong to the previous deployment.
+      return caches.open(RUNTIME).then(function(cache) {
+        return cache.keys().then(function(requests) {
+          return Promise.all(requests.filter(function(request) {
+            return !IMMUTABLE_NAME.test(new URL(request.url).pathname);
+          }).map(function(request) {
+            return cache.delete(request);
+          }));
+        });
+      });
+    }).then(function() {
+      return self.clients.claim();
+    })
+  );
+});
+
+// Request URL (without query) -> precache key, built once per worker start.
+var precacheKeys = null;
+
+function lookupPrecacheKeys() {
+  if (!precacheKeys) {
+    precacheKeys = caches.open(PRECACHE).then(storedEntries).then(function(entries) {
+      var keys = {};
+      entries.forEach(function(entry) {
+        keys[new URL(entry.url, self.location).href] = cacheKey(entry);
+      });
+      return keys;
+    }).catch(function(error) {
+      precacheKeys = null;
+      throw error;
+    });
+  }
+  return precacheKeys;
+}
+
+// Anything not precached (content images, JPEG/PNG fallbacks): network
+// first, keeping a copy for when the visitor is offline. Immutable files
+// are served from that copy without asking the network.
+function fetchWithRuntimeCache(request) {
+  if (IMMUTABLE_NAME.test(new URL(request.url).pathname)) {
+    return caches.open(RUNTIME).then(function(cache) {
+      return cache.match(request, {ignoreSearch: true});
+    }).then(function(cached) {
+      return cached || fetchAndKeep(request);
+    });
+  }
+  return fetchAndKeep(request);
+}
+
+function fetchAndKeep(request) {
+  return fetch(request).then(function(response) {
+    if (response.ok) {
+      var copy = response.clone();
+      caches.open(RUNTIME).then(function(cache) {
+        cache.put(request, copy);
+      });
+    }
+    return response;
+  }).catch(function(error) {
+    return caches.match(request).then(function(cached) {
+      if (cached) {
+        return cached;
+      }
+      throw error;
+    });
+  });
+}
+
+self.addEventListener("fetch", function(event) {
+  var request = event.request;
+  if (request.method !== "GET") {
+    return;
+  }
+  var url = new URL(request.url);
+  if (url.origin !== self.location.origin) {
+    return;
+  }
+  // QR codes may add a query string; the cached page is the same.
+  url.search = "";
+  url.hash = "";
+  event.respondWith(lookupPrecacheKeys().then(function(keys) {
+    var key = keys[url.href];
+    if (!key) {
+      return fetchWithRuntimeCache(request);
+    }
+    return caches.match(key).then(function(cached) {
+      return cached || fetch(request);
+    });
+  }, function() {
+    return fetchWithRuntimeCache(request);
+  }));
+});
@@ -0,0 +1,59 @@
+"""
+Language fragments (<page>.<lang>.json) must not outlive the build that
+wrote them.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "ControlModules"))
+
+from deploy_engine import DeployEngine, FRAGMENT_NAME_PATTERN
+
+
+class LazyFragmentTest(unittest.TestCase):
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp(prefix="bouda-test-")
+        for folder in ("Template", "PictureDeps", "ContentFiles"):
+            shutil.copytree(os.path.join(REPO_ROOT, folder), os.path.join(self.workspace, folder))
+        self.previous_dir = os.getcwd()
+        os.chdir(self.workspace)
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+    def build(self, **options):
+        result = DeployEngine(responsive_images=False, **options).run()
+        self.assertTrue(result.ok, result.summary or result.errors)
+
+    def fragments(self):
+        return sorted(name for name in os.listdir("DeploymentFiles") if FRAGMENT_NAME_PATTERN.match(name))
+
+    def test_fragments_removed_when_lazy_languages_turned_off(self):
+        self.build(lazy_languages=True)
+        self.assertIn("1.Uvod.en.json", self.fragments())
+        self.build(lazy_languages=False)
+        self.assertEqual(self.fragments(), [])
+
+    def test_fragments_of_renamed_file_removed(self):
+        self.build(lazy_languages=True)
+        os.rename(os.path.join("ContentFiles", "2.Svaznice.txt"), os.path.join("ContentFiles", "2.Renamed.txt"))
+        self.build(lazy_languages=True)
+        fragments = self.fragments()
+        self.assertIn("2.Renamed.en.json", fragments)
+        self.assertIn("1.Uvod.en.json", fragments)  # Unchanged page, not rebuilt.
+        self.assertFalse([name for name in fragments if name.startswith("2.Svaznice.")])
+
+
+if __name__ == "__main__":
+    unittest.main()